@@ -1,12 +1,61 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 
-from .import models
+from .import forms, models
 
-admin.site.register(models.Exercise)
+
+class SummaryChangeList(ChangeList):
+    def get_queryset(self, request, exclude_parameters=None):
+        return super().get_queryset(request, exclude_parameters).summary()
+
+
+class SummaryAdmin(admin.ModelAdmin):
+    """
+    Admin of a model whose queryset has a summary() method leaving out its large JSON columns
+
+    The changelist and the choices of foreign keys to such models use summary(), the change form loads the whole row.
+    """
+    def get_changelist(self, request, **kwargs):
+        if hasattr(self.model.objects, 'summary'):
+            return SummaryChangeList
+        return super().get_changelist(request, **kwargs)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if hasattr(db_field.related_model.objects, 'summary'):
+            kwargs.setdefault('queryset', db_field.related_model.objects.summary())
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+class RecordedActivityAdmin(SummaryAdmin):
+    """
+    Admin of the recorded activities, which refreshes the summary counters and the version of the affected training
+    schedules after every save and delete, like TrainingSchedule.record_activity
+    """
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        training_schedule_ids = {obj.training_schedule_id}
+        if change and 'training_schedule' in form.changed_data:
+            # the recorded activity was moved out of this training schedule
+            training_schedule_ids.add(form.initial['training_schedule'])
+        models.TrainingSchedule.objects.filter(pk__in=training_schedule_ids).refresh_highlights()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        models.TrainingSchedule.objects.filter(pk=obj.training_schedule_id).refresh_highlights()
+
+    def delete_queryset(self, request, queryset):
+        training_schedule_ids = set(queryset.values_list('training_schedule_id', flat=True))
+        super().delete_queryset(request, queryset)
+        models.TrainingSchedule.objects.filter(pk__in=training_schedule_ids).refresh_highlights()
+
+
+admin.site.register(models.Exercise, form=forms.ExerciseAdminForm)
 admin.site.register(models.Muscle)
 admin.site.register(models.Equipment)
-admin.site.register(models.TrainingPlan)
-admin.site.register(models.TrainingSchedule)
-admin.site.register(models.StrengthActivity)
-admin.site.register(models.CardioActivity)
-admin.site.register(models.IsometricActivity)
+admin.site.register(models.TrainingPlan, SummaryAdmin)
+admin.site.register(models.TrainingSchedule, SummaryAdmin)
+admin.site.register(models.StrengthActivity, fields=['exercise', 'date', 'athlete', 'reps', 'weight'])
+admin.site.register(models.CardioActivity, fields=['exercise', 'date', 'athlete', 'duration'])
+admin.site.register(models.IsometricActivity, fields=['exercise', 'date', 'athlete', 'duration'])
+admin.site.register(models.RecordedActivity, RecordedActivityAdmin)
+admin.site.register(models.Job, SummaryAdmin, list_display=['name', 'status', 'training_schedule', 'created', 'finished'], list_filter=['status'])
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "app"
+
+    def ready(self):
+        # connect the signal receivers invalidating cached pages
+        from . import caching, reference  # noqa: F401
+        # register the handlers of the background jobs
+        from . import jobs  # noqa: F401
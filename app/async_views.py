@@ -0,0 +1,113 @@
+"""
+Async variants of the home page, the training schedule analysis and the activity recording views
+
+They are routed instead of their sync counterparts with the ASYNC_VIEWS setting and pay off when served by an ASGI
+server (see src/gunicorn_asgi.py). Queries run through the async ORM, while template rendering and the multi query
+methods of the models run in the thread of the database connection with sync_to_async. Only the rendering of the
+analysis, whose context is fully loaded beforehand, runs with thread_sensitive=False in the thread pool of the executor,
+so concurrent analyses render in parallel instead of queueing behind the queries of other requests.
+"""
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, HttpResponseBadRequest
+from django.shortcuts import aget_object_or_404, redirect, render
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response
+from django.views import View
+
+from . import caching, forms, models, rollups, views
+
+
+class HomeView(View):
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+        if user.is_authenticated:
+            training_schedules = [
+                training_schedule
+                async for training_schedule in models.TrainingSchedule.objects.filter(athlete=user).summary()
+            ]
+            training_schedules = await sync_to_async(rollups.attach_progress)(training_schedules, datetime.today().date())
+        else:
+            training_schedules = []
+        return await sync_to_async(render)(request, 'home.html', {'training_schedules': training_schedules})
+
+
+class GetTrainingScheduleAnalysisView(views.GetTrainingScheduleAnalysisView):
+    async def get(self, request, *args, **kwargs):
+        selected_date = request.GET.get('date')
+        if selected_date is None:
+            return HttpResponseBadRequest("Missing 'date' parameter")
+
+        selected_date = datetime.strptime(selected_date, '%Y-%m-%d').date()
+        version = await caching.aget_analysis_version(kwargs['pk'])
+        if version is None:
+            raise Http404("No training schedule found matching the query")
+
+        cache_key = caching.get_analysis_cache_key(kwargs['pk'], selected_date, version)
+        etag = caching.get_analysis_etag(cache_key)
+        last_modified = caching.get_analysis_last_modified(version)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            target_activities_html = await caching.aget_or_render_analysis(cache_key, lambda: self.render_analysis(kwargs['pk'], selected_date))
+            response = HttpResponse(target_activities_html)
+
+        return self.add_validators(response, etag, last_modified)
+
+    async def render_analysis(self, pk, selected_date):
+        context = await sync_to_async(self.get_analysis_context)(pk, selected_date)
+        # the context is loaded, rendering it is CPU bound and does not need the thread of the database connection
+        return await sync_to_async(render_to_string, thread_sensitive=False)('target_vs_actual.html', context)
+
+
+class RecordActivityView(View):
+    """Record an activity of the type of activity_model with the values of form_class in a training schedule"""
+    template_name = None
+    form_class = None
+    activity_model = None
+
+    def get_activity_values(self, cleaned_data:dict) -> dict:
+        return {'duration': cleaned_data['duration']}
+
+    async def get(self, request, *args, **kwargs):
+        training_schedule = await aget_object_or_404(models.TrainingSchedule.objects.summary(), pk=kwargs['pk'])
+        return await self.render_form(request, self.form_class(), training_schedule)
+
+    async def post(self, request, *args, **kwargs):
+        training_schedule = await aget_object_or_404(models.TrainingSchedule.objects.summary(), pk=kwargs['pk'])
+        form = self.form_class(request.POST)
+        if await sync_to_async(form.is_valid)():
+            activity = await self.activity_model.objects.acreate(
+                exercise=form.cleaned_data['exercise'],
+                date=form.cleaned_data['date'],
+                athlete=await request.auser(),
+                **self.get_activity_values(form.cleaned_data),
+            )
+            await sync_to_async(training_schedule.record_activity)(activity)
+            return redirect('training_schedule_detail', pk=training_schedule.pk)
+
+        return await self.render_form(request, form, training_schedule)
+
+    async def render_form(self, request, form, training_schedule):
+        return await sync_to_async(render)(request, self.template_name, {'form': form, 'training_schedule': training_schedule})
+
+
+class RecordStrengthActivityView(RecordActivityView):
+    template_name = 'strength_activity_create.html'
+    form_class = forms.RecordStrengthActivityForm
+    activity_model = models.StrengthActivity
+
+    def get_activity_values(self, cleaned_data:dict) -> dict:
+        return {'reps': cleaned_data['repetitions'], 'weight': cleaned_data['weight']}
+
+
+class RecordIsometricActivityView(RecordActivityView):
+    template_name = 'isometric_activity_create.html'
+    form_class = forms.RecordIsometricActivityForm
+    activity_model = models.IsometricActivity
+
+
+class RecordCardioActivityView(RecordActivityView):
+    template_name = 'cardio_activity_create.html'
+    form_class = forms.RecordCardioActivityForm
+    activity_model = models.CardioActivity
@@ -0,0 +1,211 @@
+"""Benchmarks of the training schedule computations on synthetic data"""
+import concurrent.futures
+import datetime
+import statistics
+import subprocess
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+import uuid
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from . import importers, models, views
+
+
+def measure(operation:str, function, setup=None, **scale) -> dict:
+    """
+    Measure the wall time and number of queries of the function in one run and its peak memory in a second one
+
+    tracemalloc slows every allocation down, so the timed run is not traced. The optional setup is called before each run,
+    e.g. to clear the cache for a cold measurement.
+    """
+    if setup is not None:
+        setup()
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        function()
+        current_memory, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'operation': operation,
+        **scale,
+        'seconds': round(seconds, 6),
+        'queries': len(queries),
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def create_training_schedule(weeks:int, exercises:int, recorded_days:int) -> models.TrainingSchedule:
+    """Create a synthetic athlete, training plan and training schedule with activities recorded on the first training days"""
+    athlete = get_user_model().objects.create_user(email=f"benchmark-{uuid.uuid4().hex}@example.com")
+    muscle = models.Muscle.objects.create(name='Benchmark', muscle_group='Full Body')
+    exercise_names = [f"Benchmark exercise {uuid.uuid4().hex}" for number in range(exercises)]
+    models.Exercise.objects.bulk_create(
+        models.Exercise(name=exercise_name, primary_muscle_focus=muscle, type='Strength', author=athlete) for exercise_name in exercise_names
+    )
+    training_plan = models.TrainingPlan.objects.create(
+        name='Benchmark',
+        description='Synthetic training plan',
+        author=athlete,
+        exercises={exercise_name: [10, 1, 20, 2.5] for exercise_name in exercise_names},
+    )
+    training_schedule = models.TrainingSchedule.objects.create(
+        athlete=athlete,
+        training_plan=training_plan,
+        start_date=datetime.date(2024, 1, 1),
+        duration=weeks,
+        train_on_mondays=True,
+        train_on_wednesdays=True,
+        train_on_fridays=True,
+    )
+
+    recorded_dates = []
+    date = training_schedule.start_date
+    while len(recorded_dates) < recorded_days and date <= training_schedule.end_date:
+        if training_schedule.is_training_day(date):
+            recorded_dates.append(date.isoformat())
+        date += datetime.timedelta(days=1)
+    rows = ({'exercise': exercise_name, 'date': date, 'reps': 10, 'weight': 20} for date in recorded_dates for exercise_name in exercise_names)
+    importers.ActivityImporter(training_schedule=training_schedule).import_rows(rows)
+
+    return models.TrainingSchedule.objects.get(pk=training_schedule.pk)
+
+
+def benchmark_training_schedule(weeks:int, exercises:int, recorded_days:int) -> list:
+    """Benchmark the training schedule operations at the given scale"""
+    scale = {'weeks': weeks, 'exercises': exercises, 'recorded_days': recorded_days}
+    training_schedule = create_training_schedule(weeks, exercises, recorded_days)
+    training_plan = training_schedule.training_plan
+    athlete = training_schedule.athlete
+    date = training_schedule.start_date + datetime.timedelta(days=weeks * 7 // 2)
+    exercise = models.Exercise.objects.get(name=next(iter(training_plan.exercises)))
+    request_factory = RequestFactory()
+
+    def create_schedule():
+        models.TrainingSchedule.objects.create(
+            athlete=athlete,
+            training_plan=training_plan,
+            start_date=training_schedule.start_date,
+            duration=weeks,
+            train_on_mondays=True,
+            train_on_wednesdays=True,
+            train_on_fridays=True,
+        )
+
+    def record_activity():
+        activity = models.StrengthActivity.objects.create(exercise=exercise, date=date, athlete=athlete, reps=12, weight=25)
+        training_schedule.record_activity(activity)
+
+    def render_view(view, path, data=None, **kwargs):
+        def render():
+            request = request_factory.get(path, data)
+            request.user = athlete
+            response = view(request, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        return render
+
+    detail_view = render_view(views.TrainingScheduleDetailView.as_view(), training_schedule.get_absolute_url(), pk=training_schedule.pk)
+    analysis_view = render_view(views.GetTrainingScheduleAnalysisView.as_view(), '/', pk=training_schedule.pk, data={'date': date.isoformat()})
+
+    return [
+        measure('create_training_schedule', create_schedule, **scale),
+        measure('get_target_vs_actual_absolute', lambda: models.TrainingSchedule.objects.get(pk=training_schedule.pk).get_target_vs_actual_absolute(date), **scale),
+        measure('get_target_vs_actual_cumulative', lambda: models.TrainingSchedule.objects.get(pk=training_schedule.pk).get_target_vs_actual_cumulative(date), **scale),
+        measure('record_activity', record_activity, **scale),
+        measure('training_schedule_detail', detail_view, **scale),
+        measure('get-target-activities (cold)', analysis_view, setup=cache.clear, **scale),
+        measure('get-target-activities (warm)', analysis_view, **scale),
+    ]
+
+
+def get_git_commit() -> str:
+    """Get the commit the benchmarks run against, if the code is a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(scales) -> dict:
+    """
+    Run the benchmarks for every (weeks, exercises, recorded_days) scale inside a transaction that is rolled back
+
+    Returns:
+        dict: {'commit': ..., 'django': ..., 'database': ..., 'results': [{'operation': ..., 'weeks': ..., 'seconds': ..., 'queries': ..., 'peak_memory_bytes': ...}]}
+    """
+    results = []
+    for weeks, exercises, recorded_days in scales:
+        with transaction.atomic():
+            results.extend(benchmark_training_schedule(weeks, exercises, recorded_days))
+            transaction.set_rollback(True)
+
+    return {
+        'commit': get_git_commit(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'results': results,
+    }
+
+
+def timed_request(url:str, headers:dict) -> tuple:
+    """Request the url and get its status code and response time in seconds"""
+    request = urllib.request.Request(url, headers=headers)
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as error:
+        status = error.code
+    except urllib.error.URLError:
+        status = None
+    return status, time.perf_counter() - start
+
+
+def run_load_test(url:str, requests:int, concurrency:int, headers:dict=None) -> dict:
+    """
+    Send the given number of GET requests to a running server, with up to concurrency requests at a time
+
+    Run it against the sync (src.wsgi) and the async (src.asgi, ASYNC_VIEWS) deployment profile on the same machine to
+    compare them.
+
+    Returns:
+        dict: {'url': ..., 'requests': ..., 'concurrency': ..., 'seconds': ..., 'requests_per_second': ..., 'errors': ...,
+               'latency_p50': ..., 'latency_p95': ..., 'latency_max': ...}
+    """
+    headers = headers or dict()
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda number: timed_request(url, headers), range(requests)))
+    seconds = time.perf_counter() - start
+
+    latencies = sorted(latency for status, latency in results)
+    percentiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    return {
+        'url': url,
+        'requests': requests,
+        'concurrency': concurrency,
+        'seconds': round(seconds, 3),
+        'requests_per_second': round(requests / seconds, 1),
+        'errors': sum(status is None or status >= 400 for status, latency in results),
+        'latency_p50': round(percentiles[49], 4),
+        'latency_p95': round(percentiles[94], 4),
+        'latency_max': round(latencies[-1], 4),
+    }
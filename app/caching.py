@@ -0,0 +1,125 @@
+"""Caching of the rendered training schedule analysis and exercise library"""
+import datetime
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils.http import quote_etag
+
+from . import models
+
+
+def get_analysis_version(training_schedule_id) -> tuple:
+    """
+    Get the version of the analysis of a training schedule without loading the schedule itself
+    
+    The version is made of the updated timestamps of the training schedule and its training plan, which TrainingSchedule.save
+    (including record_activity) and TrainingPlan.save refresh. Any save therefore leads to new cache keys and ETags.
+    
+    Returns:
+        tuple: (training_schedule_updated, training_plan_updated) or None if the training schedule does not exist
+    """
+    return models.TrainingSchedule.objects.filter(pk=training_schedule_id).values_list('updated', 'training_plan__updated').first()
+
+
+def get_version_cache_key(prefix:str, training_schedule_id, version:tuple) -> str:
+    """Get a cache key for data derived from the given version of a training schedule"""
+    version_key = '-'.join(str(updated.timestamp()) for updated in version)
+    return f"{prefix}:{training_schedule_id}:{version_key}"
+
+
+async def aget_analysis_version(training_schedule_id) -> tuple:
+    """Async version of get_analysis_version"""
+    return await models.TrainingSchedule.objects.filter(pk=training_schedule_id).values_list('updated', 'training_plan__updated').afirst()
+
+
+def get_analysis_cache_key(training_schedule_id, date:datetime.date, version:tuple) -> str:
+    """Get the cache key of the analysis of a training schedule on the given date"""
+    return get_version_cache_key(f"training_schedule_analysis:{date.isoformat()}", training_schedule_id, version)
+
+
+def get_analysis_etag(cache_key:str) -> str:
+    """Get the ETag of the analysis that is stored under the given cache key"""
+    return quote_etag(hashlib.md5(cache_key.encode()).hexdigest())
+
+
+def get_analysis_last_modified(version:tuple) -> int:
+    """Get the Last-Modified timestamp of the analysis of the given version"""
+    return int(max(updated.timestamp() for updated in version))
+
+
+def get_or_render_analysis(cache_key:str, render) -> str:
+    """Get the rendered analysis from the cache, rendering and storing it with the given callable on a miss"""
+    return cache.get_or_set(cache_key, render, settings.ANALYSIS_CACHE_TIMEOUT)
+
+
+async def aget_or_render_analysis(cache_key:str, render) -> str:
+    """Async version of get_or_render_analysis, render is awaited on a miss"""
+    analysis = await cache.aget(cache_key)
+    if analysis is None:
+        analysis = await render()
+        await cache.aset(cache_key, analysis, settings.ANALYSIS_CACHE_TIMEOUT)
+    return analysis
+
+
+def get_version(version_key:str) -> int:
+    """
+    Get the version stored under the given cache key, shared by all processes using the cache backend
+
+    The version is kept in the cache without a timeout. If it was evicted a new version is started, so stale data is never
+    served under a reused version.
+    """
+    version = cache.get(version_key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(version_key, version, None):
+            version = cache.get(version_key, version)
+    return version
+
+
+def bump_version(version_key:str):
+    """Start a new version under the given cache key, data cached for earlier versions is no longer used"""
+    cache.set(version_key, time.time_ns(), None)
+
+
+EXERCISE_LIBRARY_VERSION_KEY = 'exercise_library_version'
+
+
+def get_exercise_library_version() -> int:
+    """Get the version of the exercise library, which changes whenever an exercise, muscle or equipment is saved or deleted"""
+    return get_version(EXERCISE_LIBRARY_VERSION_KEY)
+
+
+def bump_exercise_library_version():
+    """Start a new version of the exercise library, the cached pages of earlier versions are no longer used"""
+    bump_version(EXERCISE_LIBRARY_VERSION_KEY)
+
+
+def get_exercise_library_cache_key(prefix:str, *parts) -> str:
+    """
+    Get a cache key for data derived from the current version of the exercise library
+
+    The parts, e.g. the filters of a page, are hashed, so values with spaces or other characters memcached does not allow
+    in keys can be passed as they are.
+    """
+    parts_hash = hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+    return f"{prefix}:{get_exercise_library_version()}:{parts_hash}"
+
+
+def get_or_render_exercise_library(cache_key:str, render) -> str:
+    """Get a rendered exercise library page from the cache, rendering and storing it with the given callable on a miss"""
+    return cache.get_or_set(cache_key, render, settings.EXERCISE_LIBRARY_CACHE_TIMEOUT)
+
+
+@receiver(post_save, sender=models.Exercise)
+@receiver(post_delete, sender=models.Exercise)
+@receiver(m2m_changed, sender=models.Exercise.equipment.through)
+@receiver(post_save, sender=models.Muscle)
+@receiver(post_delete, sender=models.Muscle)
+@receiver(post_save, sender=models.Equipment)
+@receiver(post_delete, sender=models.Equipment)
+def invalidate_exercise_library(sender, **kwargs):
+    bump_exercise_library_version()
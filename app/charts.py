@@ -0,0 +1,113 @@
+"""Target vs actual series of a training schedule over a date range, for progress charts"""
+import datetime
+
+from . import exports, models
+
+
+SERIES_FIELDS = {
+    'target': 'target_repetitions',
+    'actual': 'actual_repetitions',
+    'cumulative_target': 'cumulative_target_repetitions',
+    'cumulative_actual': 'cumulative_actual_repetitions',
+}
+
+DOWNSAMPLING = ('week', 'lttb')
+
+
+def get_series(training_schedule:models.TrainingSchedule, start_date:datetime.date=None, end_date:datetime.date=None) -> dict:
+    """
+    Get the daily target, actual and cumulative repetitions per exercise between start_date and end_date
+
+    The series are collected in the single pass of exports.iter_timeline over the training schedule.
+
+    Returns:
+        dict: {exercise_name: {'dates': [...], 'target': [...], 'actual': [...], 'cumulative_target': [...], 'cumulative_actual': [...]}}
+    """
+    series = dict()
+    for row in exports.iter_timeline(training_schedule, start_date, end_date):
+        exercise_series = series.setdefault(row['exercise'], {'dates': [], **{name: [] for name in SERIES_FIELDS}})
+        exercise_series['dates'].append(row['date'])
+        for name, field in SERIES_FIELDS.items():
+            exercise_series[name].append(row[field])
+    return series
+
+
+def downsample_weekly(exercise_series:dict) -> dict:
+    """Sum the daily values per 7 day bucket starting at the first date, the cumulative values are the last of each bucket"""
+    buckets = range(0, len(exercise_series['dates']), 7)
+    return {
+        'dates': [exercise_series['dates'][start] for start in buckets],
+        'target': [sum(exercise_series['target'][start:start + 7]) for start in buckets],
+        'actual': [sum(exercise_series['actual'][start:start + 7]) for start in buckets],
+        'cumulative_target': [exercise_series['cumulative_target'][start:start + 7][-1] for start in buckets],
+        'cumulative_actual': [exercise_series['cumulative_actual'][start:start + 7][-1] for start in buckets],
+    }
+
+
+def get_lttb_indices(values:list, points:int) -> list:
+    """
+    Get the indices of the points to keep with the Largest-Triangle-Three-Buckets algorithm
+
+    The first and last points are kept, from every bucket in between the point forming the largest triangle with the
+    previously kept point and the average of the next bucket. Peaks therefore survive the downsampling.
+    """
+    if points < 3:
+        raise ValueError("LTTB needs at least 3 points")
+    if points >= len(values):
+        return list(range(len(values)))
+
+    indices = [0]
+    bucket_size = (len(values) - 2) / (points - 2)
+    for bucket in range(points - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_start, next_end = end, min(int((bucket + 2) * bucket_size) + 1, len(values))
+        if next_start >= next_end:
+            next_start, next_end = len(values) - 1, len(values)
+        average_x = (next_start + next_end - 1) / 2
+        average_y = sum(values[next_start:next_end]) / (next_end - next_start)
+
+        previous_x, previous_y = indices[-1], values[indices[-1]]
+        indices.append(max(
+            range(start, end),
+            key=lambda index: abs((previous_x - average_x) * (values[index] - previous_y) - (previous_x - index) * (average_y - previous_y)),
+        ))
+    indices.append(len(values) - 1)
+    return indices
+
+
+def downsample_lttb(exercise_series:dict, points:int) -> dict:
+    """Keep the points selected by LTTB on the daily gap between actual and target, the same points for every series"""
+    gaps = [actual - target for target, actual in zip(exercise_series['target'], exercise_series['actual'])]
+    indices = get_lttb_indices(gaps, points)
+    return {name: [values[index] for index in indices] for name, values in exercise_series.items()}
+
+
+def clamp_date(date:datetime.date, training_schedule:models.TrainingSchedule) -> datetime.date:
+    """Get the date within the start and end date of the training schedule that is closest to the given date"""
+    return min(max(date, training_schedule.start_date), training_schedule.end_date)
+
+
+def get_chart_data(training_schedule:models.TrainingSchedule, start_date:datetime.date=None, end_date:datetime.date=None, downsample:str=None, points:int=100) -> dict:
+    """
+    Get the series of a training schedule for charts, optionally downsampled per week or with LTTB to the given number of points
+
+    start_date and end_date are clamped to the training schedule, days outside of it have no targets or recorded activities.
+
+    Returns:
+        dict: {'from': date, 'to': date, 'downsample': ..., 'exercises': {exercise_name: {'dates': [...], 'target': [...], ...}}}
+    """
+    start_date = clamp_date(start_date or training_schedule.start_date, training_schedule)
+    end_date = clamp_date(end_date or training_schedule.end_date, training_schedule)
+    series = get_series(training_schedule, start_date, end_date)
+    if downsample == 'week':
+        series = {exercise_name: downsample_weekly(exercise_series) for exercise_name, exercise_series in series.items()}
+    elif downsample == 'lttb':
+        series = {exercise_name: downsample_lttb(exercise_series, points) for exercise_name, exercise_series in series.items()}
+
+    return {
+        'from': start_date.isoformat(),
+        'to': end_date.isoformat(),
+        'downsample': downsample,
+        'exercises': series,
+    }
@@ -0,0 +1,107 @@
+"""Export of the day by day target vs actual timeline of a training schedule"""
+import csv
+import datetime
+import json
+
+from . import models
+
+
+TIMELINE_FIELDS = [
+    'date',
+    'exercise',
+    'target_repetitions',
+    'target_weight',
+    'actual_repetitions',
+    'actual_weight',
+    'gap_repetitions',
+    'gap_weight',
+    'cumulative_target_repetitions',
+    'cumulative_actual_repetitions',
+    'cumulative_gap_repetitions',
+]
+
+
+def get_timeline_exercise_names(training_schedule:models.TrainingSchedule) -> list:
+    """Get the names of the exercises of the training plan followed by the other recorded exercises without loading the recorded activities"""
+    exercise_names = list(training_schedule.training_plan.exercises or {})
+    recorded_exercise_names = training_schedule.recorded_activities.order_by('exercise__name').values_list('exercise__name', flat=True).distinct()
+    exercise_names.extend(exercise_name for exercise_name in recorded_exercise_names if exercise_name not in exercise_names)
+    return exercise_names
+
+
+def iter_timeline(training_schedule:models.TrainingSchedule, start_date:datetime.date=None, end_date:datetime.date=None):
+    """
+    Yield one row per date and exercise with the absolute and cumulative target vs actual values
+
+    The schedule is walked once from its start date: the recorded activities are streamed in date order next to it and the
+    cumulative values are carried along, so memory use does not depend on the length of the training schedule.
+    Rows before start_date only feed the cumulative values and are not yielded.
+
+    Yields:
+        dict: with the keys of TIMELINE_FIELDS
+    """
+    start_date = start_date or training_schedule.start_date
+    end_date = end_date or training_schedule.end_date
+    exercise_names = get_timeline_exercise_names(training_schedule)
+    planned_exercise_names = training_schedule.training_plan.exercises or {}
+    recorded_activities = training_schedule.recorded_activities.order_by('date').values_list('date', 'exercise__name', 'reps_or_duration', 'weight').iterator()
+    next_recorded_activity = next(recorded_activities, None)
+    cumulative_target = dict.fromkeys(exercise_names, 0)
+    cumulative_actual = dict.fromkeys(exercise_names, 0)
+
+    date = min(start_date, training_schedule.start_date)
+    while date <= end_date:
+        actual_activities = dict()
+        while next_recorded_activity is not None and next_recorded_activity[0] <= date:
+            recorded_date, exercise_name, reps_or_duration, weight = next_recorded_activity
+            actual_activities[exercise_name] = [reps_or_duration, weight]
+            next_recorded_activity = next(recorded_activities, None)
+
+        in_schedule = training_schedule.start_date <= date <= training_schedule.end_date
+        for exercise_name in exercise_names:
+            if in_schedule and exercise_name in planned_exercise_names:
+                target = training_schedule.get_target_activity_absolute(date, exercise_name)
+            else:
+                target = [0, 0]
+            actual = actual_activities.get(exercise_name, [0, 0])
+            cumulative_target[exercise_name] += target[0]
+            cumulative_actual[exercise_name] += actual[0]
+            if date < start_date:
+                continue
+
+            yield {
+                'date': date.isoformat(),
+                'exercise': exercise_name,
+                'target_repetitions': target[0],
+                'target_weight': target[1],
+                'actual_repetitions': actual[0],
+                'actual_weight': actual[1],
+                'gap_repetitions': actual[0] - target[0],
+                'gap_weight': actual[1] - target[1],
+                'cumulative_target_repetitions': cumulative_target[exercise_name],
+                'cumulative_actual_repetitions': cumulative_actual[exercise_name],
+                'cumulative_gap_repetitions': cumulative_actual[exercise_name] - cumulative_target[exercise_name],
+            }
+
+        date += datetime.timedelta(days=1)
+
+
+class Echo:
+    """An object that implements just the write method of the file-like interface, so csv.writer returns the lines it writes"""
+
+    def write(self, value):
+        return value
+
+
+def iter_timeline_csv(training_schedule:models.TrainingSchedule, **kwargs):
+    """Yield the timeline of a training schedule as CSV lines, starting with a header line"""
+    writer = csv.DictWriter(Echo(), fieldnames=TIMELINE_FIELDS)
+    yield writer.writerow(dict(zip(TIMELINE_FIELDS, TIMELINE_FIELDS)))
+    for row in iter_timeline(training_schedule, **kwargs):
+        yield writer.writerow(row)
+
+
+def iter_timeline_ndjson(training_schedule:models.TrainingSchedule, **kwargs):
+    """Yield the timeline of a training schedule as newline delimited JSON"""
+    for row in iter_timeline(training_schedule, **kwargs):
+        yield json.dumps(row) + '\n'
@@ -1,9 +1,11 @@
 from django import forms
 from .import models
+from .reference import ReferenceModelChoiceField, ReferenceModelMultipleChoiceField
+from .widgets import ExerciseAutocompleteWidget
 
 
 class AddExerciseForm(forms.Form):
-    exercise = forms.ModelChoiceField(queryset=models.Exercise.objects.all(), help_text='Choose an exercise to add to the Training Plan')
+    exercise = forms.ModelChoiceField(queryset=models.Exercise.objects.all(), widget=ExerciseAutocompleteWidget, help_text='Choose an exercise to add to the Training Plan')
     starting_repetitions = forms.IntegerField(label='Starting repetitions/duration', initial=12, min_value=1, help_text='Starting repetitions or duration in seconds per training day')
     repetition_progression_per_week = forms.IntegerField(label='Repetition/Duration progression', initial=0, min_value=0, help_text='How many repetitions or seconds to add per week')
     starting_weight = forms.DecimalField(label='Starting weight', initial=0, min_value=0, help_text='Starting weight in kgs')
@@ -12,17 +14,37 @@ class AddExerciseForm(forms.Form):
 
 
 class RecordStrengthActivityForm(forms.Form):
-    exercise = forms.ModelChoiceField(queryset=models.Exercise.objects.filter(type="Strength"))
+    exercise = forms.ModelChoiceField(queryset=models.Exercise.objects.filter(type="Strength"), widget=ExerciseAutocompleteWidget(exercise_type="Strength"))
     date = forms.DateField()
     repetitions = forms.IntegerField(min_value=0)
     weight = forms.DecimalField(min_value=0)
     
 class RecordIsometricActivityForm(forms.Form):
-    exercise = forms.ModelChoiceField(queryset=models.Exercise.objects.filter(type="Isometric"))
+    exercise = forms.ModelChoiceField(queryset=models.Exercise.objects.filter(type="Isometric"), widget=ExerciseAutocompleteWidget(exercise_type="Isometric"))
     date = forms.DateField()
     duration = forms.IntegerField(min_value=0, help_text='Duration in seconds')
     
 class RecordCardioActivityForm(forms.Form):
-    exercise = forms.ModelChoiceField(queryset=models.Exercise.objects.filter(type="Cardio"))
+    exercise = forms.ModelChoiceField(queryset=models.Exercise.objects.filter(type="Cardio"), widget=ExerciseAutocompleteWidget(exercise_type="Cardio"))
     date = forms.DateField()
-    duration = forms.IntegerField(min_value=0, help_text='Duration in seconds')
\ No newline at end of file
+    duration = forms.IntegerField(min_value=0, help_text='Duration in seconds')
+
+class ExerciseFilterForm(forms.Form):
+    muscle_group = forms.ChoiceField(choices=[('', 'Any muscle group'), *models.Muscle.CHOICES], required=False)
+    equipment = ReferenceModelChoiceField(queryset=models.Equipment.objects.all(), empty_label='Any equipment', required=False)
+    type = forms.ChoiceField(choices=[('', 'Any type'), *models.Exercise.CHOICES], required=False)
+
+
+class ExerciseForm(forms.ModelForm):
+    primary_muscle_focus = ReferenceModelChoiceField(queryset=models.Muscle.objects.all())
+    secondary_muscle_focus = ReferenceModelChoiceField(queryset=models.Muscle.objects.all(), required=False)
+    equipment = ReferenceModelMultipleChoiceField(queryset=models.Equipment.objects.all(), required=False)
+
+    class Meta:
+        model = models.Exercise
+        fields = ['name', 'description', 'primary_muscle_focus', 'secondary_muscle_focus', 'equipment', 'type']
+
+
+class ExerciseAdminForm(ExerciseForm):
+    class Meta(ExerciseForm.Meta):
+        fields = ExerciseForm.Meta.fields + ['author']
@@ -0,0 +1,136 @@
+"""Bulk import of historical activities into training schedules"""
+import csv
+import datetime
+import itertools
+import json
+import time
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import models
+
+
+def read_csv_rows(file):
+    """Yield the rows of a CSV file with a header line as dictionaries"""
+    yield from csv.DictReader(file)
+
+
+def read_jsonl_rows(file):
+    """Yield the rows of a JSON lines file as dictionaries, skipping blank lines"""
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+class ActivityImporter:
+    """
+    Import activities into training schedules in chunks
+
+    Every row needs the keys exercise (name), date (ISO format) and either reps and weight (strength exercises) or duration
+    (isometric and cardio exercises). The training_schedule key (id) can be omitted if a default training schedule is given.
+    The activity type is taken from the exercise. Per chunk the activities are created with bulk inserts and the recorded
+    activities of the training schedules are upserted with a single query. Only one chunk is held in memory at a time.
+    """
+
+    def __init__(self, training_schedule:models.TrainingSchedule=None, chunk_size:int=1000):
+        self.training_schedule = training_schedule
+        self.chunk_size = chunk_size
+        self.training_schedules = dict()
+        self.exercises = dict()
+        self.training_schedule_ids = set()
+        self.rows = 0
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def import_rows(self, rows, on_chunk=None):
+        """Import the given rows, calling on_chunk(importer) after every chunk"""
+        rows = iter(rows)
+        start = time.perf_counter()
+        try:
+            while True:
+                chunk = list(itertools.islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                self._import_chunk(chunk)
+                self.rows += len(chunk)
+                self.seconds = time.perf_counter() - start
+                if on_chunk is not None:
+                    on_chunk(self)
+        finally:
+            # a single write per training schedule updates its summary counters and moves the cached analysis to a new version
+            models.TrainingSchedule.objects.filter(pk__in=self.training_schedule_ids).refresh_highlights()
+
+    def _get_training_schedule(self, row) -> models.TrainingSchedule:
+        training_schedule_id = row.get('training_schedule')
+        if not training_schedule_id:
+            if self.training_schedule is None:
+                raise ValueError("No training schedule given")
+            return self.training_schedule
+
+        if training_schedule_id not in self.training_schedules:
+            self.training_schedules[training_schedule_id] = models.TrainingSchedule.objects.only('id', 'athlete', 'start_date', 'duration').get(pk=training_schedule_id)
+        return self.training_schedules[training_schedule_id]
+
+    def _build_activity(self, row) -> tuple:
+        """Build the unsaved activity for a row together with its training schedule"""
+        training_schedule = self._get_training_schedule(row)
+        exercise = self.exercises.get(row['exercise'])
+        if exercise is None:
+            raise ValueError(f"Unknown exercise '{row['exercise']}'")
+
+        date = datetime.date.fromisoformat(row['date'])
+        if date < training_schedule.start_date or date > training_schedule.end_date:
+            raise ValueError(f"Given date {date} is outside the training schedule")
+
+        activity_model = models.ACTIVITY_KINDS[exercise.type]
+        if activity_model is models.StrengthActivity:
+            activity = activity_model(reps=int(float(row['reps'])), weight=int(float(row['weight'])))
+        else:
+            activity = activity_model(duration=int(float(row['duration'])))
+        activity.exercise = exercise
+        activity.date = date
+        activity.athlete_id = training_schedule.athlete_id
+        return training_schedule, activity
+
+    def _import_chunk(self, chunk):
+        # rows without a valid exercise name are reported by _build_activity
+        missing_exercises = {row.get('exercise') for row in chunk if isinstance(row.get('exercise'), str)} - self.exercises.keys()
+        if missing_exercises:
+            self.exercises.update(models.Exercise.objects.resolve_names(missing_exercises))
+
+        recorded_activities = dict()
+        activities = []
+        for line, row in enumerate(chunk, start=self.rows + 1):
+            try:
+                training_schedule, activity = self._build_activity(row)
+            except (KeyError, TypeError, ValueError, ValidationError, models.TrainingSchedule.DoesNotExist) as error:
+                raise ValueError(f"Row {line}: {error!r}") from error
+            activities.append(activity)
+
+            if isinstance(activity, models.StrengthActivity):
+                reps_or_duration, weight = float(activity.reps), float(activity.weight)
+            else:
+                reps_or_duration, weight = float(activity.duration), 0.0
+            # a later row for the same exercise on the same day replaces the earlier one, as in record_activity
+            recorded_activities[(training_schedule.pk, activity.date, activity.exercise.pk)] = models.RecordedActivity(
+                training_schedule=training_schedule,
+                date=activity.date,
+                exercise=activity.exercise,
+                activity=activity,
+                reps_or_duration=reps_or_duration,
+                weight=weight,
+            )
+
+        with transaction.atomic():
+            models.Activity.objects.bulk_create(activities)
+            models.RecordedActivity.objects.bulk_create(
+                recorded_activities.values(),
+                update_conflicts=True,
+                unique_fields=['training_schedule', 'date', 'exercise'],
+                update_fields=['activity', 'reps_or_duration', 'weight', 'updated'],
+            )
+        self.training_schedule_ids.update(training_schedule_id for training_schedule_id, date, exercise_id in recorded_activities)
@@ -0,0 +1,113 @@
+"""Handlers of the background jobs queued in the Job table and the worker loop running them"""
+import logging
+import time
+import traceback
+from pathlib import Path
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, connection
+from django.utils import timezone
+
+from . import importers, models, propagation
+
+
+logger = logging.getLogger(__name__)
+
+# {job name: handler(job)}
+HANDLERS = dict()
+
+
+def handler(name:str):
+    """Register the decorated function as the handler of the jobs with the given name"""
+    def register(function):
+        HANDLERS[name] = function
+        return function
+    return register
+
+
+@handler('add_target_activities')
+def add_target_activities(job:models.Job):
+    training_schedule = job.training_schedule
+    # the training schedule may have been materialised by an earlier attempt
+    if training_schedule is not None and training_schedule.has_lazy_targets:
+        training_schedule._add_target_activities()
+
+
+@handler('propagate_exercises')
+def propagate_exercises(job:models.Job):
+    training_plan = models.TrainingPlan.objects.filter(pk=job.payload['training_plan_id']).first()
+    if training_plan is not None:
+        propagation.propagate_exercises(training_plan, job.payload.get('exercise_names'))
+
+
+@handler('import_activities')
+def import_activities(job:models.Job):
+    importer = importers.ActivityImporter(training_schedule=job.training_schedule, chunk_size=job.payload['chunk_size'])
+    read_rows = importers.read_jsonl_rows if job.payload['format'] == 'jsonl' else importers.read_csv_rows
+    with Path(job.payload['path']).open(newline='') as file:
+        importer.import_rows(read_rows(file))
+
+
+def run_job(job:models.Job) -> bool:
+    """
+    Run a claimed job with its handler and store whether it succeeded
+
+    A failed job is queued again until it was attempted JOB_MAX_ATTEMPTS times, the error of the last attempt is kept.
+
+    Returns:
+        bool: True if the job is done, False if it failed
+    """
+    try:
+        HANDLERS[job.name](job)
+    except Exception:
+        job.status = models.Job.QUEUED if job.attempts < settings.JOB_MAX_ATTEMPTS else models.Job.FAILED
+        job.error = traceback.format_exc()
+    else:
+        job.status = models.Job.DONE
+        job.error = ''
+    job.finished = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished'])
+    return job.status == models.Job.DONE
+
+
+def run_pending_jobs(max_jobs:int=None) -> int:
+    """
+    Claim and run queued jobs until none is left or max_jobs were run
+
+    Returns:
+        int: number of jobs run
+    """
+    jobs = 0
+    while max_jobs is None or jobs < max_jobs:
+        job = models.Job.objects.claim()
+        if job is None:
+            break
+        run_job(job)
+        jobs += 1
+    return jobs
+
+
+def run_worker(poll_interval:float=1.0, burst:bool=False, on_job=None):
+    """
+    Run queued jobs, polling for new jobs every poll_interval seconds, until the queue is empty if burst is set
+
+    A claim that fails because the database is locked or the connection was lost is retried after poll_interval.
+    """
+    while True:
+        # like between requests, unless the worker runs inside a transaction of the caller, e.g. in tests
+        if not connection.in_atomic_block:
+            close_old_connections()
+        try:
+            job = models.Job.objects.claim()
+        except OperationalError:
+            logger.warning("Claiming a job failed, retrying in %ss", poll_interval, exc_info=True)
+            time.sleep(poll_interval)
+            continue
+        if job is None:
+            if burst:
+                return
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        if on_job is not None:
+            on_job(job)
@@ -0,0 +1,78 @@
+"""Filtering of the exercise library and the similar exercises adjacency"""
+import heapq
+import itertools
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from . import caching, models
+
+
+def filter_exercises(muscle_group:str=None, equipment:models.Equipment=None, type:str=None):
+    """Get the exercises of the library with the given muscle group (primary or secondary), equipment and type, ordered by name"""
+    exercises = models.Exercise.objects.order_by('name', 'id')
+    if muscle_group:
+        exercises = exercises.filter(Q(primary_muscle_focus__muscle_group=muscle_group) | Q(secondary_muscle_focus__muscle_group=muscle_group))
+    if equipment:
+        exercises = exercises.filter(equipment=equipment)
+    if type:
+        exercises = exercises.filter(type=type)
+    return exercises
+
+
+def build_exercise_adjacency() -> dict:
+    """
+    Build the exercises per muscle with a single query over the exercise table
+
+    Returns:
+        dict: {'exercises': [(name, id)], 'muscles': {muscle_id: [(name, id)]}}, every list ordered by name
+    """
+    exercises = []
+    muscles = dict()
+    rows = models.Exercise.objects.order_by('name', 'id').values_list('name', 'id', 'primary_muscle_focus_id', 'secondary_muscle_focus_id')
+    for name, exercise_id, primary_muscle_focus_id, secondary_muscle_focus_id in rows:
+        exercises.append((name, exercise_id))
+        for muscle_id in {primary_muscle_focus_id, secondary_muscle_focus_id} - {None}:
+            muscles.setdefault(muscle_id, []).append((name, exercise_id))
+    return {'exercises': exercises, 'muscles': muscles}
+
+
+def get_exercise_adjacency() -> dict:
+    """Get the exercises per muscle of the current version of the exercise library, built once per version"""
+    cache_key = caching.get_exercise_library_cache_key('exercise_adjacency')
+    return cache.get_or_set(cache_key, build_exercise_adjacency, settings.EXERCISE_LIBRARY_CACHE_TIMEOUT)
+
+
+def get_similar_exercises(exercise:models.Exercise, adjacency:dict=None) -> list:
+    """
+    Get the other exercises sharing the primary or secondary muscle focus of the given exercise
+
+    Returns:
+        list: [(name, id)] ordered by name
+    """
+    adjacency = adjacency or get_exercise_adjacency()
+    muscle_ids = {exercise.primary_muscle_focus_id, exercise.secondary_muscle_focus_id} - {None}
+    similar_exercises = heapq.merge(*(adjacency['muscles'].get(muscle_id, []) for muscle_id in muscle_ids))
+    return [
+        (name, exercise_id)
+        for (name, exercise_id), group in itertools.groupby(similar_exercises)
+        if exercise_id != exercise.id
+    ]
+
+
+def get_other_exercises(exercise:models.Exercise, similar_exercises:list, limit:int, adjacency:dict=None) -> list:
+    """
+    Get up to limit exercises that are neither the given exercise nor similar to it
+
+    Returns:
+        list: [(name, id)] ordered by name
+    """
+    adjacency = adjacency or get_exercise_adjacency()
+    excluded_ids = {exercise.id, *(exercise_id for name, exercise_id in similar_exercises)}
+    other_exercises = (
+        (name, exercise_id)
+        for name, exercise_id in adjacency['exercises']
+        if exercise_id not in excluded_ids
+    )
+    return list(itertools.islice(other_exercises, limit))
@@ -0,0 +1,29 @@
+import itertools
+import json
+
+from django.core.management.base import BaseCommand
+
+from app import benchmarks
+
+
+def integer_list(value):
+    return [int(item) for item in value.split(',')]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the training schedule computations on synthetic data and print the results as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--weeks', type=integer_list, default=[4, 52], help="Comma separated durations of the training schedules in weeks")
+        parser.add_argument('--exercises', type=integer_list, default=[5, 20], help="Comma separated numbers of exercises in the training plan")
+        parser.add_argument('--recorded-days', type=integer_list, default=[30], help="Comma separated numbers of training days with recorded activities")
+        parser.add_argument('--output', help="Write the results to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        scales = itertools.product(options['weeks'], options['exercises'], options['recorded_days'])
+        results = json.dumps(benchmarks.run_benchmarks(scales), indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(results)
+        else:
+            self.stdout.write(results)
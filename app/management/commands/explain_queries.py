@@ -0,0 +1,51 @@
+import datetime
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import F, Sum
+from django.db.models.functions import TruncWeek
+
+from app import models
+
+
+class Command(BaseCommand):
+    help = "Print the query plans of the project's hot queries on the current database backend"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help="Execute the queries and report actual timings (PostgreSQL only)")
+
+    def get_hot_queries(self) -> dict:
+        """The hot queries with ids of existing rows where possible, otherwise with placeholder ids"""
+        athlete_id = get_user_model().objects.values_list('pk', flat=True).first() or 0
+        exercise_id = models.Exercise.objects.values_list('pk', flat=True).first() or uuid.uuid4()
+        training_schedule_id = models.TrainingSchedule.objects.values_list('pk', flat=True).first() or uuid.uuid4()
+        start_date = datetime.date.today() - datetime.timedelta(weeks=12)
+        end_date = datetime.date.today()
+
+        return {
+            'Activity history of an athlete': models.Activity.objects.filter(athlete_id=athlete_id, date__range=(start_date, end_date)).order_by('date'),
+            'Exercise history of an athlete': models.Activity.objects.filter(athlete_id=athlete_id, exercise_id=exercise_id).order_by('-date'),
+            'Strength activity list': models.StrengthActivity.objects.select_related('exercise')[:100],
+            'Strength activity rollup per week': (
+                models.StrengthActivity.objects.filter(athlete_id=athlete_id, date__range=(start_date, end_date))
+                .annotate(period_start=TruncWeek('date'), muscle_group=F('exercise__primary_muscle_focus__muscle_group'))
+                .values('period_start', 'muscle_group')
+                .annotate(volume=Sum(F('reps') * F('weight')))
+                .order_by()
+            ),
+            'Recorded activities of a training schedule': models.RecordedActivity.objects.filter(training_schedule_id=training_schedule_id).order_by('date').values_list('date', 'exercise__name', 'reps_or_duration', 'weight'),
+            'Recorded activity of a day': models.RecordedActivity.objects.filter(training_schedule_id=training_schedule_id, date=end_date, exercise_id=exercise_id),
+            'Training schedule analysis version': models.TrainingSchedule.objects.filter(pk=training_schedule_id).values_list('updated', 'training_plan__updated'),
+            'Training schedules of an athlete': models.TrainingSchedule.objects.filter(athlete_id=athlete_id).select_related('training_plan'),
+            'Exercises by name': models.Exercise.objects.filter(name__in=['Squat', 'Push-up']),
+        }
+
+    def handle(self, *args, **options):
+        explain_options = {'analyze': True} if options['analyze'] and connection.vendor == 'postgresql' else {}
+        self.stdout.write(f"Query plans on {connection.vendor}")
+        for name, queryset in self.get_hot_queries().items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{name}"))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(**explain_options))
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from app import importers, models
+
+
+class Command(BaseCommand):
+    help = "Import historical activities from a CSV or JSON lines file into training schedules"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file with a header line or JSON lines file (.jsonl)")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="File format, derived from the file extension by default")
+        parser.add_argument('--training-schedule', help="Id of the training schedule for rows without a training_schedule column")
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Number of rows written per bulk insert")
+        parser.add_argument('--background', action='store_true', help="Queue the import for the run_worker command, the path must be readable by the worker")
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        path = Path(options['path'])
+        file_format = options['format'] or ('jsonl' if path.suffix in ('.jsonl', '.ndjson') else 'csv')
+        training_schedule = None
+        if options['training_schedule']:
+            try:
+                training_schedule = models.TrainingSchedule.objects.get(pk=options['training_schedule'])
+            except (models.TrainingSchedule.DoesNotExist, ValidationError):
+                raise CommandError(f"Training schedule {options['training_schedule']} does not exist")
+
+        if options['background']:
+            job = models.Job.objects.enqueue(
+                'import_activities',
+                training_schedule=training_schedule,
+                path=str(path.resolve()),
+                format=file_format,
+                chunk_size=options['chunk_size'],
+            )
+            self.stdout.write(self.style.SUCCESS(f"Queued the import as job {job.pk}"))
+            return
+
+        importer = importers.ActivityImporter(training_schedule=training_schedule, chunk_size=options['chunk_size'])
+        read_rows = importers.read_jsonl_rows if file_format == 'jsonl' else importers.read_csv_rows
+        with path.open(newline='') as file:
+            try:
+                importer.import_rows(read_rows(file), on_chunk=self.report_progress)
+            except ValueError as error:
+                raise CommandError(f"Import stopped after {importer.rows} rows: {error}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {importer.rows} activities into {len(importer.training_schedule_ids)} training schedules "
+            f"in {importer.seconds:.1f}s ({importer.rows_per_second:.0f} rows/s)"
+        ))
+
+    def report_progress(self, importer):
+        if self.verbosity > 1:
+            self.stdout.write(f"{importer.rows} rows imported ({importer.rows_per_second:.0f} rows/s)")
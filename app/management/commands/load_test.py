@@ -0,0 +1,23 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from app import benchmarks
+
+
+class Command(BaseCommand):
+    help = "Send concurrent requests to a running server and print the throughput and latencies as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help="URL to request, e.g. the analysis of a training schedule")
+        parser.add_argument('--requests', type=int, default=200, help="Total number of requests")
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50], help="Numbers of concurrent requests to test")
+        parser.add_argument('--session', help="Session id sent as the sessionid cookie, for views requiring a login")
+
+    def handle(self, *args, **options):
+        headers = {'Cookie': f"sessionid={options['session']}"} if options['session'] else None
+        results = [
+            benchmarks.run_load_test(options['url'], options['requests'], concurrency, headers)
+            for concurrency in options['concurrency']
+        ]
+        self.stdout.write(json.dumps(results, indent=2))
@@ -0,0 +1,33 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from app import models, propagation
+
+
+class Command(BaseCommand):
+    help = "Patch the exercises of training plans into the materialised target activities of their training schedules"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--training-plan', help="Id of the training plan, all training plans by default")
+        parser.add_argument('--exercise', action='append', dest='exercises', help="Name of a changed exercise, all exercises of the training plan by default")
+        parser.add_argument('--batch-size', type=int, help="Number of training schedules updated per transaction")
+
+    def handle(self, *args, **options):
+        training_plans = models.TrainingPlan.objects.all()
+        if options['training_plan']:
+            try:
+                training_plans = training_plans.filter(pk=options['training_plan'])
+                training_plan_exists = training_plans.exists()
+            except (ValidationError, ValueError):
+                training_plan_exists = False
+            if not training_plan_exists:
+                raise CommandError(f"Training plan {options['training_plan']} does not exist")
+
+        total = 0
+        for training_plan in training_plans.iterator():
+            updated = propagation.propagate_exercises(training_plan, options['exercises'], options['batch_size'])
+            total += updated
+            if options['verbosity'] > 1:
+                self.stdout.write(f"{training_plan}: {updated} training schedules updated")
+
+        self.stdout.write(self.style.SUCCESS(f"Updated the target activities of {total} training schedules"))
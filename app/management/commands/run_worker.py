@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from app import jobs
+
+
+class Command(BaseCommand):
+    help = "Run the queued background jobs, e.g. the generation of target activities"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to wait before looking for new jobs when the queue is empty")
+        parser.add_argument('--burst', action='store_true', help="Stop when the queue is empty")
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        jobs.run_worker(poll_interval=options['poll_interval'], burst=options['burst'], on_job=self.report_job)
+
+    def report_job(self, job):
+        if job.status == job.DONE:
+            if self.verbosity > 0:
+                self.stdout.write(f"{job} {job.pk} in {(job.finished - job.started).total_seconds():.1f}s")
+        else:
+            self.stderr.write(f"{job} {job.pk}\n{job.error}")
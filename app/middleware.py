@@ -0,0 +1,114 @@
+import contextlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+# Aggregated metrics of this process per URL name
+request_stats = dict()
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class RequestMetrics:
+    """SQL, template and total timings of a single request"""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.total_seconds = 0.0
+        self.template_start = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper counting and timing the queries"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_seconds += time.perf_counter() - start
+
+    def stop_template_timer(self, response):
+        self.template_seconds += time.perf_counter() - self.template_start
+
+    def get_server_timing(self) -> str:
+        return ', '.join([
+            f'sql;dur={self.sql_seconds * 1000:.1f};desc="{self.queries} queries"',
+            f'template;dur={self.template_seconds * 1000:.1f}',
+            f'total;dur={self.total_seconds * 1000:.1f}',
+        ])
+
+
+class RequestMetricsMiddleware:
+    """
+    Record the number and time of SQL queries, the template render time and the total time of every request
+
+    The metrics are added to the response as Server-Timing and X-Query-Count headers, logged and aggregated per URL name in
+    request_stats. Requests exceeding their budget in REQUEST_METRICS_QUERY_BUDGETS ({url_name: max_queries}) are logged as
+    warnings or, with REQUEST_METRICS_RAISE_ON_BUDGET, raise QueryBudgetExceeded. Template render time is measured for views
+    returning a TemplateResponse. Enabled with the REQUEST_METRICS setting.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.metrics = metrics = RequestMetrics()
+        start = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+        metrics.total_seconds = time.perf_counter() - start
+
+        url_name = request.resolver_match.url_name if request.resolver_match else None
+        response.headers['Server-Timing'] = metrics.get_server_timing()
+        response.headers['X-Query-Count'] = str(metrics.queries)
+        self.record(url_name, metrics)
+        logger.info(
+            "%s %s: %d queries in %.1fms, template %.1fms, total %.1fms",
+            url_name, request.path, metrics.queries, metrics.sql_seconds * 1000, metrics.template_seconds * 1000, metrics.total_seconds * 1000,
+        )
+        self.check_budget(url_name, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        request.metrics.template_start = time.perf_counter()
+        response.add_post_render_callback(request.metrics.stop_template_timer)
+        return response
+
+    def record(self, url_name, metrics):
+        stats = request_stats.setdefault(url_name, {
+            'requests': 0,
+            'queries': 0,
+            'max_queries': 0,
+            'sql_seconds': 0.0,
+            'template_seconds': 0.0,
+            'total_seconds': 0.0,
+        })
+        stats['requests'] += 1
+        stats['queries'] += metrics.queries
+        stats['max_queries'] = max(stats['max_queries'], metrics.queries)
+        stats['sql_seconds'] += metrics.sql_seconds
+        stats['template_seconds'] += metrics.template_seconds
+        stats['total_seconds'] += metrics.total_seconds
+
+    def check_budget(self, url_name, metrics):
+        budget = settings.REQUEST_METRICS_QUERY_BUDGETS.get(url_name)
+        if budget is None or metrics.queries <= budget:
+            return
+
+        message = f"View '{url_name}' ran {metrics.queries} queries, its budget is {budget}"
+        if settings.REQUEST_METRICS_RAISE_ON_BUDGET:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -0,0 +1,148 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:39
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+def copy_actual_activities_to_recorded_activities(apps, schema_editor):
+    TrainingSchedule = apps.get_model("app", "TrainingSchedule")
+    RecordedActivity = apps.get_model("app", "RecordedActivity")
+    Exercise = apps.get_model("app", "Exercise")
+
+    exercises = dict()
+    for exercise in Exercise.objects.order_by("created"):
+        exercises.setdefault(exercise.name, exercise)
+
+    # actual_activities is dropped below, an activity that cannot be copied would be lost for good
+    unresolved_exercise_names = set()
+    for actual_activities in (
+        TrainingSchedule.objects.exclude(actual_activities=None)
+        .values_list("actual_activities", flat=True)
+        .iterator()
+    ):
+        for values in actual_activities.values():
+            unresolved_exercise_names.update(values.keys() - exercises.keys())
+    if unresolved_exercise_names:
+        raise RuntimeError(
+            "The actual activities of training schedules name exercises that do not exist: "
+            f"{', '.join(sorted(unresolved_exercise_names))}. Create or rename these exercises before migrating."
+        )
+
+    for training_schedule in TrainingSchedule.objects.exclude(
+        actual_activities=None
+    ).iterator():
+        recorded_activities = []
+        for date_key, values in training_schedule.actual_activities.items():
+            for exercise_name, (reps_or_duration, weight) in values.items():
+                recorded_activities.append(
+                    RecordedActivity(
+                        training_schedule=training_schedule,
+                        date=date_key,
+                        exercise=exercises[exercise_name],
+                        reps_or_duration=reps_or_duration,
+                        weight=weight,
+                    )
+                )
+        RecordedActivity.objects.bulk_create(recorded_activities)
+
+
+def copy_recorded_activities_to_actual_activities(apps, schema_editor):
+    TrainingSchedule = apps.get_model("app", "TrainingSchedule")
+    RecordedActivity = apps.get_model("app", "RecordedActivity")
+
+    actual_activities = dict()
+    for training_schedule_id, date, exercise_name, reps_or_duration, weight in (
+        RecordedActivity.objects.order_by("date")
+        .values_list(
+            "training_schedule_id",
+            "date",
+            "exercise__name",
+            "reps_or_duration",
+            "weight",
+        )
+        .iterator()
+    ):
+        actual_activities.setdefault(training_schedule_id, {}).setdefault(
+            date.isoformat(), {}
+        )[exercise_name] = [reps_or_duration, weight]
+
+    for training_schedule_id, activities in actual_activities.items():
+        TrainingSchedule.objects.filter(pk=training_schedule_id).update(
+            actual_activities=activities
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0011_alter_trainingplan_description_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecordedActivity",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "reps_or_duration",
+                    models.FloatField(help_text="Repetitions or duration in seconds"),
+                ),
+                ("weight", models.FloatField(help_text="Weight in kgs")),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("updated", models.DateTimeField(auto_now=True)),
+                (
+                    "activity",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="The activity that was recorded last",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="app.activity",
+                    ),
+                ),
+                (
+                    "exercise",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="app.exercise",
+                    ),
+                ),
+                (
+                    "training_schedule",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recorded_activities",
+                        to="app.trainingschedule",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["date"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="recordedactivity",
+            constraint=models.UniqueConstraint(
+                fields=("training_schedule", "date", "exercise"),
+                name="unique_recorded_activity_per_day",
+            ),
+        ),
+        migrations.RunPython(
+            copy_actual_activities_to_recorded_activities,
+            copy_recorded_activities_to_actual_activities,
+        ),
+        migrations.RemoveField(
+            model_name="trainingschedule",
+            name="actual_activities",
+        ),
+    ]
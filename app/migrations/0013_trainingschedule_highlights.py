@@ -0,0 +1,54 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:48
+
+from django.db import migrations, models
+
+
+def count_recorded_activities(apps, schema_editor):
+    TrainingSchedule = apps.get_model("app", "TrainingSchedule")
+    RecordedActivity = apps.get_model("app", "RecordedActivity")
+
+    for training_schedule_id in TrainingSchedule.objects.values_list("pk", flat=True):
+        counters = RecordedActivity.objects.filter(
+            training_schedule_id=training_schedule_id
+        ).aggregate(
+            recorded_days_count=models.Count("date", distinct=True),
+            recorded_activities_count=models.Count("pk"),
+            recorded_exercises_count=models.Count("exercise", distinct=True),
+        )
+        TrainingSchedule.objects.filter(pk=training_schedule_id).update(**counters)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0012_recordedactivity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="trainingschedule",
+            name="recorded_activities_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, help_text="Number of recorded activities"
+            ),
+        ),
+        migrations.AddField(
+            model_name="trainingschedule",
+            name="recorded_days_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Number of days with recorded activities",
+            ),
+        ),
+        migrations.AddField(
+            model_name="trainingschedule",
+            name="recorded_exercises_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Number of different exercises recorded",
+            ),
+        ),
+        migrations.RunPython(count_recorded_activities, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0013_trainingschedule_highlights"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="activity",
+            index=models.Index(
+                fields=["athlete", "date"], name="activity_athlete_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="activity",
+            index=models.Index(
+                fields=["exercise", "date"], name="activity_exercise_date_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.7 on 2026-10-18 19:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0014_activity_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="exercise",
+            name="name",
+            field=models.CharField(db_index=True, max_length=150),
+        ),
+        migrations.AddIndex(
+            model_name="activity",
+            index=models.Index(
+                fields=["athlete", "exercise", "date"],
+                name="activity_athlete_ex_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="activity",
+            index=models.Index(
+                fields=["-date", "exercise"], name="activity_date_exercise_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="trainingschedule",
+            index=models.Index(
+                fields=["athlete", "-start_date"], name="schedule_athlete_start_idx"
+            ),
+        ),
+    ]
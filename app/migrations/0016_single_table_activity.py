@@ -0,0 +1,156 @@
+# Generated by Django 5.0.7 on 2026-10-18 20:05
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+ACTIVITY_FIELDS = {
+    "StrengthActivity": ("Strength", ["reps", "weight"]),
+    "IsometricActivity": ("Isometric", ["duration"]),
+    "CardioActivity": ("Cardio", ["duration"]),
+}
+
+
+# The new columns of the activity table get temporary names until the activity types are
+# deleted, their own reps, weight and duration columns would clash with them otherwise.
+def copy_child_rows_to_activities(apps, schema_editor):
+    Activity = apps.get_model("app", "Activity")
+
+    for model_name, (kind, fields) in ACTIVITY_FIELDS.items():
+        ActivityType = apps.get_model("app", model_name)
+        child_rows = ActivityType.objects.filter(activity_ptr=OuterRef("pk"))
+        Activity.objects.filter(
+            pk__in=ActivityType.objects.values("activity_ptr")
+        ).update(
+            kind=kind,
+            **{
+                f"activity_{field}": Subquery(child_rows.values(field)[:1])
+                for field in fields
+            },
+        )
+
+
+def copy_activities_to_child_rows(apps, schema_editor):
+    Activity = apps.get_model("app", "Activity")
+
+    for model_name, (kind, fields) in ACTIVITY_FIELDS.items():
+        ActivityType = apps.get_model("app", model_name)
+        for values in (
+            Activity.objects.filter(kind=kind)
+            .values("pk", *(f"activity_{field}" for field in fields))
+            .iterator()
+        ):
+            activity_ptr_id = values.pop("pk")
+            ActivityType(
+                activity_ptr_id=activity_ptr_id,
+                **{field: values[f"activity_{field}"] for field in fields},
+            ).save_base(raw=True, force_insert=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0015_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="activity",
+            options={"verbose_name_plural": "activities"},
+        ),
+        migrations.AddField(
+            model_name="activity",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("Strength", "Strength"),
+                    ("Isometric", "Isometric"),
+                    ("Cardio", "Cardio"),
+                ],
+                default="Strength",
+                max_length=50,
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="activity",
+            name="activity_duration",
+            field=models.IntegerField(
+                blank=True, help_text="Duration in seconds", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="activity",
+            name="activity_reps",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="activity",
+            name="activity_weight",
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(
+            copy_child_rows_to_activities,
+            copy_activities_to_child_rows,
+        ),
+        migrations.DeleteModel(
+            name="CardioActivity",
+        ),
+        migrations.DeleteModel(
+            name="IsometricActivity",
+        ),
+        migrations.DeleteModel(
+            name="StrengthActivity",
+        ),
+        migrations.RenameField(
+            model_name="activity",
+            old_name="activity_duration",
+            new_name="duration",
+        ),
+        migrations.RenameField(
+            model_name="activity",
+            old_name="activity_reps",
+            new_name="reps",
+        ),
+        migrations.RenameField(
+            model_name="activity",
+            old_name="activity_weight",
+            new_name="weight",
+        ),
+        migrations.CreateModel(
+            name="CardioActivity",
+            fields=[],
+            options={
+                "verbose_name_plural": "Cardio activities",
+                "ordering": ["-date", "exercise"],
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("app.activity",),
+        ),
+        migrations.CreateModel(
+            name="IsometricActivity",
+            fields=[],
+            options={
+                "verbose_name_plural": "Isometric activities",
+                "ordering": ["-date", "exercise"],
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("app.activity",),
+        ),
+        migrations.CreateModel(
+            name="StrengthActivity",
+            fields=[],
+            options={
+                "verbose_name_plural": "Strength activities",
+                "ordering": ["-date", "exercise"],
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("app.activity",),
+        ),
+    ]
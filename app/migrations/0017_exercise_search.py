@@ -0,0 +1,31 @@
+# Generated by Django 5.0.7 on 2026-10-18 21:10
+
+from django.db import migrations
+
+
+def create_search_indexes(apps, schema_editor):
+    # full-text and trigram search are only used on Postgres, other databases use an in-process index
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS exercise_name_trgm_idx "
+        "ON app_exercise USING gin (name gin_trgm_ops)"
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS exercise_name_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0016_single_table_activity"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -1,14 +1,16 @@
+import bisect
 import calendar
 import datetime 
 import uuid
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import JSONField
-from django.db import models
+from django.db import connection, models, transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.urls import reverse
-
-from src import settings
+from django.utils import timezone
 
 
 
@@ -45,9 +47,23 @@ class Equipment(models.Model):
     def __str__(self):
         return self.name
     
+class ExerciseQuerySet(models.QuerySet):
+    def resolve_names(self, exercise_names) -> dict:
+        """
+        Resolve the given exercise names to exercises with a single query
+        
+        Returns:
+            dict: {exercise_name: exercise}, names without a matching exercise are left out
+        """
+        exercises = dict()
+        for exercise in self.filter(name__in=list(exercise_names)):
+            exercises.setdefault(exercise.name, exercise)
+        return exercises
+
+
 class Exercise(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    name = models.CharField(max_length=150)
+    name = models.CharField(max_length=150, db_index=True)
     description = models.TextField(blank=True, null=True)
     primary_muscle_focus = models.ForeignKey(Muscle, related_name='primary_exercises', on_delete=models.CASCADE)
     secondary_muscle_focus = models.ForeignKey(Muscle, related_name='secondary_exercises', on_delete=models.CASCADE, blank=True, null=True)
@@ -65,6 +81,8 @@ class Exercise(models.Model):
         on_delete=models.CASCADE,
         verbose_name="Created by"
         )
+    
+    objects = ExerciseQuerySet.as_manager()
 
     class Meta:
         ordering = ['type', 'name']
@@ -77,7 +95,19 @@ class Exercise(models.Model):
         return self.name
     
     
+class ActivityKindManager(models.Manager):
+    """Manager of an activity proxy model that only returns the activities of its kind"""
+    def get_queryset(self):
+        return super().get_queryset().filter(kind=self.model.KIND)
+
+
 class Activity(models.Model):
+    """
+    An activity of any kind, stored in a single table
+    
+    The kind column tells the activity types apart, which are proxy models with their own manager. Activities loaded through
+    Activity itself are returned as instances of the proxy model of their kind.
+    """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     exercise = models.ForeignKey(Exercise, on_delete=models.CASCADE)
     date = models.DateField()
@@ -88,12 +118,49 @@ class Activity(models.Model):
         on_delete=models.CASCADE,
         verbose_name="Executed by"
         )
+    CHOICES = (
+        ('Strength', 'Strength'),
+        ('Isometric', 'Isometric'),
+        ('Cardio', 'Cardio'),
+    )
+    kind = models.CharField(max_length=50, choices=CHOICES)
+    reps = models.IntegerField(blank=True, null=True)
+    weight = models.IntegerField(blank=True, null=True)
+    duration = models.IntegerField(blank=True, null=True, help_text="Duration in seconds")
+    
+    KIND = None
+    
+    class Meta:
+        verbose_name_plural = 'activities'
+        indexes = [
+            models.Index(fields=['athlete', 'date'], name='activity_athlete_date_idx'),
+            models.Index(fields=['athlete', 'exercise', 'date'], name='activity_athlete_ex_date_idx'),
+            models.Index(fields=['exercise', 'date'], name='activity_exercise_date_idx'),
+            models.Index(fields=['-date', 'exercise'], name='activity_date_exercise_idx'),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if cls is Activity and instance.__dict__.get('kind') in ACTIVITY_KINDS:
+            instance.__class__ = ACTIVITY_KINDS[instance.kind]
+        return instance
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.KIND is not None and not self.kind:
+            self.kind = self.KIND
+    
+    def __str__(self):
+        return f"{self.kind} activity for {self.exercise.name}"
     
 class StrengthActivity(Activity):
-    reps = models.IntegerField()
-    weight = models.IntegerField()
+    KIND = 'Strength'
+    
+    objects = ActivityKindManager()
     
     class Meta:
+        proxy = True
         ordering = ['-date', 'exercise']
         verbose_name_plural = 'Strength activities'
         
@@ -101,9 +168,12 @@ class StrengthActivity(Activity):
         return f"Strength activity for {self.exercise.name} - {self.reps} reps - {self.weight} kg"
     
 class IsometricActivity(Activity):
-    duration = models.IntegerField(help_text="Duration in seconds")
+    KIND = 'Isometric'
+    
+    objects = ActivityKindManager()
     
     class Meta:
+        proxy = True
         ordering = ['-date', 'exercise']
         verbose_name_plural = 'Isometric activities'
         
@@ -111,15 +181,38 @@ class IsometricActivity(Activity):
         return f"Isometric activity for {self.exercise.name} - {self.duration} seconds hold"
     
 class CardioActivity(Activity):
-    duration = models.IntegerField(help_text="Duration in seconds")
+    KIND = 'Cardio'
+    
+    objects = ActivityKindManager()
     
     class Meta:
+        proxy = True
         ordering = ['-date', 'exercise']
         verbose_name_plural = 'Cardio activities'
         
     def __str__(self):
         return f"Cardio activity for {self.exercise.name} - {self.duration} seconds"
 
+ACTIVITY_KINDS = {activity_model.KIND: activity_model for activity_model in (StrengthActivity, IsometricActivity, CardioActivity)}
+
+class JSONObjectLength(models.Func):
+    """Number of keys of a JSON object, 0 for NULL"""
+    function = 'JSON_LENGTH'
+    output_field = models.IntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='(SELECT COUNT(*) FROM json_each(%(expressions)s))', **extra_context)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='(SELECT COUNT(*) FROM jsonb_object_keys(%(expressions)s))', **extra_context)
+
+
+class TrainingPlanQuerySet(models.QuerySet):
+    def summary(self):
+        """Load the training plans for lists without their exercises, only their number is annotated as exercise_count"""
+        return self.defer('exercises').annotate(exercise_count=JSONObjectLength('exercises'))
+
+
 class TrainingPlan(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=150, help_text="Name of the training plan.")
@@ -133,15 +226,57 @@ class TrainingPlan(models.Model):
         )
     exercises = JSONField(blank=True, null=True)
     
+    objects = TrainingPlanQuerySet.as_manager()
+    
     class Meta:
         ordering = ['name']
         
     def get_absolute_url(self):
         return reverse('training_plan_detail', args=[str(self.id)])
     
+    def resolve_exercises(self) -> tuple:
+        """
+        Resolve the exercises of the training plan and the equipment they require with a fixed number of queries
+        
+        Returns:
+            tuple: ({exercise: [starting_reps, reps_progression, starting_weight, weight_progression]}, [equipment_name, ...]) in the order of the training plan
+        """
+        exercises = dict()
+        equipment_list = []
+        if not self.exercises:
+            return exercises, equipment_list
+        
+        resolved_exercises = Exercise.objects.prefetch_related('equipment').resolve_names(self.exercises.keys())
+        for exercise_name, values in self.exercises.items():
+            if exercise_name not in resolved_exercises:
+                continue
+            exercise = resolved_exercises[exercise_name]
+            exercises[exercise] = values
+            for equipment in exercise.equipment.all():
+                if equipment.name not in equipment_list:
+                    equipment_list.append(equipment.name)
+        
+        return exercises, equipment_list
+    
     def __str__(self):
         return self.name
     
+class TrainingScheduleQuerySet(models.QuerySet):
+    def summary(self):
+        """Load the training schedules with their training plan for lists, without the large JSON columns of both"""
+        return self.select_related('training_plan').defer('target_activities', 'training_plan__exercises')
+
+    def refresh_highlights(self):
+        """Recount the summary counters of the training schedules from their recorded activities, with one update per training schedule"""
+        for training_schedule_id in self.values_list('pk', flat=True):
+            counters = RecordedActivity.objects.filter(training_schedule_id=training_schedule_id).aggregate(
+                recorded_days_count=models.Count('date', distinct=True),
+                recorded_activities_count=models.Count('pk'),
+                recorded_exercises_count=models.Count('exercise', distinct=True),
+            )
+            TrainingSchedule.objects.filter(pk=training_schedule_id).update(updated=timezone.now(), **counters)
+
+
 class TrainingSchedule(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     athlete = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -168,7 +303,11 @@ class TrainingSchedule(models.Model):
     train_on_saturdays = models.BooleanField(default=False, help_text="Decide whether Saturday shall be a training day")
     train_on_sundays = models.BooleanField(default=False, help_text="Decide whether Sunday shall be a training day")
     target_activities = JSONField(blank=True, null=True)
-    actual_activities = JSONField(blank=True, null=True)
+    recorded_days_count = models.PositiveIntegerField(default=0, editable=False, help_text="Number of days with recorded activities")
+    recorded_activities_count = models.PositiveIntegerField(default=0, editable=False, help_text="Number of recorded activities")
+    recorded_exercises_count = models.PositiveIntegerField(default=0, editable=False, help_text="Number of different exercises recorded")
+    
+    objects = TrainingScheduleQuerySet.as_manager()
     
     def get_training_week(self, date:datetime.date) -> int:
         """Function that returns the training week number based on the start date and the given date"""
@@ -178,6 +317,34 @@ class TrainingSchedule(models.Model):
         delta = date - self.start_date
         return delta.days // 7 + 1
     
+    def _compute_target_activity(self, date:datetime.date, exercise_name:str) -> list:
+        """Function that derives the target repetitions/duration and weight for the given date and exercise from the progression values of the training plan"""
+        if not self.is_training_day(date):
+            return [0, 0]
+        
+        training_week = self.get_training_week(date)
+        starting_reps, repetition_progression_per_week, starting_weight, weight_progression_per_week = self.training_plan.exercises[exercise_name]
+        target_reps = starting_reps + (training_week - 1) * repetition_progression_per_week
+        target_weight = starting_weight + (training_week - 1) * weight_progression_per_week
+        return [target_reps, target_weight]
+    
+    def _compute_target_repetitions_cumulative(self, date:datetime.date, exercise_name:str):
+        """
+        Function that derives the cumulative target repetitions up to and including the given date as an arithmetic series
+        
+        Every full training week contains each weekday exactly once, so the target of the full weeks is a sum of an arithmetic series.
+        Only the days of the current (partial) training week have to be counted individually.
+        """
+        starting_reps, repetition_progression_per_week = self.training_plan.exercises[exercise_name][:2]
+        full_weeks, remaining_days = divmod((date - self.start_date).days, 7)
+        training_days = self.get_training_days()
+        training_days_per_week = sum(training_days)
+        training_days_in_current_week = sum(training_days[(self.start_date.weekday() + day) % 7] for day in range(remaining_days + 1))
+        
+        full_weeks_reps = training_days_per_week * (full_weeks * starting_reps + repetition_progression_per_week * (full_weeks * (full_weeks - 1) // 2))
+        current_week_reps = training_days_in_current_week * (starting_reps + full_weeks * repetition_progression_per_week)
+        return full_weeks_reps + current_week_reps
+    
     def _add_target_activities(self):
         """Function that adds the target activities for the entire duration of the training schedule based on the exercises of the underlying training plan"""
         if self.target_activities is None:
@@ -186,30 +353,49 @@ class TrainingSchedule(models.Model):
         delta = datetime.timedelta(days=1)
         current_date = self.start_date
         while current_date <= self.end_date:
-            if not self.is_training_day(current_date):
-                # not a training day
-                target = dict()
-                for exercise_name in self.training_plan.exercises.keys():
-                    target[exercise_name] = [0, 0]
-                self.target_activities[current_date.isoformat()] = target
-            else:
-                # training day
-                target = dict()
-                training_week = self.get_training_week(current_date)
-                for exercise_name, values in self.training_plan.exercises.items():
-                    starting_reps = values[0]
-                    repetition_progression_per_week = values[1]
-                    target_reps = starting_reps + (training_week - 1) * repetition_progression_per_week
-                    starting_weight = values[2]
-                    weight_progression_per_week = values[3]
-                    target_weight = starting_weight + (training_week - 1) * weight_progression_per_week
-                    target[exercise_name] = [target_reps, target_weight]
-                self.target_activities[current_date.isoformat()] = target
+            target = dict()
+            for exercise_name in self.training_plan.exercises.keys():
+                target[exercise_name] = self._compute_target_activity(current_date, exercise_name)
+            self.target_activities[current_date.isoformat()] = target
             
             current_date += delta
         
-        self.save()
+        self._clear_activity_caches()
+        # a new version for the cached analysis and cumulative indexes
+        self.save(update_fields=['target_activities', 'updated'])
+
+    def _patch_target_activities(self, exercise_names):
+        """
+        Function that recomputes only the given exercises in the materialised target activities without saving them
+
+        Exercises that are no longer part of the training plan are removed from every day.
+        """
+        exercises = self.training_plan.exercises or {}
+        for date, target in self.target_activities.items():
+            current_date = datetime.date.fromisoformat(date)
+            for exercise_name in exercise_names:
+                if exercise_name in exercises:
+                    target[exercise_name] = self._compute_target_activity(current_date, exercise_name)
+                else:
+                    target.pop(exercise_name, None)
+        self._clear_activity_caches()
+
+    @property
+    def has_lazy_targets(self) -> bool:
+        """Whether the targets are computed on demand instead of being read from the materialised target activities"""
+        return self.target_activities is None
         
+    def _has_stored_targets(self, exercise_name:str) -> bool:
+        """
+        Whether the targets of the exercise can be read from the materialised target activities
+        
+        Exercises added to the training plan are missing from them until they were propagated, which may happen out of
+        band (see app.propagation), their targets are derived from the training plan meanwhile.
+        """
+        if self.has_lazy_targets:
+            return False
+        return exercise_name in next(iter(self.target_activities.values()), {})
+    
     def get_target_activity_absolute(self, date:datetime.date, exercise_name:str) -> list:
         """Function that returns the target repetitions/duration and weight for the given date and exercise"""
         if exercise_name not in self.training_plan.exercises.keys():
@@ -218,18 +404,87 @@ class TrainingSchedule(models.Model):
         if date < self.start_date or date > self.end_date:
             raise ValueError("Given date is outside the training schedule")
         
+        if not self._has_stored_targets(exercise_name):
+            return self._compute_target_activity(date, exercise_name)
+        
         return self.target_activities[date.isoformat()][exercise_name]
     
     def get_actual_activity_absolute(self, date:datetime.date, exercise_name:str) -> list:
         """Function that returns the actual repetitions/duration and weight for the given date and exercise"""
         
-        if self.actual_activities is not None and date.isoformat() in self.actual_activities.keys():
+        if date.isoformat() in self.actual_activities.keys():
             if exercise_name not in self.actual_activities[date.isoformat()].keys():
                 return [0, 0]
             return self.actual_activities[date.isoformat()][exercise_name]
         
         return [0, 0]
     
+    def _get_cumulative_index(self, kind: str) -> dict:
+        """
+        Get the per-exercise cumulative repetitions index for the target or actual activities
+        
+        The index answers "cumulative up to a date" with a bisect lookup instead of scanning every date. It is kept on the
+        instance for repeated calls within a request and in the cache for other requests, under the version of the training
+        schedule and its plan like the time series (see app.timeseries), so any save or recording builds a new index.
+        
+        Returns:
+            dict: {exercise_name: ([date_key, ...], [cumulative_repetitions, ...])}
+        """
+        cumulative_indexes = self.__dict__.setdefault('_cumulative_indexes', dict())
+        if kind not in cumulative_indexes:
+            if self._state.adding or self.updated is None:
+                cumulative_indexes[kind] = self._build_cumulative_index(kind)
+            else:
+                from . import caching
+                version = (self.updated, self.training_plan.updated)
+                cache_key = caching.get_version_cache_key(f"training_schedule_cumulative_index:{kind}", self.pk, version)
+                cumulative_indexes[kind] = cache.get_or_set(cache_key, lambda: self._build_cumulative_index(kind), settings.ANALYSIS_CACHE_TIMEOUT)
+        return cumulative_indexes[kind]
+    
+    def _build_cumulative_index(self, kind: str) -> dict:
+        """Function that sums up the target or actual activities per exercise in date order, ISO date strings sort chronologically so the keys are never parsed"""
+        activities = self.target_activities if kind == 'target' else self.actual_activities
+        index = dict()
+        for date_key in sorted((activities or {}).keys()):
+            for exercise_name, values in activities[date_key].items():
+                dates, sums = index.setdefault(exercise_name, ([], []))
+                dates.append(date_key)
+                sums.append((sums[-1] if sums else 0) + values[0])
+        return index
+    
+    def _clear_activity_caches(self):
+        """Drop the cached actual activities, cumulative indexes and time series after the underlying activities changed"""
+        self.__dict__.pop('_cumulative_indexes', None)
+        self.__dict__.pop('_actual_activities', None)
+        self.__dict__.pop('_time_series', None)
+    
+    @property
+    def actual_activities(self) -> dict:
+        """
+        Get the recorded activities of the training schedule, loaded with a single query and cached on the instance
+        
+        Returns:
+            dict: {date_key: {exercise_name: [actual_repetitions, actual_weight]}}
+        """
+        if '_actual_activities' not in self.__dict__:
+            actual_activities = dict()
+            if not self._state.adding:
+                recorded_activities = self.recorded_activities.order_by('date', 'exercise__name').values_list('date', 'exercise__name', 'reps_or_duration', 'weight')
+                for date, exercise_name, reps_or_duration, weight in recorded_activities:
+                    actual_activities.setdefault(date.isoformat(), {})[exercise_name] = [reps_or_duration, weight]
+            self.__dict__['_actual_activities'] = actual_activities
+        return self.__dict__['_actual_activities']
+    
+    def _lookup_cumulative(self, kind: str, date:datetime.date, exercise_name:str):
+        """Function that returns the cumulative repetitions up to and including the given date from the cumulative index"""
+        index = self._get_cumulative_index(kind)
+        if exercise_name not in index:
+            return 0
+
+        dates, sums = index[exercise_name]
+        position = bisect.bisect_right(dates, date.isoformat())
+        return sums[position - 1] if position else 0
+    
     def get_target_repetitions_cumulative(self, date:datetime.date, exercise_name:str) -> list:
         """Function that returns the target repetitions for the given date and exercise"""
         if exercise_name not in self.training_plan.exercises.keys():
@@ -241,27 +496,14 @@ class TrainingSchedule(models.Model):
         if date > self.end_date:
             date = self.end_date
         
-        reps = 0
-        for target_date in self.target_activities.keys():
-            target_date = datetime.date.fromisoformat(target_date)
-            if target_date <= date:
-                reps += self.get_target_activity_absolute(target_date, exercise_name)[0]
-            
-        return reps
+        if not self._has_stored_targets(exercise_name):
+            return self._compute_target_repetitions_cumulative(date, exercise_name)
+        
+        return self._lookup_cumulative('target', date, exercise_name)
     
     def get_actual_repetitions_cumulative(self, date:datetime.date, exercise_name:str) -> list:
         """Function that returns the actual repetitions for the given date and exercise"""     
-                
-        if self.actual_activities is None:
-            return 0
-        
-        reps = 0
-        for target_date in self.actual_activities.keys():
-            target_date = datetime.date.fromisoformat(target_date)
-            if target_date <= date:
-                reps += self.get_actual_activity_absolute(target_date, exercise_name)[0]
-            
-        return reps
+        return self._lookup_cumulative('actual', date, exercise_name)
     
     def get_all_target_activities(self, date:datetime.date) -> dict:
         """Function that returns the target activities for the given date"""
@@ -279,33 +521,41 @@ class TrainingSchedule(models.Model):
     def get_all_exercises(self) -> list:
         """Get a list of all exercises that are part of the training plan or part of the recorded activities"""
         all_exercises = list(self.training_plan.exercises.keys())
-        if self.actual_activities is not None:
-            for date, values in self.actual_activities.items():
-                for exercise_name in values.keys():
-                    if exercise_name not in all_exercises:
-                        all_exercises.append(exercise_name)
+        for date, values in self.actual_activities.items():
+            for exercise_name in values.keys():
+                if exercise_name not in all_exercises:
+                    all_exercises.append(exercise_name)
         return all_exercises
     
-    def get_target_vs_actual_absolute(self, date:datetime.date) -> dict:
+    def get_target_vs_actual_absolute(self, date:datetime.date, exercise_cache:dict=None) -> dict:
         """
         Get a dictionary for each exercise that shows the target vs actual activities on the given date
         
+        All exercises are resolved with a single query. Pass an exercise_cache ({exercise_name: exercise}) to reuse exercises across calls,
+        it is filled with the exercises resolved by this call. The exercises are ordered as in the training plan, followed by the other recorded exercises.
+        
         Returns:
-            dict: {exercise_name: [[target_repetitions, target_weight], [actual_repetitions, actual_weight], [gap_repetitions, gap_weight]]}
+            dict: {exercise: [[target_repetitions, target_weight], [actual_repetitions, actual_weight], [gap_repetitions, gap_weight]]}
         """
+        if exercise_cache is None:
+            exercise_cache = dict()
+        
         target_vs_actual = dict()
         all_exercises = self.get_all_exercises()
-        
+        missing_exercises = [exercise_name for exercise_name in all_exercises if exercise_name not in exercise_cache]
+        if missing_exercises:
+            exercise_cache.update(Exercise.objects.resolve_names(missing_exercises))
         
         for exercise_name in all_exercises:
+            if exercise_name not in exercise_cache:
+                continue
             if date < self.start_date or date > self.end_date:
                 target = [0, 0]
             else:
                 target = self.get_target_activity_absolute(date, exercise_name)  # list[reps/duration, weight]
             actual = self.get_actual_activity_absolute(date, exercise_name)  # list[reps/duration, weight]
             gap = [actual[0] - target[0], actual[1] - target[1]]
-            exercise = Exercise.objects.get(name=exercise_name)
-            target_vs_actual[exercise] = [target, actual, gap]
+            target_vs_actual[exercise_cache[exercise_name]] = [target, actual, gap]
         
         return target_vs_actual
     
@@ -340,26 +590,22 @@ class TrainingSchedule(models.Model):
     
     def get_number_of_recorded_activities(self):
         """Get the number of recorded activities"""
-        if self.actual_activities is None:
-            return 0
-        
-        recorded_activities = 0
-        for date, values in self.actual_activities.items():
-            for exercise_name in values.keys():
-                recorded_activities += 1
-        return recorded_activities
+        return self.recorded_activities_count
     
     def get_unique_exercises_recorded(self) -> list:
         """Get a list of unique exercises that are recorded"""
-        if self.actual_activities is None:
-            return []
-        
-        unique_exercises = []
+        unique_exercises = dict()
         for date, values in self.actual_activities.items():
-            for exercise_name in values.keys():
-                if exercise_name not in unique_exercises:
-                    unique_exercises.append(exercise_name)
-        return unique_exercises
+            unique_exercises.update(dict.fromkeys(values.keys()))
+        return list(unique_exercises)
+    
+    def get_highlights(self) -> dict:
+        """Get the numbers of recorded training days, activities and different exercises from the summary counters"""
+        return {
+            'recorded_days': self.recorded_days_count,
+            'recorded_activities': self.recorded_activities_count,
+            'recorded_exercises': self.recorded_exercises_count,
+        }
     
     def is_training_day(self, date: datetime.date) -> bool:
         """Function that checks whether the given date is a training day or not"""
@@ -373,31 +619,71 @@ class TrainingSchedule(models.Model):
         return True
     
     def record_activity(self, activity: Activity):
-        """Function that records the actual activity"""
-        if self.athlete != activity.athlete:
+        """
+        Function that records the actual activity
+        
+        Concurrent recordings in the same training schedule are safe: the recorded activity is a row of its own, and the
+        summary counters are checked and incremented while the row of the training schedule is locked, so no recording
+        and no count is lost.
+        """
+        if self.athlete_id != activity.athlete_id:
             raise ValueError("The athlete who performed the activity does not match the athlete of the training schedule")
         
         date = activity.date
         if date < self.start_date or date > self.end_date:
             raise ValueError("Given date is outside the training schedule")
 
-        exercise_name = activity.exercise.name
-        if isinstance(activity, StrengthActivity):
+        if activity.kind == StrengthActivity.KIND:
             reps_or_duration = float(activity.reps)
             weight = float(activity.weight)
-        elif isinstance(activity, CardioActivity) or isinstance(activity, IsometricActivity):
+        elif activity.kind in (CardioActivity.KIND, IsometricActivity.KIND):
             reps_or_duration = float(activity.duration)
             weight = 0.0
         else:
             raise ValueError("Given activity is not a strength, cardio or isometric activity")
 
-        self.actual_activities = self.actual_activities or {}
+        with transaction.atomic():
+            self._lock()
+            # a later recording of the same exercise on the same day replaces the earlier one
+            recorded_activity, created = RecordedActivity.objects.update_or_create(
+                training_schedule=self,
+                date=date,
+                exercise_id=activity.exercise_id,
+                defaults={'activity': activity, 'reps_or_duration': reps_or_duration, 'weight': weight},
+            )
 
-        date_key = date.isoformat()
-        self.actual_activities.setdefault(date_key, {})
-        self.actual_activities[date_key][exercise_name] = [reps_or_duration, weight]
+            # keep the summary counters up to date without scanning the recorded activities
+            counters = []
+            if created:
+                other_recorded_activities = self.recorded_activities.exclude(pk=recorded_activity.pk)
+                counters.append('recorded_activities_count')
+                if not other_recorded_activities.filter(date=date).exists():
+                    counters.append('recorded_days_count')
+                if not other_recorded_activities.filter(exercise_id=activity.exercise_id).exists():
+                    counters.append('recorded_exercises_count')
+            
+            self.updated = timezone.now()
+            TrainingSchedule.objects.filter(pk=self.pk).update(
+                updated=self.updated,
+                **{counter: models.F(counter) + 1 for counter in counters},
+            )
 
-        self.save()
+        self._clear_activity_caches()
+        if counters:
+            self.refresh_from_db(fields=counters)
+    
+    def _lock(self):
+        """Lock the row of the training schedule until the end of the transaction"""
+        if connection.features.has_select_for_update:
+            list(TrainingSchedule.objects.select_for_update().filter(pk=self.pk).values_list('pk'))
+        else:
+            # without row locks (SQLite) a write takes the lock of the database, as the first statement of the
+            # transaction it waits for other writers instead of failing
+            TrainingSchedule.objects.filter(pk=self.pk).update(updated=timezone.now())
+    
+    def refresh_from_db(self, *args, **kwargs):
+        self._clear_activity_caches()
+        super().refresh_from_db(*args, **kwargs)
     
     @property
     def end_date(self):
@@ -409,12 +695,134 @@ class TrainingSchedule(models.Model):
     
     class Meta:
         ordering = ['-start_date']
+        indexes = [
+            models.Index(fields=['athlete', '-start_date'], name='schedule_athlete_start_idx'),
+        ]
         
     def __str__(self):
         return f"Training Schedule based on '{self.training_plan.name}' - {self.start_date}"
     
+
+class RecordedActivity(models.Model):
+    """The actual repetitions/duration and weight of one exercise on one day of a training schedule"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    training_schedule = models.ForeignKey(TrainingSchedule, related_name='recorded_activities', on_delete=models.CASCADE)
+    date = models.DateField()
+    exercise = models.ForeignKey(Exercise, on_delete=models.CASCADE)
+    activity = models.ForeignKey(Activity, on_delete=models.SET_NULL, blank=True, null=True, help_text="The activity that was recorded last")
+    reps_or_duration = models.FloatField(help_text="Repetitions or duration in seconds")
+    weight = models.FloatField(help_text="Weight in kgs")
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['training_schedule', 'date', 'exercise'], name='unique_recorded_activity_per_day'),
+        ]
+        
+    def __str__(self):
+        return f"{self.exercise.name} on {self.date} - {self.reps_or_duration} reps/seconds - {self.weight} kg"
+    
+class JobQuerySet(models.QuerySet):
+    def summary(self):
+        """Load the jobs with the names of their training schedules, without the JSON columns of the training schedules"""
+        return self.select_related('training_schedule__training_plan').defer(
+            'training_schedule__target_activities', 'training_schedule__training_plan__exercises',
+        )
+
+    def enqueue(self, name:str, training_schedule:TrainingSchedule=None, **payload):
+        """Queue a job for the handler registered under the given name in app.jobs, the payload must be JSON serializable"""
+        return self.create(name=name, training_schedule=training_schedule, payload=payload)
+
+    def claim(self):
+        """
+        Claim the oldest queued job and mark it as running, None if no job is queued
+
+        Jobs that are running for longer than JOB_TIMEOUT are requeued first, see requeue_stale(). Where the database
+        supports it the job is selected with SELECT ... FOR UPDATE SKIP LOCKED, so several workers never wait for each
+        other. On SQLite the requeue is the first statement of the transaction and takes the lock of the database before
+        the job is selected, so concurrent claims wait for each other instead of failing to upgrade their read lock.
+        """
+        with transaction.atomic():
+            self.requeue_stale()
+            queued_jobs = self.filter(status=Job.QUEUED).order_by('created')
+            if connection.features.has_select_for_update_skip_locked:
+                queued_jobs = queued_jobs.select_for_update(skip_locked=True)
+            job = queued_jobs.first()
+            if job is None:
+                return None
+            job.status = Job.RUNNING
+            job.started = timezone.now()
+            job.attempts += 1
+            if not self.filter(pk=job.pk, status=Job.QUEUED).update(status=job.status, started=job.started, attempts=job.attempts):
+                return None
+        return job
+
+    def requeue_stale(self) -> int:
+        """
+        Queue the jobs running for longer than JOB_TIMEOUT again, the worker running them is assumed to have died
+
+        Jobs without attempts left fail instead.
+
+        Returns:
+            int: number of requeued or failed jobs
+        """
+        now = timezone.now()
+        stale_jobs = self.filter(status=Job.RUNNING, started__lt=now - datetime.timedelta(seconds=settings.JOB_TIMEOUT))
+        # a write as the first statement, see claim()
+        failed = stale_jobs.filter(attempts__gte=settings.JOB_MAX_ATTEMPTS).update(
+            status=Job.FAILED, finished=now, error=f"Timed out after {settings.JOB_TIMEOUT} seconds",
+        )
+        return failed + stale_jobs.update(status=Job.QUEUED)
+
+
+class Job(models.Model):
+    """Work run outside of the request by the run_worker command, e.g. the generation of target activities"""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=100, help_text="Name of the handler in app.jobs")
+    payload = JSONField(default=dict, blank=True)
+    training_schedule = models.ForeignKey(TrainingSchedule, related_name='jobs', on_delete=models.CASCADE, blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(blank=True, null=True)
+    finished = models.DateTimeField(blank=True, null=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['created']
+        indexes = [
+            models.Index(fields=['status', 'created'], name='job_status_created_idx'),
+        ]
+
+    def get_label(self) -> str:
+        """Get the human readable name of the job, e.g. 'Add target activities'"""
+        return self.name.replace('_', ' ').capitalize()
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+
 # This method will be called after a TrainingSchedule instance is saved
 @receiver(post_save, sender=TrainingSchedule)
 def add_target_activities(sender, instance, created, **kwargs):
-    if created:
-        instance._add_target_activities()
\ No newline at end of file
+    # with lazy target activities the targets are derived from the training plan on demand
+    if created and not settings.LAZY_TARGET_ACTIVITIES:
+        if settings.BACKGROUND_JOBS:
+            # until the worker materialised them the targets are derived lazily
+            Job.objects.enqueue('add_target_activities', training_schedule=instance)
+        else:
+            instance._add_target_activities()
\ No newline at end of file
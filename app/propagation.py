@@ -0,0 +1,79 @@
+"""Propagation of changed training plan exercises to the materialised target activities of its training schedules"""
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import models
+
+
+# the fields needed to derive the targets of a training schedule
+TARGET_FIELDS = [
+    'start_date', 'duration', 'train_on_mondays', 'train_on_tuesdays', 'train_on_wednesdays', 'train_on_thursdays',
+    'train_on_fridays', 'train_on_saturdays', 'train_on_sundays', 'target_activities', 'training_plan_id',
+]
+
+
+def propagate_exercises(training_plan:models.TrainingPlan, exercise_names=None, batch_size:int=None) -> int:
+    """
+    Recompute the given exercises in the target activities of every training schedule of the training plan
+
+    Only the keys of the given exercises are patched, exercises that are no longer in the training plan are removed. The
+    ids of the training schedules are streamed with iterator(), each batch is locked, patched and written back with a
+    single bulk_update, so memory and lock time stay bounded however many training schedules use the training plan.
+    Without exercise_names all exercises of the training plan are recomputed and the ones it no longer contains are
+    removed. Training schedules with lazy targets derive them from the training plan and are skipped.
+
+    Returns:
+        int: number of updated training schedules
+    """
+    batch_size = batch_size or settings.TARGET_PROPAGATION_BATCH_SIZE
+    training_schedules = models.TrainingSchedule.objects.filter(training_plan=training_plan, target_activities__isnull=False)
+
+    updated = 0
+    batch = []
+    for training_schedule_id in training_schedules.values_list('pk', flat=True).iterator(chunk_size=batch_size):
+        batch.append(training_schedule_id)
+        if len(batch) == batch_size:
+            updated += _propagate_batch(training_plan, batch, exercise_names)
+            batch = []
+    if batch:
+        updated += _propagate_batch(training_plan, batch, exercise_names)
+    return updated
+
+
+def _propagate_batch(training_plan:models.TrainingPlan, training_schedule_ids:list, exercise_names) -> int:
+    """Patch the target activities of a batch of training schedules in one transaction"""
+    now = timezone.now()
+    with transaction.atomic():
+        training_schedules = list(
+            models.TrainingSchedule.objects.filter(pk__in=training_schedule_ids, target_activities__isnull=False)
+            .only(*TARGET_FIELDS)
+            .select_for_update()
+        )
+        for training_schedule in training_schedules:
+            training_schedule.training_plan = training_plan
+            if exercise_names is None:
+                stored_exercise_names = next(iter(training_schedule.target_activities.values()), {})
+                training_schedule._patch_target_activities({*(training_plan.exercises or {}), *stored_exercise_names})
+            else:
+                training_schedule._patch_target_activities(exercise_names)
+            # a new version for the cached analysis of the training schedule
+            training_schedule.updated = now
+        models.TrainingSchedule.objects.bulk_update(training_schedules, ['target_activities', 'updated'])
+    return len(training_schedules)
+
+
+def exercises_changed(training_plan:models.TrainingPlan, exercise_names):
+    """
+    Propagate the changed exercises of a training plan after the current transaction commits
+
+    With DEFER_TARGET_PROPAGATION the training schedules are left to the propagate_targets command instead, with
+    BACKGROUND_JOBS the propagation is queued for the worker.
+    """
+    if settings.DEFER_TARGET_PROPAGATION:
+        return
+    exercise_names = list(exercise_names)
+    if settings.BACKGROUND_JOBS:
+        models.Job.objects.enqueue('propagate_exercises', training_plan_id=str(training_plan.pk), exercise_names=exercise_names)
+        return
+    transaction.on_commit(lambda: propagate_exercises(training_plan, exercise_names))
@@ -0,0 +1,142 @@
+"""Process-local cache of the reference tables Muscle and Equipment"""
+import threading
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.forms.models import ModelChoiceIterator
+
+from . import caching, models
+
+
+# {model: (version, [instances in the ordering of the model], {pk: instance})}
+_reference_data = dict()
+_lock = threading.Lock()
+
+
+def get_version_key(model) -> str:
+    """Get the cache key of the version of a reference table"""
+    return f"reference_version:{model._meta.label_lower}"
+
+
+def get_reference_data(model) -> tuple:
+    """
+    Get all rows of a reference table, loaded once per process and version
+
+    Every process keeps its own copy, the version in the cache backend tells it when another process saved or deleted a
+    row. The instances are shared between requests and must not be modified.
+
+    Returns:
+        tuple: ([instances in the ordering of the model], {pk: instance})
+    """
+    version = caching.get_version(get_version_key(model))
+    reference_data = _reference_data.get(model)
+    if reference_data is None or reference_data[0] != version:
+        with _lock:
+            instances = list(model.objects.all())
+            reference_data = _reference_data[model] = (version, instances, {instance.pk: instance for instance in instances})
+    return reference_data[1], reference_data[2]
+
+
+def get_all(model) -> list:
+    """Get all rows of a reference table in the ordering of the model"""
+    return get_reference_data(model)[0]
+
+
+def get(model, pk):
+    """Get a row of a reference table by its primary key, None if it does not exist"""
+    return get_reference_data(model)[1].get(pk)
+
+
+def attach_reference_data(exercises) -> list:
+    """
+    Set the muscles and equipment of the given exercises from the reference cache
+
+    Only the equipment relations of the exercises are queried, with a single query. Afterwards exercise.primary_muscle_focus,
+    exercise.secondary_muscle_focus and exercise.equipment.all() do not query the database.
+    """
+    exercises = list(exercises)
+    equipment_ids = dict()
+    through = models.Exercise.equipment.through
+    for exercise_id, equipment_id in through.objects.filter(exercise__in=exercises).values_list('exercise_id', 'equipment_id'):
+        equipment_ids.setdefault(exercise_id, set()).add(equipment_id)
+
+    for exercise in exercises:
+        for field_name in ('primary_muscle_focus', 'secondary_muscle_focus'):
+            muscle = get(models.Muscle, getattr(exercise, f"{field_name}_id"))
+            if muscle is not None:
+                setattr(exercise, field_name, muscle)
+        # filled in like prefetch_related('equipment') does
+        equipment = exercise.equipment.all()
+        equipment._result_cache = [instance for instance in get_all(models.Equipment) if instance.pk in equipment_ids.get(exercise.pk, ())]
+        equipment._prefetch_done = True
+        exercise._prefetched_objects_cache = {**getattr(exercise, '_prefetched_objects_cache', {}), 'equipment': equipment}
+    return exercises
+
+
+class ReferenceChoiceIterator(ModelChoiceIterator):
+    """Choices of a reference table from the reference cache"""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for instance in get_all(self.queryset.model):
+            yield self.choice(instance)
+
+    def __len__(self):
+        return len(get_all(self.queryset.model)) + (1 if self.field.empty_label is not None else 0)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(get_all(self.queryset.model))
+
+
+class ReferenceModelChoiceField(forms.ModelChoiceField):
+    """ModelChoiceField over a reference table that renders and validates its choices without queries"""
+    iterator = ReferenceChoiceIterator
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            value = self.queryset.model._meta.pk.to_python(value)
+        except ValidationError:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value})
+        instance = get(self.queryset.model, value)
+        if instance is None:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value})
+        return instance
+
+
+class ReferenceModelMultipleChoiceField(forms.ModelMultipleChoiceField):
+    """ModelMultipleChoiceField over a reference table that renders and validates its choices without queries"""
+    iterator = ReferenceChoiceIterator
+
+    def _check_values(self, value):
+        try:
+            value = frozenset(value)
+        except TypeError:
+            raise ValidationError(self.error_messages['invalid_list'], code='invalid_list')
+
+        instances = []
+        for pk in value:
+            try:
+                instance = get(self.queryset.model, self.queryset.model._meta.pk.to_python(pk))
+            except ValidationError:
+                raise ValidationError(self.error_messages['invalid_pk_value'], code='invalid_pk_value', params={'pk': pk})
+            if instance is None:
+                raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice', params={'value': pk})
+            instances.append(instance)
+        return instances
+
+
+@receiver(post_save, sender=models.Muscle)
+@receiver(post_delete, sender=models.Muscle)
+@receiver(post_save, sender=models.Equipment)
+@receiver(post_delete, sender=models.Equipment)
+def invalidate_reference_data(sender, **kwargs):
+    version_key = get_version_key(sender)
+    caching.bump_version(version_key)
+    # a process reloading before the commit would cache the old rows under the new version
+    transaction.on_commit(lambda: caching.bump_version(version_key))
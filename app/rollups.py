@@ -0,0 +1,139 @@
+"""Weekly and monthly rollups of the activities of a training schedule and progress summaries, aggregated in the database"""
+import datetime
+
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from . import models
+
+
+PERIODS = {
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def get_period_end(period_start:datetime.date, period:str) -> datetime.date:
+    """Get the last day of the week or month starting at the given date"""
+    if period == 'week':
+        return period_start + datetime.timedelta(days=6)
+    next_month = (period_start.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    return next_month - datetime.timedelta(days=1)
+
+
+def get_rollups(training_schedule:models.TrainingSchedule, period:str='week') -> list:
+    """
+    Get the volume, durations, compliance and muscle group totals of a training schedule per calendar week or month
+
+    The sums are computed with one GROUP BY query over the recorded activities of the training schedule, joined with the
+    activities they were recorded from for their kind. Only the targets are derived in Python, once per period.
+
+    Returns:
+        list: [{'period': date, 'volume': ..., 'repetitions': ..., 'isometric_duration': ..., 'cardio_duration': ...,
+                'target_repetitions': ..., 'actual_repetitions': ..., 'compliance': percent or None,
+                'muscle_groups': {muscle_group: {'volume': ..., 'repetitions': ..., 'duration': ...}}}]
+    """
+    truncate = PERIODS[period]
+    rollups = dict()
+
+    def get_rollup(period_start):
+        return rollups.setdefault(period_start, {
+            'period': period_start,
+            'volume': 0,
+            'repetitions': 0,
+            'isometric_duration': 0,
+            'cardio_duration': 0,
+            'target_repetitions': 0,
+            'actual_repetitions': 0,
+            'compliance': None,
+            'muscle_groups': dict(),
+        })
+
+    def get_muscle_group(period_start, muscle_group):
+        return get_rollup(period_start)['muscle_groups'].setdefault(muscle_group, {'volume': 0, 'repetitions': 0, 'duration': 0})
+
+    # the activities recorded in this training schedule, not every activity of the athlete in its date range
+    recorded_totals = (
+        training_schedule.recorded_activities
+        .annotate(period_start=truncate('date'), muscle_group=F('exercise__primary_muscle_focus__muscle_group'), kind=F('activity__kind'))
+        .values('period_start', 'muscle_group', 'kind')
+        .annotate(
+            volume=Sum(F('activity__reps') * F('activity__weight')),
+            repetitions=Sum('activity__reps'),
+            duration=Sum('activity__duration'),
+            actual_repetitions=Sum('reps_or_duration'),
+        )
+        .order_by()
+    )
+    for totals in recorded_totals:
+        rollup = get_rollup(totals['period_start'])
+        rollup['actual_repetitions'] += totals['actual_repetitions']
+        # recorded activities without their activity (e.g. migrated ones) only count as actual repetitions
+        if totals['kind'] is None:
+            continue
+        muscle_group = get_muscle_group(totals['period_start'], totals['muscle_group'])
+        if totals['kind'] == models.StrengthActivity.KIND:
+            for totals_rollup in (rollup, muscle_group):
+                totals_rollup['volume'] += totals['volume'] or 0
+                totals_rollup['repetitions'] += totals['repetitions'] or 0
+        else:
+            key = 'isometric_duration' if totals['kind'] == models.IsometricActivity.KIND else 'cardio_duration'
+            rollup[key] += totals['duration'] or 0
+            muscle_group['duration'] += totals['duration'] or 0
+
+    # every period of the training schedule gets a target, even without activities
+    date = training_schedule.start_date
+    while date <= training_schedule.end_date:
+        period_start = date - datetime.timedelta(days=date.weekday()) if period == 'week' else date.replace(day=1)
+        period_end = min(get_period_end(period_start, period), training_schedule.end_date)
+        rollup = get_rollup(period_start)
+        for exercise_name in training_schedule.training_plan.exercises or {}:
+            rollup['target_repetitions'] += (
+                training_schedule.get_target_repetitions_cumulative(period_end, exercise_name)
+                - training_schedule.get_target_repetitions_cumulative(date - datetime.timedelta(days=1), exercise_name)
+            )
+        if rollup['target_repetitions']:
+            rollup['compliance'] = round(100 * rollup['actual_repetitions'] / rollup['target_repetitions'], 1)
+        date = period_end + datetime.timedelta(days=1)
+
+    return sorted(rollups.values(), key=lambda rollup: rollup['period'])
+
+
+def attach_progress(training_schedules, date:datetime.date) -> list:
+    """
+    Set the progress and compliance of the given training schedules on the given date as training_schedule.progress
+
+    The actual repetitions of all training schedules are summed with one GROUP BY query and the exercises of their training
+    plans are loaded with one more, so the training schedules can come from TrainingSchedule.objects.summary(). The targets
+    are derived from the training plans, the materialised target activities are not needed.
+
+    Returns:
+        list: the training schedules with progress {'elapsed': percent of the days passed, 'compliance': percent or None}
+    """
+    training_schedules = list(training_schedules)
+    actual_repetitions = dict(
+        models.RecordedActivity.objects.filter(training_schedule__in=training_schedules, date__lte=date)
+        .values('training_schedule_id')
+        .annotate(actual_repetitions=Sum('reps_or_duration'))
+        .values_list('training_schedule_id', 'actual_repetitions')
+        .order_by()
+    )
+    training_plan_exercises = dict(
+        models.TrainingPlan.objects.filter(pk__in={training_schedule.training_plan_id for training_schedule in training_schedules})
+        .values_list('pk', 'exercises')
+    )
+
+    for training_schedule in training_schedules:
+        exercises = training_plan_exercises.get(training_schedule.training_plan_id) or {}
+        training_schedule.training_plan.exercises = exercises
+        days = (training_schedule.end_date - training_schedule.start_date).days + 1
+        elapsed_days = min(max((date - training_schedule.start_date).days + 1, 0), days)
+        target_repetitions = 0
+        if elapsed_days:
+            target_date = min(date, training_schedule.end_date)
+            target_repetitions = sum(training_schedule._compute_target_repetitions_cumulative(target_date, exercise_name) for exercise_name in exercises)
+        training_schedule.progress = {
+            'elapsed': round(100 * elapsed_days / days),
+            'compliance': round(100 * actual_repetitions.get(training_schedule.pk, 0) / target_repetitions) if target_repetitions else None,
+        }
+    return training_schedules
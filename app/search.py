@@ -0,0 +1,185 @@
+"""Search over the exercise library by name, description, muscles and equipment"""
+import bisect
+import re
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db import connection
+from django.db.models import Value
+
+from . import caching, models
+
+
+# Number of exercises returned by a search unless a limit is given
+SEARCH_LIMIT = 10
+
+
+def tokenize(text:str) -> list:
+    """Get the lower case words of a text"""
+    return re.findall(r'\w+', (text or '').lower())
+
+
+class ExerciseSearchIndex:
+    """
+    In-process inverted index of the exercise library, used where the database has no full-text search
+
+    Every word of the name, description, muscles and equipment of an exercise maps to the ids of the exercises containing it.
+    The words are also kept sorted, so the words starting with a query word are found with a binary search. Query words
+    have to match the start of a word of the exercise, exercises matching in their name rank first.
+    """
+
+    def __init__(self, documents:dict):
+        """
+        Args:
+            documents (dict): {exercise_id: (name, type, text)}, where text holds the description, muscles and equipment
+        """
+        self.documents = documents
+        self.postings = dict()
+        self.name_postings = dict()
+        for exercise_id, (name, type, text) in documents.items():
+            for token in tokenize(name):
+                self.name_postings.setdefault(token, set()).add(exercise_id)
+                self.postings.setdefault(token, set()).add(exercise_id)
+            for token in tokenize(text):
+                self.postings.setdefault(token, set()).add(exercise_id)
+        self.tokens = sorted(self.postings)
+
+    @classmethod
+    def build(cls):
+        """Build the index from the exercise table with two queries, one for the exercises and one for their equipment"""
+        equipment_names = dict()
+        for exercise_id, equipment_name in models.Exercise.equipment.through.objects.values_list('exercise_id', 'equipment__name'):
+            equipment_names.setdefault(exercise_id, []).append(equipment_name)
+
+        rows = models.Exercise.objects.values_list(
+            'id',
+            'name',
+            'type',
+            'description',
+            'primary_muscle_focus__name',
+            'primary_muscle_focus__muscle_group',
+            'secondary_muscle_focus__name',
+            'secondary_muscle_focus__muscle_group',
+        )
+        documents = {
+            exercise_id: (name, type, ' '.join(filter(None, [*texts, *equipment_names.get(exercise_id, [])])))
+            for exercise_id, name, type, *texts in rows
+        }
+        return cls(documents)
+
+    def _match(self, postings:dict, query_token:str) -> set:
+        """Get the ids of the exercises with a word starting with the query word"""
+        exercise_ids = set()
+        for position in range(bisect.bisect_left(self.tokens, query_token), len(self.tokens)):
+            token = self.tokens[position]
+            if not token.startswith(query_token):
+                break
+            exercise_ids |= postings.get(token, set())
+        return exercise_ids
+
+    def search(self, query:str, type:str=None, limit:int=SEARCH_LIMIT) -> list:
+        """
+        Get the ids of the exercises matching every word of the query, ranked by the number of words matching the name
+
+        Returns:
+            list: exercise ids, best match first and then by name
+        """
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        exercise_ids = None
+        for query_token in query_tokens:
+            matches = self._match(self.postings, query_token)
+            exercise_ids = matches if exercise_ids is None else exercise_ids & matches
+        if type:
+            exercise_ids = {exercise_id for exercise_id in exercise_ids if self.documents[exercise_id][1] == type}
+
+        name_matches = [self._match(self.name_postings, query_token) for query_token in query_tokens]
+        ranked = sorted(
+            exercise_ids,
+            key=lambda exercise_id: (
+                -sum(exercise_id in matches for matches in name_matches),
+                self.documents[exercise_id][0].lower(),
+            ),
+        )
+        return ranked[:limit]
+
+
+_search_index = None
+_search_index_version = None
+
+
+def get_search_index() -> ExerciseSearchIndex:
+    """Get the search index of this process, rebuilt when the version of the exercise library changed"""
+    global _search_index, _search_index_version
+    version = caching.get_exercise_library_version()
+    if _search_index is None or _search_index_version != version:
+        _search_index = ExerciseSearchIndex.build()
+        _search_index_version = version
+    return _search_index
+
+
+def search_exercises_postgres(query:str, type:str=None, limit:int=SEARCH_LIMIT) -> list:
+    """
+    Search the exercises with the full-text search of Postgres, falling back to trigram similarity of the names
+
+    The query words are matched as prefixes, so partial words typed into an autocomplete find their exercises. When
+    no exercise matches, for example because of a typo, the exercises with a similar name are returned instead. The
+    similarity filter uses the trigram index on the exercise name (migration 0017).
+    """
+    query_tokens = tokenize(query)
+    if not query_tokens:
+        return []
+
+    exercises = models.Exercise.objects.all()
+    if type:
+        exercises = exercises.filter(type=type)
+
+    vector = (
+        SearchVector('name', weight='A', config='english')
+        + SearchVector(
+            'description',
+            'primary_muscle_focus__name',
+            'primary_muscle_focus__muscle_group',
+            'secondary_muscle_focus__name',
+            'secondary_muscle_focus__muscle_group',
+            'equipment_names',
+            weight='B',
+            config='english',
+        )
+    )
+    search_query = SearchQuery(' & '.join(f"{token}:*" for token in query_tokens), search_type='raw', config='english')
+    matches = list(
+        exercises
+        .annotate(equipment_names=StringAgg('equipment__name', ' ', default=Value('')))
+        .annotate(search=vector, rank=SearchRank(vector, search_query))
+        .filter(search=search_query)
+        .order_by('-rank', 'name')[:limit]
+    )
+    if matches:
+        return matches
+
+    return list(
+        exercises
+        .filter(name__trigram_similar=query)
+        .annotate(similarity=TrigramSimilarity('name', query))
+        .order_by('-similarity', 'name')[:limit]
+    )
+
+
+def search_exercises(query:str, type:str=None, limit:int=SEARCH_LIMIT) -> list:
+    """
+    Search the exercise library by name, description, muscles and equipment
+
+    Postgres uses its full-text search with a trigram fallback, other databases the in-process search index.
+
+    Returns:
+        list: matching exercises, best match first
+    """
+    if connection.vendor == 'postgresql':
+        return search_exercises_postgres(query, type, limit)
+
+    exercise_ids = get_search_index().search(query, type, limit)
+    exercises = models.Exercise.objects.in_bulk(exercise_ids)
+    return [exercises[exercise_id] for exercise_id in exercise_ids if exercise_id in exercises]
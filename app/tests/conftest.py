@@ -0,0 +1,57 @@
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from app import models
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # the versions of cached pages and reference data must not outlive the rolled back test data
+    cache.clear()
+
+
+@pytest.fixture
+def athlete():
+    return User.objects.create_user(email='athlete@example.com', password='password123')
+
+
+@pytest.fixture
+def muscle():
+    return models.Muscle.objects.create(name='Biceps', muscle_group='Arms')
+
+
+@pytest.fixture
+def make_exercise(athlete, muscle):
+    def _make_exercise(name, type='Strength'):
+        return models.Exercise.objects.create(name=name, primary_muscle_focus=muscle, type=type, author=athlete)
+    return _make_exercise
+
+
+@pytest.fixture
+def training_plan(athlete, make_exercise):
+    make_exercise('Curl')
+    make_exercise('Plank', type='Isometric')
+    return models.TrainingPlan.objects.create(
+        name='Plan',
+        description='Description',
+        author=athlete,
+        exercises={'Curl': [10, 2, 20, 1], 'Plank': [30, 5, 0, 0]},
+    )
+
+
+@pytest.fixture
+def training_schedule(athlete, training_plan):
+    # 2024-01-01 is a Monday
+    return models.TrainingSchedule.objects.create(
+        athlete=athlete,
+        training_plan=training_plan,
+        start_date=datetime.date(2024, 1, 1),
+        duration=4,
+        train_on_mondays=True,
+        train_on_thursdays=True,
+    )
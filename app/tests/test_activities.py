@@ -0,0 +1,47 @@
+import datetime
+
+import pytest
+
+from app import models
+
+
+@pytest.mark.django_db
+def test_activity_types_share_one_table(make_exercise, athlete):
+    curl = make_exercise('Curl')
+    run = make_exercise('Run', 'Cardio')
+    strength_activity = models.StrengthActivity.objects.create(exercise=curl, date=datetime.date(2024, 1, 1), athlete=athlete, reps=10, weight=20)
+    cardio_activity = models.CardioActivity.objects.create(exercise=run, date=datetime.date(2024, 1, 2), athlete=athlete, duration=600)
+
+    assert strength_activity.kind == 'Strength'
+    assert cardio_activity.kind == 'Cardio'
+    assert list(models.StrengthActivity.objects.all()) == [strength_activity]
+    assert list(models.CardioActivity.objects.all()) == [cardio_activity]
+    assert not models.IsometricActivity.objects.exists()
+
+
+@pytest.mark.django_db
+def test_activities_are_loaded_as_their_kind_without_joins(make_exercise, athlete, django_assert_num_queries):
+    curl = make_exercise('Curl')
+    plank = make_exercise('Plank', 'Isometric')
+    models.StrengthActivity.objects.create(exercise=curl, date=datetime.date(2024, 1, 1), athlete=athlete, reps=10, weight=20)
+    models.IsometricActivity.objects.create(exercise=plank, date=datetime.date(2024, 1, 2), athlete=athlete, duration=45)
+
+    with django_assert_num_queries(1) as queries:
+        activities = list(models.Activity.objects.filter(athlete=athlete).select_related('exercise').order_by('date'))
+    assert 'JOIN "app_strengthactivity"' not in queries.captured_queries[0]['sql']
+
+    assert [type(activity) for activity in activities] == [models.StrengthActivity, models.IsometricActivity]
+    assert [str(activity) for activity in activities] == [
+        "Strength activity for Curl - 10 reps - 20 kg",
+        "Isometric activity for Plank - 45 seconds hold",
+    ]
+
+
+@pytest.mark.django_db
+def test_record_activity_loaded_through_activity(training_schedule, athlete):
+    curl = models.Exercise.objects.get(name='Curl')
+    models.StrengthActivity.objects.create(exercise=curl, date=datetime.date(2024, 1, 1), athlete=athlete, reps=8, weight=20)
+
+    training_schedule.record_activity(models.Activity.objects.get())
+
+    assert training_schedule.actual_activities == {'2024-01-01': {'Curl': [8.0, 20.0]}}
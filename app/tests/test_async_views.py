@@ -0,0 +1,84 @@
+import datetime
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+
+from app import async_views, models, views
+
+
+def call_view(view_class, request, user=None, **kwargs):
+    request.auser = make_auser(user)
+    request.user = user
+    request.session = dict()
+    request._dont_enforce_csrf_checks = True
+    return async_to_sync(view_class.as_view())(request, **kwargs)
+
+
+def make_auser(user):
+    async def auser():
+        return user
+    return auser
+
+
+@pytest.mark.django_db
+def test_async_views_are_async():
+    for view_class in (
+        async_views.HomeView,
+        async_views.GetTrainingScheduleAnalysisView,
+        async_views.RecordStrengthActivityView,
+        async_views.RecordIsometricActivityView,
+        async_views.RecordCardioActivityView,
+    ):
+        assert view_class.view_is_async
+
+
+@pytest.mark.django_db
+def test_async_analysis_matches_the_sync_analysis(training_schedule, athlete):
+    request_factory = RequestFactory()
+    sync_response = views.GetTrainingScheduleAnalysisView.as_view()(request_factory.get('/', {'date': '2024-01-08'}), pk=training_schedule.pk)
+    async_response = call_view(async_views.GetTrainingScheduleAnalysisView, request_factory.get('/', {'date': '2024-01-08'}), athlete, pk=training_schedule.pk)
+
+    assert async_response.status_code == 200
+    assert async_response.content == sync_response.content
+    assert async_response.headers['ETag'] == sync_response.headers['ETag']
+
+    not_modified = call_view(
+        async_views.GetTrainingScheduleAnalysisView,
+        request_factory.get('/', {'date': '2024-01-08'}, headers={'If-None-Match': sync_response.headers['ETag']}),
+        athlete,
+        pk=training_schedule.pk,
+    )
+    assert not_modified.status_code == 304
+
+
+@pytest.mark.django_db
+def test_async_record_strength_activity(training_schedule, athlete):
+    curl = models.Exercise.objects.get(name='Curl')
+    request = RequestFactory().post('/', {'exercise': curl.pk, 'date': '2024-01-04', 'repetitions': 9, 'weight': 22})
+
+    response = call_view(async_views.RecordStrengthActivityView, request, athlete, pk=training_schedule.pk)
+
+    assert response.status_code == 302
+    assert models.StrengthActivity.objects.get().reps == 9
+    training_schedule.refresh_from_db()
+    assert training_schedule.get_actual_repetitions_cumulative(datetime.date(2024, 1, 4), 'Curl') == 9
+
+
+@pytest.mark.django_db
+def test_async_record_isometric_activity_rerenders_invalid_forms(training_schedule, athlete):
+    request = RequestFactory().post('/', {'date': '2024-01-04', 'duration': 30})
+
+    response = call_view(async_views.RecordIsometricActivityView, request, athlete, pk=training_schedule.pk)
+
+    assert response.status_code == 200
+    assert 'This field is required' in response.content.decode()
+    assert not models.Activity.objects.exists()
+
+
+@pytest.mark.django_db
+def test_async_home_lists_the_training_schedules_of_the_athlete(training_schedule, athlete):
+    response = call_view(async_views.HomeView, RequestFactory().get('/'), athlete)
+
+    assert response.status_code == 200
+    assert training_schedule.training_plan.name in response.content.decode()
@@ -0,0 +1,30 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+
+from app import benchmarks, models
+
+
+@pytest.mark.django_db
+def test_benchmarks_report_time_queries_and_memory_per_operation():
+    report = benchmarks.run_benchmarks([(2, 3, 4)])
+
+    assert report['database']
+    operations = [result['operation'] for result in report['results']]
+    assert 'get_target_vs_actual_cumulative' in operations
+    assert 'training_schedule_detail' in operations
+    for result in report['results']:
+        assert result['weeks'] == 2 and result['exercises'] == 3 and result['recorded_days'] == 4
+        assert result['seconds'] >= 0
+        assert result['queries'] >= 0
+        assert result['peak_memory_bytes'] > 0
+    assert not models.TrainingSchedule.objects.exists()
+
+
+@pytest.mark.django_db
+def test_benchmark_command_prints_json():
+    stdout = io.StringIO()
+    call_command('benchmark', weeks=[1], exercises=[1], recorded_days=[1], stdout=stdout)
+    assert len(json.loads(stdout.getvalue())['results']) == 7
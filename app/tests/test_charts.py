@@ -0,0 +1,80 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+
+from app import charts, models
+
+
+def get_chart_data(client, training_schedule, **params):
+    return client.get(reverse('training_schedule_chart_data', args=[training_schedule.pk]), params)
+
+
+@pytest.mark.django_db
+def test_chart_data_of_a_date_range(client, training_schedule, athlete):
+    curl = models.Exercise.objects.get(name='Curl')
+    training_schedule.record_activity(models.StrengthActivity.objects.create(exercise=curl, date=datetime.date(2024, 1, 1), athlete=athlete, reps=8, weight=20))
+
+    response = get_chart_data(client, training_schedule, **{'from': '2024-01-04', 'to': '2024-01-08'})
+
+    assert response.status_code == 200
+    curl_series = response.json()['exercises']['Curl']
+    assert curl_series['dates'] == ['2024-01-04', '2024-01-05', '2024-01-06', '2024-01-07', '2024-01-08']
+    assert curl_series['target'] == [10, 0, 0, 0, 12]
+    # the cumulative values include the days before the range
+    assert curl_series['cumulative_target'] == [20, 20, 20, 20, 32]
+    assert curl_series['cumulative_actual'] == [8.0, 8.0, 8.0, 8.0, 8.0]
+
+
+@pytest.mark.django_db
+def test_chart_data_is_clamped_to_the_schedule(client, training_schedule):
+    response = get_chart_data(client, training_schedule, **{'from': '1900-01-01', 'to': '9999-12-31'})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data['from'], data['to']) == ('2024-01-01', '2024-01-29')
+    assert len(data['exercises']['Curl']['dates']) == 29
+
+
+@pytest.mark.django_db
+def test_chart_data_downsampled_per_week(client, training_schedule):
+    daily = get_chart_data(client, training_schedule).json()['exercises']['Curl']
+    weekly = get_chart_data(client, training_schedule, downsample='week').json()['exercises']['Curl']
+
+    # the schedule ends on the Monday of its fifth week
+    assert weekly['dates'] == ['2024-01-01', '2024-01-08', '2024-01-15', '2024-01-22', '2024-01-29']
+    assert weekly['target'] == [20, 24, 28, 32, 18]
+    assert sum(weekly['target']) == sum(daily['target'])
+    assert weekly['cumulative_target'][-1] == daily['cumulative_target'][-1]
+
+
+@pytest.mark.django_db
+def test_chart_data_downsampled_with_lttb(client, training_schedule):
+    response = get_chart_data(client, training_schedule, downsample='lttb', points=10)
+
+    curl_series = response.json()['exercises']['Curl']
+    assert len(curl_series['dates']) == 10
+    assert curl_series['dates'][0] == '2024-01-01'
+    assert curl_series['dates'][-1] == training_schedule.end_date.isoformat()
+
+
+def test_lttb_keeps_the_peaks():
+    values = [0] * 50 + [100] + [0] * 49
+    indices = charts.get_lttb_indices(values, 5)
+
+    assert indices[0] == 0 and indices[-1] == 99
+    assert 50 in indices
+    assert len(indices) == 5
+    assert charts.get_lttb_indices([1, 2, 3], 10) == [0, 1, 2]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [
+    {'from': '2024-13-01'},
+    {'from': '2024-01-10', 'to': '2024-01-09'},
+    {'downsample': 'month'},
+    {'downsample': 'lttb', 'points': 2},
+    {'points': 'many'},
+])
+def test_chart_data_rejects_invalid_parameters(client, training_schedule, params):
+    assert get_chart_data(client, training_schedule, **params).status_code == 400
@@ -0,0 +1,105 @@
+import re
+
+import pytest
+from django.core.cache.backends.base import CacheKeyWarning
+from django.test import override_settings
+from django.urls import reverse
+
+from app import library, models
+
+
+@pytest.fixture
+def exercises(athlete, make_exercise):
+    chest = models.Muscle.objects.create(name='Pectoralis', muscle_group='Chest')
+    legs = models.Muscle.objects.create(name='Quadriceps', muscle_group='Legs')
+    barbell = models.Equipment.objects.create(name='Barbell')
+    exercises = {
+        'Bench press': models.Exercise.objects.create(name='Bench press', primary_muscle_focus=chest, type='Strength', author=athlete),
+        'Push up': models.Exercise.objects.create(name='Push up', primary_muscle_focus=chest, type='Strength', author=athlete),
+        'Squat': models.Exercise.objects.create(name='Squat', primary_muscle_focus=legs, type='Strength', author=athlete),
+        'Wall sit': models.Exercise.objects.create(name='Wall sit', primary_muscle_focus=legs, secondary_muscle_focus=chest, type='Isometric', author=athlete),
+    }
+    exercises['Bench press'].equipment.add(barbell)
+    exercises['Squat'].equipment.add(barbell)
+    return exercises
+
+
+def get_exercise_names(response):
+    return re.findall(r'class="h3 fw-bold"><a href="[^"]+">([^<]+)</a>', response.content.decode())
+
+
+@pytest.mark.django_db
+def test_exercise_list_filters_by_muscle_group_equipment_and_type(client, exercises):
+    barbell = models.Equipment.objects.get(name='Barbell')
+
+    assert get_exercise_names(client.get(reverse('exercise_list'), {'muscle_group': 'Chest'})) == ['Bench press', 'Push up', 'Wall sit']
+    assert get_exercise_names(client.get(reverse('exercise_list'), {'equipment': barbell.pk})) == ['Bench press', 'Squat']
+    assert get_exercise_names(client.get(reverse('exercise_list'), {'muscle_group': 'Legs', 'type': 'Isometric'})) == ['Wall sit']
+
+
+@pytest.mark.django_db
+@override_settings(EXERCISE_LIBRARY_PAGE_SIZE=3)
+def test_exercise_list_is_paginated(client, exercises):
+    first_page = client.get(reverse('exercise_list'))
+    second_page = client.get(reverse('exercise_list'), {'page': 2})
+
+    assert get_exercise_names(first_page) == ['Bench press', 'Push up', 'Squat']
+    assert get_exercise_names(second_page) == ['Wall sit']
+    assert 'Page 2 of 2' in second_page.content.decode()
+
+
+@pytest.mark.django_db
+def test_exercise_list_is_cached_until_an_exercise_changes(client, exercises, django_assert_num_queries):
+    client.get(reverse('exercise_list'))
+    with django_assert_num_queries(0):
+        cached_response = client.get(reverse('exercise_list'))
+    assert 'Squat' in cached_response.content.decode()
+
+    exercises['Squat'].name = 'Back squat'
+    exercises['Squat'].save()
+
+    assert 'Back squat' in client.get(reverse('exercise_list')).content.decode()
+
+
+@pytest.mark.django_db
+@override_settings(EXERCISE_LIBRARY_PAGE_SIZE=1)
+def test_exercise_list_links_carry_only_the_cleaned_filters(client, exercises, recwarn):
+    response = client.get(reverse('exercise_list'), {'muscle_group': 'Chest', 'type': '', 'utm_source': 'newsletter'})
+
+    assert 'href="?muscle_group=Chest&page=2"' in response.content.decode()
+    assert 'utm_source' not in response.content.decode()
+    client.get(reverse('exercise_list'), {'muscle_group': 'Full Body'})
+    # the filter values are hashed into valid cache keys
+    assert not [warning for warning in recwarn if warning.category is CacheKeyWarning]
+
+
+@pytest.mark.django_db
+def test_exercise_list_with_invalid_filters_is_not_cached(client, exercises, django_assert_max_num_queries):
+    client.get(reverse('exercise_list'), {'muscle_group': 'Wings'})
+    with django_assert_max_num_queries(10) as queries:
+        response = client.get(reverse('exercise_list'), {'muscle_group': 'Wings'})
+
+    assert queries.captured_queries
+    assert 'Select a valid choice' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_similar_exercises_share_a_muscle(exercises):
+    assert library.get_similar_exercises(exercises['Bench press']) == [
+        ('Push up', exercises['Push up'].id),
+        ('Wall sit', exercises['Wall sit'].id),
+    ]
+    assert [name for name, exercise_id in library.get_similar_exercises(exercises['Wall sit'])] == ['Bench press', 'Push up', 'Squat']
+    assert library.get_other_exercises(exercises['Bench press'], library.get_similar_exercises(exercises['Bench press']), 10) == [
+        ('Squat', exercises['Squat'].id),
+    ]
+
+
+@pytest.mark.django_db
+def test_exercise_detail_runs_a_fixed_number_of_queries(client, exercises, django_assert_num_queries):
+    client.get(exercises['Bench press'].get_absolute_url())
+    with django_assert_num_queries(2):
+        response = client.get(exercises['Push up'].get_absolute_url())
+
+    assert [name for name, exercise_id in response.context['similar_exercises']] == ['Bench press', 'Wall sit']
+    assert [name for name, exercise_id in response.context['other_exercises']] == ['Squat']
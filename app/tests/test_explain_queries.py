@@ -0,0 +1,16 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+def test_explain_queries_uses_the_activity_indexes(training_schedule):
+    stdout = io.StringIO()
+    call_command('explain_queries', stdout=stdout)
+    output = stdout.getvalue()
+
+    assert 'Activity history of an athlete' in output
+    assert 'activity_athlete_date_idx' in output
+    assert 'activity_athlete_ex_date_idx' in output
+    assert 'SCAN app_exercise' not in output
@@ -0,0 +1,88 @@
+import datetime
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from app import importers, models
+
+
+@pytest.mark.django_db
+def test_import_activities_from_csv(tmp_path, training_schedule):
+    path = tmp_path / 'activities.csv'
+    path.write_text(
+        "exercise,date,reps,weight,duration\n"
+        "Curl,2024-01-01,8,20,\n"
+        "Curl,2024-01-01,9,20,\n"
+        "Plank,2024-01-04,,,60\n"
+        "Curl,2024-01-04,10,22,\n"
+    )
+    stdout = io.StringIO()
+    call_command('import_activities', str(path), training_schedule=str(training_schedule.pk), chunk_size=2, stdout=stdout)
+
+    assert '4 activities into 1 training schedules' in stdout.getvalue()
+    assert models.StrengthActivity.objects.count() == 3
+    assert models.IsometricActivity.objects.get().duration == 60
+    assert str(models.StrengthActivity.objects.filter(reps=9).get()) == "Strength activity for Curl - 9 reps - 20 kg"
+    training_schedule.refresh_from_db()
+    assert training_schedule.actual_activities == {
+        '2024-01-01': {'Curl': [9.0, 20.0]},
+        '2024-01-04': {'Curl': [10.0, 22.0], 'Plank': [60.0, 0.0]},
+    }
+
+
+@pytest.mark.django_db
+def test_import_activities_from_jsonl(training_schedule):
+    rows = [
+        {'training_schedule': str(training_schedule.pk), 'exercise': 'Curl', 'date': '2024-01-08', 'reps': 12, 'weight': 21},
+    ]
+    file = io.StringIO('\n'.join(json.dumps(row) for row in rows) + '\n\n')
+    importer = importers.ActivityImporter()
+    importer.import_rows(importers.read_jsonl_rows(file))
+
+    assert importer.rows == 1
+    assert training_schedule.get_actual_activity_absolute(datetime.date(2024, 1, 8), 'Curl') == [12.0, 21.0]
+
+
+@pytest.mark.django_db
+def test_import_activities_rejects_dates_outside_the_schedule(tmp_path, training_schedule):
+    path = tmp_path / 'activities.csv'
+    path.write_text("exercise,date,reps,weight\nCurl,2023-01-01,8,20\n")
+    with pytest.raises(CommandError, match='Row 1'):
+        call_command('import_activities', str(path), training_schedule=str(training_schedule.pk))
+    assert not models.Activity.objects.exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('row', [
+    {'training_schedule': 'not-a-uuid', 'exercise': 'Curl', 'date': '2024-01-01', 'reps': 8, 'weight': 20},
+    {'exercise': 'Curl', 'date': '2024-01-01', 'reps': None, 'weight': 20},
+    {'exercise': ['Curl'], 'date': '2024-01-01', 'reps': 8, 'weight': 20},
+])
+def test_import_activities_reports_invalid_rows(tmp_path, training_schedule, row):
+    path = tmp_path / 'activities.jsonl'
+    path.write_text(json.dumps({'exercise': 'Curl', 'date': '2024-01-04', 'reps': 8, 'weight': 20}) + '\n' + json.dumps(row) + '\n')
+    with pytest.raises(CommandError, match='Row 2'):
+        call_command('import_activities', str(path), training_schedule=str(training_schedule.pk))
+    assert not models.Activity.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_activities_rejects_invalid_training_schedule_ids(tmp_path):
+    path = tmp_path / 'activities.csv'
+    path.write_text("exercise,date,reps,weight\nCurl,2024-01-01,8,20\n")
+    with pytest.raises(CommandError, match='Training schedule not-a-uuid does not exist'):
+        call_command('import_activities', str(path), training_schedule='not-a-uuid')
+
+
+@pytest.mark.django_db
+def test_import_activities_refreshes_highlights(training_schedule):
+    rows = [
+        {'exercise': 'Curl', 'date': '2024-01-01', 'reps': 8, 'weight': 20},
+        {'exercise': 'Plank', 'date': '2024-01-01', 'duration': 30},
+        {'exercise': 'Curl', 'date': '2024-01-04', 'reps': 9, 'weight': 20},
+    ]
+    importers.ActivityImporter(training_schedule=training_schedule).import_rows(rows)
+    training_schedule.refresh_from_db()
+    assert training_schedule.get_highlights() == {'recorded_days': 2, 'recorded_activities': 3, 'recorded_exercises': 2}
@@ -0,0 +1,156 @@
+import concurrent.futures
+import datetime
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError, connection, connections
+from django.utils import timezone
+
+from app import jobs, models, propagation
+
+
+@pytest.fixture
+def background_jobs(settings):
+    settings.BACKGROUND_JOBS = True
+
+
+@pytest.mark.django_db
+def test_target_activities_are_generated_by_the_worker(background_jobs, client, athlete, training_plan):
+    training_schedule = models.TrainingSchedule.objects.create(
+        athlete=athlete, training_plan=training_plan, start_date=datetime.date(2024, 1, 1), duration=2, train_on_mondays=True,
+    )
+
+    job = models.Job.objects.get()
+    assert (job.name, job.status, job.training_schedule) == ('add_target_activities', models.Job.QUEUED, training_schedule)
+    training_schedule.refresh_from_db()
+    # the targets are derived lazily until the worker materialised them
+    assert training_schedule.target_activities is None
+    assert training_schedule.get_target_activity_absolute(datetime.date(2024, 1, 8), 'Curl') == [12, 21]
+    client.force_login(athlete)
+    assert 'Add target activities: Queued' in client.get(training_schedule.get_absolute_url()).content.decode()
+
+    assert jobs.run_pending_jobs() == 1
+
+    job.refresh_from_db()
+    assert job.status == models.Job.DONE and job.attempts == 1 and job.finished is not None
+    training_schedule.refresh_from_db()
+    assert training_schedule.target_activities['2024-01-08']['Curl'] == [12, 21]
+    assert 'Add target activities' not in client.get(training_schedule.get_absolute_url()).content.decode()
+
+
+@pytest.mark.django_db
+def test_claimed_jobs_are_not_claimed_again(training_schedule):
+    first = models.Job.objects.enqueue('add_target_activities', training_schedule=training_schedule)
+    second = models.Job.objects.enqueue('add_target_activities', training_schedule=training_schedule)
+
+    assert models.Job.objects.claim() == first
+    assert models.Job.objects.claim() == second
+    assert models.Job.objects.claim() is None
+    assert set(models.Job.objects.values_list('status', flat=True)) == {models.Job.RUNNING}
+
+
+def claim_all():
+    try:
+        claimed = []
+        while (job := models.Job.objects.claim()) is not None:
+            claimed.append(job.pk)
+        return claimed
+    finally:
+        connections.close_all()
+
+
+@pytest.mark.skipif(
+    connection.vendor == 'sqlite' and not connection.settings_dict['TEST']['NAME'],
+    reason="the in-memory SQLite test database fails instead of waiting for locks, set a TEST NAME to run it on SQLite",
+)
+@pytest.mark.django_db(transaction=True)
+def test_parallel_claims_claim_every_job_once(training_schedule):
+    models.Job.objects.all().delete()
+    job_ids = {models.Job.objects.enqueue('add_target_activities', training_schedule=training_schedule).pk for _ in range(40)}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        claimed = [job_id for future in [executor.submit(claim_all) for _ in range(8)] for job_id in future.result()]
+
+    assert sorted(claimed) == sorted(job_ids)
+
+
+@pytest.mark.django_db
+def test_failed_jobs_keep_the_error(settings, training_schedule):
+    settings.JOB_MAX_ATTEMPTS = 2
+    job = models.Job.objects.enqueue('propagate_exercises')
+
+    assert jobs.run_pending_jobs(max_jobs=1) == 1
+    job.refresh_from_db()
+    # queued again for another attempt
+    assert (job.status, job.attempts) == (models.Job.QUEUED, 1)
+    assert "KeyError: 'training_plan_id'" in job.error
+
+    assert jobs.run_pending_jobs() == 1
+
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (models.Job.FAILED, 2)
+    assert "KeyError: 'training_plan_id'" in job.error
+
+
+@pytest.mark.django_db
+def test_stale_running_jobs_are_requeued(settings, training_schedule):
+    settings.JOB_MAX_ATTEMPTS = 2
+    job = models.Job.objects.enqueue('add_target_activities', training_schedule=training_schedule)
+    assert models.Job.objects.claim() == job
+    # the worker died before the job was finished
+    assert models.Job.objects.claim() is None
+
+    models.Job.objects.filter(pk=job.pk).update(started=timezone.now() - datetime.timedelta(seconds=settings.JOB_TIMEOUT + 1))
+    job = models.Job.objects.claim()
+    assert (job.status, job.attempts) == (models.Job.RUNNING, 2)
+
+    models.Job.objects.filter(pk=job.pk).update(started=timezone.now() - datetime.timedelta(seconds=settings.JOB_TIMEOUT + 1))
+    assert models.Job.objects.claim() is None
+    job.refresh_from_db()
+    assert job.status == models.Job.FAILED
+    assert job.error == f"Timed out after {settings.JOB_TIMEOUT} seconds"
+
+
+@pytest.mark.django_db
+def test_the_worker_retries_claims_on_locked_databases(monkeypatch, training_schedule):
+    job = models.Job.objects.enqueue('add_target_activities', training_schedule=training_schedule)
+    claim = models.JobQuerySet.claim
+    claims = []
+
+    def locked_once(queryset):
+        claims.append(queryset)
+        if len(claims) == 1:
+            raise OperationalError('database is locked')
+        return claim(queryset)
+
+    monkeypatch.setattr(models.JobQuerySet, 'claim', locked_once)
+    run_jobs = []
+    jobs.run_worker(poll_interval=0, burst=True, on_job=run_jobs.append)
+
+    assert run_jobs == [job]
+    assert len(claims) == 3
+
+
+@pytest.mark.django_db
+def test_propagation_and_imports_are_queued(background_jobs, tmp_path, training_schedule, training_plan):
+    del training_plan.exercises['Plank']
+    training_plan.save()
+    propagation.exercises_changed(training_plan, ['Plank'])
+
+    path = tmp_path / 'activities.csv'
+    path.write_text("exercise,date,reps,weight,duration\nCurl,2024-01-01,8,20,\n")
+    stdout = io.StringIO()
+    call_command('import_activities', str(path), training_schedule=str(training_schedule.pk), background=True, stdout=stdout)
+    assert 'Queued the import as job' in stdout.getvalue()
+    assert not models.Activity.objects.exists()
+
+    stdout = io.StringIO()
+    call_command('run_worker', burst=True, stdout=stdout)
+
+    # in the order of the queue: the targets of the training schedule, the propagation and the import
+    assert [line.split()[0] for line in stdout.getvalue().splitlines()] == ['add_target_activities', 'propagate_exercises', 'import_activities']
+    assert stdout.getvalue().count('(done)') == 3
+    training_schedule.refresh_from_db()
+    assert 'Plank' not in training_schedule.target_activities['2024-01-01']
+    assert training_schedule.actual_activities == {'2024-01-01': {'Curl': [8.0, 20.0]}}
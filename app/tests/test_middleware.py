@@ -0,0 +1,55 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+
+from app import middleware, models
+
+
+@pytest.fixture
+def request_metrics(settings):
+    settings.REQUEST_METRICS = True
+    settings.REQUEST_METRICS_RAISE_ON_BUDGET = True
+    middleware.request_stats.clear()
+    return settings
+
+
+@pytest.mark.django_db
+def test_request_metrics_headers_and_stats(request_metrics, client, athlete, training_schedule):
+    client.force_login(athlete)
+    response = client.get(training_schedule.get_absolute_url())
+
+    assert int(response.headers['X-Query-Count']) > 0
+    assert 'sql;dur=' in response.headers['Server-Timing']
+    assert 'template;dur=' in response.headers['Server-Timing']
+    assert middleware.request_stats['training_schedule_detail']['requests'] == 1
+
+
+@pytest.mark.django_db
+def test_views_stay_within_their_query_budgets(request_metrics, client, athlete, training_plan, make_exercise):
+    for number in range(10):
+        training_plan.exercises[make_exercise(f'Exercise {number}').name] = [10, 1, 0, 0]
+    training_plan.save()
+    training_schedule = models.TrainingSchedule.objects.create(athlete=athlete, training_plan=training_plan, start_date=datetime.date(2024, 1, 1), duration=4, train_on_mondays=True)
+    client.force_login(athlete)
+
+    assert client.get(training_plan.get_absolute_url()).status_code == 200
+    assert client.get(training_schedule.get_absolute_url()).status_code == 200
+    assert client.get(reverse('get-target-activities', args=[training_schedule.pk]), {'date': '2024-01-01'}).status_code == 200
+    assert client.post(reverse('delete_exercise', args=[training_plan.pk, 'Exercise 0'])).status_code == 200
+
+
+@pytest.mark.django_db
+def test_exceeding_a_query_budget_raises(request_metrics, client, athlete, training_schedule):
+    request_metrics.REQUEST_METRICS_QUERY_BUDGETS = {'training_schedule_detail': 1}
+    client.force_login(athlete)
+    with pytest.raises(middleware.QueryBudgetExceeded):
+        client.get(training_schedule.get_absolute_url())
+
+
+@pytest.mark.django_db
+def test_request_metrics_endpoint_is_staff_only(request_metrics, client, admin_client):
+    assert client.get(reverse('request_metrics')).status_code == 302
+    response = admin_client.get(reverse('request_metrics'))
+    assert response.status_code == 200
+    assert response.json()['request_metrics']['requests'] == 1
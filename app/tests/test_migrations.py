@@ -0,0 +1,41 @@
+import datetime
+
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+
+def migrate(target):
+    executor = MigrationExecutor(connection)
+    executor.loader.build_graph()
+    executor.migrate([('app', target)])
+    return executor.loader.project_state([('app', target)]).apps
+
+
+@pytest.mark.django_db(transaction=True)
+def test_actual_activities_of_unknown_exercises_stop_the_migration(athlete):
+    apps = migrate('0011_alter_trainingplan_description_and_more')
+    try:
+        Exercise = apps.get_model('app', 'Exercise')
+        Muscle = apps.get_model('app', 'Muscle')
+        TrainingPlan = apps.get_model('app', 'TrainingPlan')
+        TrainingSchedule = apps.get_model('app', 'TrainingSchedule')
+        muscle = Muscle.objects.create(name='Biceps', muscle_group='Arms')
+        Exercise.objects.create(name='Curl', primary_muscle_focus=muscle, type='Strength', author_id=athlete.pk)
+        training_plan = TrainingPlan.objects.create(name='Plan', description='Description', author_id=athlete.pk, exercises={'Curl': [10, 2, 20, 1]})
+        TrainingSchedule.objects.create(
+            athlete_id=athlete.pk,
+            training_plan=training_plan,
+            start_date=datetime.date(2024, 1, 1),
+            duration=1,
+            actual_activities={'2024-01-01': {'Curl': [8, 20], 'Deleted row': [10, 30]}, '2024-01-02': {'Gone': [5, 0]}},
+        )
+
+        with pytest.raises(RuntimeError, match='name exercises that do not exist: Deleted row, Gone'):
+            migrate('0012_recordedactivity')
+
+        # the actual activities are still there to be fixed up
+        assert TrainingSchedule.objects.get().actual_activities['2024-01-02'] == {'Gone': [5, 0]}
+    finally:
+        TrainingSchedule.objects.all().delete()
+        migrate('0018_job')
@@ -0,0 +1,115 @@
+import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from app import models, propagation
+
+
+@pytest.fixture
+def training_schedules(athlete, training_plan):
+    return [
+        models.TrainingSchedule.objects.create(
+            athlete=athlete,
+            training_plan=training_plan,
+            start_date=datetime.date(2024, 1, 1) + datetime.timedelta(days=days),
+            duration=2,
+            train_on_mondays=True,
+        )
+        for days in range(5)
+    ]
+
+
+@pytest.mark.django_db
+def test_propagation_patches_only_the_changed_exercise(training_schedules, training_plan, make_exercise, django_assert_max_num_queries):
+    make_exercise('Squat')
+    training_plan.exercises['Squat'] = [5, 1, 50, 5]
+    training_plan.exercises['Curl'] = [99, 0, 0, 0]
+    training_plan.save()
+
+    # one query for the ids, then three batches, each a select for update and a bulk update within a savepoint
+    with django_assert_max_num_queries(1 + 3 * 4):
+        assert propagation.propagate_exercises(training_plan, ['Squat'], batch_size=2) == 5
+
+    training_schedule = models.TrainingSchedule.objects.get(pk=training_schedules[0].pk)
+    assert training_schedule.target_activities['2024-01-08']['Squat'] == [6, 55]
+    assert training_schedule.target_activities['2024-01-02']['Squat'] == [0, 0]
+    # Curl was not propagated
+    assert training_schedule.target_activities['2024-01-01']['Curl'] == [10, 20]
+
+
+@pytest.mark.django_db
+def test_propagation_removes_deleted_exercises_and_skips_lazy_schedules(training_schedules, training_plan, settings):
+    settings.LAZY_TARGET_ACTIVITIES = True
+    lazy_training_schedule = models.TrainingSchedule.objects.create(
+        athlete=training_schedules[0].athlete, training_plan=training_plan, start_date=datetime.date(2024, 1, 1), duration=1,
+    )
+    del training_plan.exercises['Plank']
+    training_plan.save()
+
+    assert propagation.propagate_exercises(training_plan, ['Plank']) == 5
+    for training_schedule in models.TrainingSchedule.objects.filter(target_activities__isnull=False):
+        assert all(list(target) == ['Curl'] for target in training_schedule.target_activities.values())
+    lazy_training_schedule.refresh_from_db()
+    assert lazy_training_schedule.target_activities is None
+
+
+@pytest.mark.django_db
+def test_training_plan_views_propagate_after_the_commit(client, athlete, training_plan, training_schedules, django_capture_on_commit_callbacks):
+    client.force_login(athlete)
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(reverse('delete_exercise', args=[training_plan.pk, 'Plank']))
+
+    training_schedule = models.TrainingSchedule.objects.get(pk=training_schedules[0].pk)
+    assert 'Plank' not in training_schedule.target_activities['2024-01-01']
+    assert training_schedule.updated > training_schedules[0].updated
+
+
+@pytest.mark.django_db
+def test_deferred_propagation_is_left_to_the_command(client, athlete, training_plan, training_schedules, django_capture_on_commit_callbacks):
+    client.force_login(athlete)
+    with override_settings(DEFER_TARGET_PROPAGATION=True), django_capture_on_commit_callbacks(execute=True) as callbacks:
+        client.post(reverse('delete_exercise', args=[training_plan.pk, 'Plank']))
+    assert callbacks == []
+    assert 'Plank' in models.TrainingSchedule.objects.get(pk=training_schedules[0].pk).target_activities['2024-01-01']
+
+    stdout = StringIO()
+    call_command('propagate_targets', training_plan=str(training_plan.pk), stdout=stdout)
+
+    assert 'Updated the target activities of 5 training schedules' in stdout.getvalue()
+    assert 'Plank' not in models.TrainingSchedule.objects.get(pk=training_schedules[0].pk).target_activities['2024-01-01']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('training_plan_id', ['not-a-uuid', '00000000-0000-0000-0000-000000000000'])
+def test_propagate_targets_command_rejects_unknown_training_plans(training_plan_id):
+    with pytest.raises(CommandError, match=f"Training plan {training_plan_id} does not exist"):
+        call_command('propagate_targets', training_plan=training_plan_id)
+
+
+@pytest.mark.django_db
+def test_exercises_that_were_not_propagated_yet_are_derived_from_the_training_plan(client, athlete, training_plan, training_schedule, make_exercise):
+    row = make_exercise('Row')
+    client.force_login(athlete)
+    with override_settings(DEFER_TARGET_PROPAGATION=True):
+        response = client.post(reverse('add_exercise', args=[training_plan.pk]), {
+            'exercise': row.pk,
+            'starting_repetitions': 5,
+            'repetition_progression_per_week': 1,
+            'starting_weight': 40,
+            'weight_progression_per_week': 2,
+        })
+    assert response.status_code == 200
+    training_schedule = models.TrainingSchedule.objects.get(pk=training_schedule.pk)
+    assert 'Row' not in training_schedule.target_activities['2024-01-08']
+
+    assert training_schedule.get_target_activity_absolute(datetime.date(2024, 1, 8), 'Row') == [6, 42]
+    assert training_schedule.get_target_repetitions_cumulative(datetime.date(2024, 1, 8), 'Row') == 16
+    response = client.get(reverse('get-target-activities', args=[training_schedule.pk]), {'date': '2024-01-08'})
+    assert response.status_code == 200
+    assert response.context['target_vs_actual_cumulative']['Row'] == [16, 0, -16]
+    response = client.get(reverse('export_training_schedule', args=[training_schedule.pk]))
+    assert '2024-01-08,Row,6.0,42.0' in b''.join(response.streaming_content).decode()
@@ -0,0 +1,43 @@
+import concurrent.futures
+import datetime
+
+import pytest
+from django.db import connection, connections
+
+from app import models
+
+
+def record(training_schedule_id, exercise_id, athlete, date, reps):
+    try:
+        training_schedule = models.TrainingSchedule.objects.get(pk=training_schedule_id)
+        activity = models.StrengthActivity.objects.create(exercise_id=exercise_id, date=date, athlete=athlete, reps=reps, weight=20)
+        training_schedule.record_activity(activity)
+    finally:
+        connections.close_all()
+
+
+@pytest.mark.skipif(
+    connection.vendor == 'sqlite' and not connection.settings_dict['TEST']['NAME'],
+    reason="the in-memory SQLite test database fails instead of waiting for locks, set a TEST NAME to run it on SQLite",
+)
+@pytest.mark.django_db(transaction=True)
+def test_parallel_recordings_are_not_lost(training_schedule, athlete, make_exercise):
+    exercise_ids = [models.Exercise.objects.get(name='Curl').pk, *(make_exercise(f'Exercise {number}').pk for number in range(3))]
+    dates = [training_schedule.start_date + datetime.timedelta(days=day) for day in range(5)]
+    recordings = [(exercise_id, date) for exercise_id in exercise_ids for date in dates]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        # every recording is submitted twice, like a double submit of the form
+        futures = [
+            executor.submit(record, training_schedule.pk, exercise_id, athlete, date, reps)
+            for exercise_id, date in recordings
+            for reps in (10, 10)
+        ]
+        for future in futures:
+            future.result()
+
+    training_schedule.refresh_from_db()
+    assert training_schedule.recorded_activities.count() == len(recordings)
+    assert training_schedule.recorded_activities_count == len(recordings)
+    assert training_schedule.recorded_days_count == len(dates)
+    assert training_schedule.recorded_exercises_count == len(exercise_ids)
@@ -0,0 +1,79 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from app import forms, models, reference
+
+
+@pytest.fixture
+def reference_data():
+    chest = models.Muscle.objects.create(name='Pectoralis', muscle_group='Chest')
+    models.Muscle.objects.create(name='Quadriceps', muscle_group='Legs')
+    barbell = models.Equipment.objects.create(name='Barbell')
+    models.Equipment.objects.create(name='Bench')
+    return chest, barbell
+
+
+@pytest.mark.django_db
+def test_reference_data_is_loaded_once_per_version(reference_data, django_assert_num_queries):
+    reference.get_all(models.Muscle)
+    with django_assert_num_queries(0):
+        assert [muscle.name for muscle in reference.get_all(models.Muscle)] == ['Pectoralis', 'Quadriceps']
+
+    models.Muscle.objects.create(name='Triceps', muscle_group='Arms')
+    with django_assert_num_queries(1):
+        assert [muscle.name for muscle in reference.get_all(models.Muscle)] == ['Triceps', 'Pectoralis', 'Quadriceps']
+
+
+@pytest.mark.django_db
+def test_exercise_form_renders_its_choices_without_queries(reference_data, django_assert_num_queries):
+    chest, barbell = reference_data
+    reference.get_all(models.Muscle)
+    reference.get_all(models.Equipment)
+
+    with django_assert_num_queries(0):
+        html = forms.ExerciseForm().as_p()
+    assert 'Quadriceps' in html and 'Bench' in html
+
+    # only the model validation of the foreign key checks the database, the choices come from the cache
+    form = forms.ExerciseForm({'name': 'Bench press', 'primary_muscle_focus': chest.pk, 'equipment': [barbell.pk], 'type': 'Strength'})
+    with django_assert_num_queries(1):
+        assert form.is_valid(), form.errors
+    assert form.cleaned_data['primary_muscle_focus'] == chest
+    assert form.cleaned_data['equipment'] == [barbell]
+
+    form = forms.ExerciseForm({'name': 'Bench press', 'primary_muscle_focus': barbell.pk, 'type': 'Strength'})
+    assert 'primary_muscle_focus' in form.errors
+
+
+@pytest.mark.django_db
+def test_exercise_detail_reads_muscles_and_equipment_from_the_cache(client, athlete, reference_data, django_assert_num_queries):
+    chest, barbell = reference_data
+    exercise = models.Exercise.objects.create(name='Bench press', primary_muscle_focus=chest, type='Strength', author=athlete)
+    exercise.equipment.add(barbell)
+    client.get(exercise.get_absolute_url())
+
+    # the exercise and its equipment relations
+    with django_assert_num_queries(2):
+        response = client.get(exercise.get_absolute_url())
+    assert 'Pectoralis (Chest)' in response.content.decode()
+    assert 'Barbell' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_exercise_admin_adds_exercises_with_their_author(client, athlete, reference_data):
+    chest, barbell = reference_data
+    client.force_login(get_user_model().objects.create_superuser(email='admin@example.com', password='password123'))
+
+    response = client.post(reverse('admin:app_exercise_add'), {
+        'name': 'Bench press',
+        'primary_muscle_focus': chest.pk,
+        'equipment': [barbell.pk],
+        'type': 'Strength',
+        'author': athlete.pk,
+    })
+
+    assert response.status_code == 302
+    exercise = models.Exercise.objects.get(name='Bench press')
+    assert exercise.author == athlete
+    assert list(exercise.equipment.all()) == [barbell]
@@ -0,0 +1,66 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+
+from app import models, rollups
+
+
+@pytest.fixture
+def recorded_training_schedule(training_plan, athlete):
+    training_schedule = models.TrainingSchedule.objects.create(
+        athlete=athlete,
+        training_plan=training_plan,
+        start_date=datetime.date(2024, 1, 1),
+        duration=6,
+        train_on_mondays=True,
+        train_on_thursdays=True,
+    )
+    curl = models.Exercise.objects.get(name='Curl')
+    plank = models.Exercise.objects.get(name='Plank')
+    recordings = [
+        models.StrengthActivity(exercise=curl, date=datetime.date(2024, 1, 1), athlete=athlete, reps=10, weight=20),
+        models.StrengthActivity(exercise=curl, date=datetime.date(2024, 1, 4), athlete=athlete, reps=8, weight=25),
+        models.IsometricActivity(exercise=plank, date=datetime.date(2024, 1, 4), athlete=athlete, duration=40),
+        models.StrengthActivity(exercise=curl, date=datetime.date(2024, 2, 1), athlete=athlete, reps=16, weight=20),
+    ]
+    for activity in recordings:
+        activity.save()
+        training_schedule.record_activity(activity)
+    return training_schedule
+
+
+@pytest.mark.django_db
+def test_weekly_rollups(recorded_training_schedule, athlete, django_assert_max_num_queries):
+    # an activity of the athlete in the first week that was not recorded in the training schedule
+    models.StrengthActivity.objects.create(exercise=models.Exercise.objects.get(name='Curl'), date=datetime.date(2024, 1, 2), athlete=athlete, reps=50, weight=50)
+
+    with django_assert_max_num_queries(4):
+        weekly_rollups = rollups.get_rollups(recorded_training_schedule, 'week')
+
+    assert [rollup['period'] for rollup in weekly_rollups] == [datetime.date(2024, 1, 1) + datetime.timedelta(weeks=week) for week in range(7)]
+    first_week = weekly_rollups[0]
+    assert first_week['volume'] == 10 * 20 + 8 * 25
+    assert first_week['repetitions'] == 18
+    assert first_week['isometric_duration'] == 40
+    assert first_week['target_repetitions'] == 2 * 10 + 2 * 30
+    assert first_week['actual_repetitions'] == 58
+    assert first_week['compliance'] == 72.5
+    assert first_week['muscle_groups'] == {'Arms': {'volume': 400, 'repetitions': 18, 'duration': 40}}
+    assert weekly_rollups[2]['compliance'] == 0
+
+
+@pytest.mark.django_db
+def test_monthly_rollups_view(client, recorded_training_schedule):
+    url = reverse('training_schedule_rollups', args=[recorded_training_schedule.pk])
+    response = client.get(url, {'period': 'month', 'format': 'json'})
+    monthly_rollups = response.json()['rollups']
+    assert [rollup['period'] for rollup in monthly_rollups] == ['2024-01-01', '2024-02-01']
+    assert monthly_rollups[1]['volume'] == 320
+    assert monthly_rollups[0]['target_repetitions'] + monthly_rollups[1]['target_repetitions'] == sum(
+        recorded_training_schedule.get_target_repetitions_cumulative(recorded_training_schedule.end_date, exercise_name)
+        for exercise_name in ('Curl', 'Plank')
+    )
+
+    assert client.get(url).status_code == 200
+    assert client.get(url, {'period': 'year'}).status_code == 400
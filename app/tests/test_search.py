@@ -0,0 +1,67 @@
+import pytest
+from django.urls import reverse
+
+from app import forms, models, search
+
+
+@pytest.fixture
+def exercises(athlete, muscle):
+    chest = models.Muscle.objects.create(name='Pectoralis', muscle_group='Chest')
+    barbell = models.Equipment.objects.create(name='Barbell')
+    bench_press = models.Exercise.objects.create(name='Bench press', description='Press the bar up', primary_muscle_focus=chest, type='Strength', author=athlete)
+    bench_press.equipment.add(barbell)
+    models.Exercise.objects.create(name='Push up', primary_muscle_focus=chest, type='Strength', author=athlete)
+    models.Exercise.objects.create(name='Plank', primary_muscle_focus=muscle, type='Isometric', author=athlete)
+    models.Exercise.objects.create(name='Overhead press', primary_muscle_focus=muscle, type='Strength', author=athlete)
+
+
+def get_names(exercises):
+    return [exercise.name for exercise in exercises]
+
+
+@pytest.mark.django_db
+def test_search_matches_word_prefixes_of_names_muscles_and_equipment(exercises):
+    assert get_names(search.search_exercises('pres')) == ['Bench press', 'Overhead press']
+    assert get_names(search.search_exercises('bench pr')) == ['Bench press']
+    assert get_names(search.search_exercises('chest')) == ['Bench press', 'Push up']
+    assert get_names(search.search_exercises('barbell')) == ['Bench press']
+    assert get_names(search.search_exercises('pl', type='Isometric')) == ['Plank']
+    assert search.search_exercises('') == []
+
+
+@pytest.mark.django_db
+def test_search_ranks_name_matches_first(exercises):
+    # 'up' is in the name of Push up and in the description of Bench press
+    assert get_names(search.search_exercises('up')) == ['Push up', 'Bench press']
+
+
+@pytest.mark.django_db
+def test_search_index_is_rebuilt_when_an_exercise_changes(exercises, athlete, muscle):
+    assert search.search_exercises('squat') == []
+    models.Exercise.objects.create(name='Squat', primary_muscle_focus=muscle, type='Strength', author=athlete)
+    assert get_names(search.search_exercises('squat')) == ['Squat']
+
+
+@pytest.mark.django_db
+def test_exercise_search_endpoint(client, exercises):
+    response = client.get(reverse('exercise_search'), {'q': 'press', 'type': 'Strength'})
+    assert [result['name'] for result in response.json()['results']] == ['Bench press', 'Overhead press']
+
+    response = client.get(reverse('exercise_search'), {'q': 'plank'}, HTTP_HX_REQUEST='true')
+    assert response.content.decode().strip().startswith('<option value="')
+    assert 'Plank' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_exercise_widget_renders_only_the_selected_exercise(exercises, django_assert_num_queries):
+    with django_assert_num_queries(0):
+        html = str(forms.RecordStrengthActivityForm()['exercise'])
+    assert html.count('<option') == 1
+    assert 'hx-get="/exercise_search"' in html
+
+    bench_press = models.Exercise.objects.get(name='Bench press')
+    form = forms.RecordStrengthActivityForm({'exercise': bench_press.pk, 'date': '2024-01-01', 'repetitions': 10, 'weight': 20})
+    assert form.is_valid()
+    html = str(form['exercise'])
+    assert html.count('<option') == 2
+    assert f'<option value="{bench_press.pk}" selected>Bench press</option>' in html
@@ -0,0 +1,86 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils.html import escape
+
+from app import models
+
+
+@pytest.fixture
+def admin_client(client):
+    client.force_login(get_user_model().objects.create_superuser(email='admin@example.com', password='password123'))
+    return client
+
+
+def get_changelist_results(admin_client, model_name):
+    response = admin_client.get(reverse(f'admin:app_{model_name}_changelist'))
+    assert response.status_code == 200
+    return list(response.context['cl'].result_list)
+
+
+@pytest.mark.django_db
+def test_changelists_leave_out_the_json_columns(admin_client, training_schedule):
+    models.Job.objects.enqueue('add_target_activities', training_schedule=training_schedule)
+
+    [training_plan] = get_changelist_results(admin_client, 'trainingplan')
+    assert 'exercises' in training_plan.get_deferred_fields()
+    [training_schedule] = get_changelist_results(admin_client, 'trainingschedule')
+    assert 'target_activities' in training_schedule.get_deferred_fields()
+    assert 'exercises' in training_schedule.training_plan.get_deferred_fields()
+    [job] = get_changelist_results(admin_client, 'job')
+    assert 'target_activities' in job.training_schedule.get_deferred_fields()
+
+
+@pytest.mark.django_db
+def test_foreign_key_choices_leave_out_the_json_columns(admin_client, training_schedule):
+    response = admin_client.get(reverse('admin:app_recordedactivity_add'))
+
+    [choice] = response.context['adminform'].form.fields['training_schedule'].queryset
+    assert 'target_activities' in choice.get_deferred_fields()
+    assert 'exercises' in choice.training_plan.get_deferred_fields()
+    assert escape(str(training_schedule)) in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_recorded_activity_admin_refreshes_the_counters(admin_client, training_schedule):
+    curl = models.Exercise.objects.get(name='Curl')
+    plank = models.Exercise.objects.get(name='Plank')
+    updated = training_schedule.updated
+
+    response = admin_client.post(reverse('admin:app_recordedactivity_add'), {
+        'training_schedule': training_schedule.pk,
+        'date': '2024-01-01',
+        'exercise': curl.pk,
+        'reps_or_duration': 10,
+        'weight': 20,
+    })
+    assert response.status_code == 302
+    recorded_activity = models.RecordedActivity.objects.get()
+    training_schedule.refresh_from_db()
+    assert training_schedule.get_highlights() == {'recorded_days': 1, 'recorded_activities': 1, 'recorded_exercises': 1}
+    # a new version of the cached analysis
+    assert training_schedule.updated > updated
+
+    admin_client.post(reverse('admin:app_recordedactivity_add'), {
+        'training_schedule': training_schedule.pk,
+        'date': '2024-01-04',
+        'exercise': plank.pk,
+        'reps_or_duration': 30,
+        'weight': 0,
+    })
+    training_schedule.refresh_from_db()
+    assert training_schedule.get_highlights() == {'recorded_days': 2, 'recorded_activities': 2, 'recorded_exercises': 2}
+
+    response = admin_client.post(reverse('admin:app_recordedactivity_delete', args=[recorded_activity.pk]), {'post': 'yes'})
+    assert response.status_code == 302
+    training_schedule.refresh_from_db()
+    assert training_schedule.get_highlights() == {'recorded_days': 1, 'recorded_activities': 1, 'recorded_exercises': 1}
+
+    response = admin_client.post(reverse('admin:app_recordedactivity_changelist'), {
+        'action': 'delete_selected',
+        '_selected_action': list(models.RecordedActivity.objects.values_list('pk', flat=True)),
+        'post': 'yes',
+    })
+    assert response.status_code == 302
+    training_schedule.refresh_from_db()
+    assert training_schedule.get_highlights() == {'recorded_days': 0, 'recorded_activities': 0, 'recorded_exercises': 0}
@@ -0,0 +1,64 @@
+import datetime
+
+import pytest
+from django.urls import reverse
+
+from app import models, timeseries
+
+np = pytest.importorskip('numpy')
+
+
+@pytest.fixture
+def recorded_training_schedule(training_schedule, athlete):
+    curl = models.Exercise.objects.get(name='Curl')
+    for date, reps in [(datetime.date(2024, 1, 1), 8), (datetime.date(2024, 1, 4), 11), (datetime.date(2024, 1, 9), 12)]:
+        training_schedule.record_activity(models.StrengthActivity.objects.create(exercise=curl, date=date, athlete=athlete, reps=reps, weight=20))
+    return models.TrainingSchedule.objects.get(pk=training_schedule.pk)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('targets', ['materialised', 'lazy', 'not propagated'])
+def test_time_series_matches_training_schedule(settings, recorded_training_schedule, targets):
+    if targets == 'lazy':
+        recorded_training_schedule.target_activities = None
+    elif targets == 'not propagated':
+        for target in recorded_training_schedule.target_activities.values():
+            del target['Plank']
+    time_series = timeseries.ScheduleTimeSeries.from_training_schedule(recorded_training_schedule)
+
+    assert time_series.target.shape == (29, 2, 2)
+    date = datetime.date(2023, 12, 30)
+    while date <= datetime.date(2024, 2, 3):
+        assert time_series.get_target_vs_actual_cumulative(date) == recorded_training_schedule.get_target_vs_actual_cumulative(date)
+        date += datetime.timedelta(days=1)
+
+    row = time_series.get_row(datetime.date(2024, 1, 1))
+    assert time_series.gaps[row, time_series.exercise_index['Curl']].tolist() == [-2.0, 0.0]
+    assert time_series.get_weekly_totals('actual')[:2, time_series.exercise_index['Curl'], 0].tolist() == [19.0, 12.0]
+    assert time_series.get_weekly_totals('target').shape == (5, 2, 2)
+
+
+@pytest.mark.django_db
+def test_time_series_is_cached_per_version(recorded_training_schedule, athlete, django_assert_num_queries):
+    time_series = timeseries.get_time_series(recorded_training_schedule)
+    assert timeseries.get_time_series(recorded_training_schedule) is time_series
+
+    other_instance = models.TrainingSchedule.objects.select_related('training_plan').get(pk=recorded_training_schedule.pk)
+    with django_assert_num_queries(0):
+        cached_time_series = timeseries.get_time_series(other_instance)
+    assert cached_time_series.actual.tolist() == time_series.actual.tolist()
+
+    curl = models.Exercise.objects.get(name='Curl')
+    other_instance.record_activity(models.StrengthActivity.objects.create(exercise=curl, date=datetime.date(2024, 1, 11), athlete=athlete, reps=5, weight=20))
+    assert timeseries.get_time_series(other_instance).get_target_vs_actual_cumulative(datetime.date(2024, 1, 11))['Curl'][1] == 36.0
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('with_numpy', [True, False])
+def test_analysis_reads_the_cumulative_table_from_the_time_series(client, monkeypatch, recorded_training_schedule, with_numpy):
+    if not with_numpy:
+        monkeypatch.setattr(timeseries, 'np', None)
+    response = client.get(reverse('get-target-activities', args=[recorded_training_schedule.pk]), {'date': '2024-01-09'})
+
+    assert response.context['target_vs_actual_cumulative'] == recorded_training_schedule.get_target_vs_actual_cumulative(datetime.date(2024, 1, 9))
+    assert ('_time_series' in response.context['training_schedule'].__dict__) == with_numpy
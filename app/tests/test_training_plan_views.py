@@ -0,0 +1,64 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from app import models
+
+
+def add_exercise(client, training_plan, exercise):
+    data = {
+        'exercise': exercise.pk,
+        'starting_repetitions': 10,
+        'repetition_progression_per_week': 1,
+        'starting_weight': 5,
+        'weight_progression_per_week': 0,
+    }
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(reverse('add_exercise', args=[training_plan.pk]), data)
+    assert response.status_code == 200
+    return response, len(queries)
+
+
+@pytest.mark.django_db
+def test_add_exercise_runs_a_fixed_number_of_queries(client, athlete, training_plan, make_exercise):
+    client.force_login(athlete)
+    dumbbell = models.Equipment.objects.create(name='Dumbbell')
+    query_counts = []
+    for number in range(4):
+        exercise = make_exercise(f'Exercise {number}')
+        exercise.equipment.add(dumbbell)
+        response, query_count = add_exercise(client, training_plan, exercise)
+        query_counts.append(query_count)
+
+    assert len(set(query_counts)) == 1
+    assert list(response.context['exercises'].values())[-1] == [10.0, 1.0, 5.0, 0.0]
+    assert response.context['equipment'] == ['Dumbbell']
+
+
+@pytest.mark.django_db
+def test_delete_exercise_keeps_plan_order(client, athlete, training_plan):
+    client.force_login(athlete)
+    response = client.post(reverse('delete_exercise', args=[training_plan.pk, 'Curl']))
+    assert response.status_code == 200
+    assert [exercise.name for exercise in response.context['exercises']] == ['Plank']
+
+
+@pytest.mark.django_db
+def test_training_plan_detail_lists_plan_exercises(client, athlete, training_plan):
+    client.force_login(athlete)
+    response = client.get(training_plan.get_absolute_url())
+    assert response.status_code == 200
+    assert [exercise.name for exercise in response.context['exercises']] == ['Curl', 'Plank']
+
+
+@pytest.mark.django_db
+def test_training_plan_list_counts_the_exercises_without_loading_them(client, athlete, training_plan):
+    models.TrainingPlan.objects.create(name='Empty plan', description='Description', author=athlete)
+    client.force_login(athlete)
+    response = client.get(reverse('training_plans'))
+
+    training_plans = response.context['trainingplan_list']
+    assert [(plan.name, plan.exercise_count) for plan in training_plans] == [('Empty plan', 0), ('Plan', 2)]
+    assert all('exercises' in plan.get_deferred_fields() for plan in training_plans)
+    assert '2 exercises' in response.content.decode()
@@ -0,0 +1,143 @@
+import datetime
+
+import pytest
+
+from app import models
+
+
+@pytest.mark.django_db
+def test_target_repetitions_cumulative(training_schedule):
+    # Mondays and Thursdays, 10 reps in week 1 and 12 reps in week 2
+    assert training_schedule.get_target_repetitions_cumulative(datetime.date(2023, 12, 31), 'Curl') == 0
+    assert training_schedule.get_target_repetitions_cumulative(datetime.date(2024, 1, 1), 'Curl') == 10
+    assert training_schedule.get_target_repetitions_cumulative(datetime.date(2024, 1, 3), 'Curl') == 10
+    assert training_schedule.get_target_repetitions_cumulative(datetime.date(2024, 1, 8), 'Curl') == 32
+    assert training_schedule.get_target_repetitions_cumulative(datetime.date(2024, 1, 11), 'Curl') == 44
+
+
+@pytest.mark.django_db
+def test_target_repetitions_cumulative_is_clamped_to_end_date(training_schedule):
+    end_date_total = training_schedule.get_target_repetitions_cumulative(training_schedule.end_date, 'Curl')
+    assert training_schedule.get_target_repetitions_cumulative(datetime.date(2025, 1, 1), 'Curl') == end_date_total
+    assert training_schedule.get_target_repetitions_cumulative(datetime.date(2025, 1, 1), 'Unknown') == 0
+
+
+@pytest.mark.django_db
+def test_actual_repetitions_cumulative_follows_recorded_activities(training_schedule, athlete):
+    curl = models.Exercise.objects.get(name='Curl')
+    assert training_schedule.get_actual_repetitions_cumulative(datetime.date(2024, 1, 10), 'Curl') == 0
+
+    for date, reps in [(datetime.date(2024, 1, 1), 8), (datetime.date(2024, 1, 4), 11)]:
+        activity = models.StrengthActivity.objects.create(exercise=curl, date=date, athlete=athlete, reps=reps, weight=20)
+        training_schedule.record_activity(activity)
+
+    assert training_schedule.get_actual_repetitions_cumulative(datetime.date(2024, 1, 3), 'Curl') == 8
+    assert training_schedule.get_actual_repetitions_cumulative(datetime.date(2024, 1, 10), 'Curl') == 19
+    assert training_schedule.get_target_vs_actual_cumulative(datetime.date(2024, 1, 4))['Curl'] == [20, 19, -1]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('start_date', [datetime.date(2024, 1, 1), datetime.date(2024, 1, 5)])
+def test_lazy_targets_match_materialised_targets(settings, athlete, training_plan, start_date):
+    schedule_kwargs = dict(athlete=athlete, training_plan=training_plan, start_date=start_date, duration=3, train_on_mondays=True, train_on_thursdays=True, train_on_saturdays=True)
+    materialised_schedule = models.TrainingSchedule.objects.create(**schedule_kwargs)
+    settings.LAZY_TARGET_ACTIVITIES = True
+    lazy_schedule = models.TrainingSchedule.objects.create(**schedule_kwargs)
+    lazy_schedule.refresh_from_db()
+    assert lazy_schedule.has_lazy_targets
+    assert not materialised_schedule.has_lazy_targets
+
+    date = start_date
+    while date <= materialised_schedule.end_date:
+        for exercise_name in training_plan.exercises:
+            assert lazy_schedule.get_target_activity_absolute(date, exercise_name) == materialised_schedule.get_target_activity_absolute(date, exercise_name)
+            lazy_cumulative = lazy_schedule.get_target_repetitions_cumulative(date, exercise_name)
+            materialised_cumulative = materialised_schedule.get_target_repetitions_cumulative(date, exercise_name)
+            assert lazy_cumulative == materialised_cumulative
+            assert type(lazy_cumulative) is type(materialised_cumulative)
+        date += datetime.timedelta(days=1)
+
+
+@pytest.mark.django_db
+def test_record_activity_stores_one_row_per_day_and_exercise(training_schedule, athlete):
+    curl = models.Exercise.objects.get(name='Curl')
+    plank = models.Exercise.objects.get(name='Plank')
+    date = datetime.date(2024, 1, 1)
+    for reps in [8, 9]:
+        training_schedule.record_activity(models.StrengthActivity.objects.create(exercise=curl, date=date, athlete=athlete, reps=reps, weight=20))
+    training_schedule.record_activity(models.IsometricActivity.objects.create(exercise=plank, date=date, athlete=athlete, duration=45))
+
+    assert models.RecordedActivity.objects.filter(training_schedule=training_schedule).count() == 2
+    training_schedule.refresh_from_db()
+    assert training_schedule.actual_activities == {'2024-01-01': {'Curl': [9.0, 20.0], 'Plank': [45.0, 0.0]}}
+    assert training_schedule.get_actual_activity_absolute(date, 'Curl') == [9.0, 20.0]
+    assert training_schedule.get_number_of_recorded_activities() == 2
+
+
+@pytest.mark.django_db
+def test_target_vs_actual_absolute_resolves_exercises_once(training_schedule, athlete, make_exercise, django_assert_num_queries):
+    row = make_exercise('Row')
+    training_schedule.record_activity(models.StrengthActivity.objects.create(exercise=row, date=datetime.date(2024, 1, 1), athlete=athlete, reps=5, weight=50))
+    training_schedule.refresh_from_db()
+    training_schedule.training_plan
+
+    exercise_cache = dict()
+    with django_assert_num_queries(2):
+        target_vs_actual = training_schedule.get_target_vs_actual_absolute(datetime.date(2024, 1, 1), exercise_cache)
+    assert [exercise.name for exercise in target_vs_actual] == ['Curl', 'Plank', 'Row']
+    assert target_vs_actual[row] == [[0, 0], [5.0, 50.0], [5.0, 50.0]]
+    assert set(exercise_cache) == {'Curl', 'Plank', 'Row'}
+
+    with django_assert_num_queries(0):
+        training_schedule.get_target_vs_actual_absolute(datetime.date(2024, 1, 8), exercise_cache)
+
+
+@pytest.mark.django_db
+def test_highlights_are_counted_incrementally(training_schedule, athlete, django_assert_num_queries):
+    curl = models.Exercise.objects.get(name='Curl')
+    plank = models.Exercise.objects.get(name='Plank')
+    recordings = [
+        models.StrengthActivity(exercise=curl, date=datetime.date(2024, 1, 1), athlete=athlete, reps=8, weight=20),
+        models.StrengthActivity(exercise=curl, date=datetime.date(2024, 1, 1), athlete=athlete, reps=9, weight=20),
+        models.IsometricActivity(exercise=plank, date=datetime.date(2024, 1, 1), athlete=athlete, duration=30),
+        models.StrengthActivity(exercise=curl, date=datetime.date(2024, 1, 4), athlete=athlete, reps=10, weight=20),
+    ]
+    for activity in recordings:
+        activity.save()
+        training_schedule.record_activity(activity)
+
+    assert training_schedule.get_highlights() == {'recorded_days': 2, 'recorded_activities': 3, 'recorded_exercises': 2}
+    training_schedule = models.TrainingSchedule.objects.get(pk=training_schedule.pk)
+    with django_assert_num_queries(0):
+        assert training_schedule.get_highlights() == {'recorded_days': 2, 'recorded_activities': 3, 'recorded_exercises': 2}
+    assert training_schedule.get_unique_exercises_recorded() == ['Curl', 'Plank']
+
+
+@pytest.mark.django_db
+def test_cumulative_indexes_are_cached_across_instances(training_schedule, athlete, monkeypatch, django_assert_num_queries):
+    built_indexes = []
+    build_cumulative_index = models.TrainingSchedule._build_cumulative_index
+    monkeypatch.setattr(models.TrainingSchedule, '_build_cumulative_index', lambda self, kind: built_indexes.append(kind) or build_cumulative_index(self, kind))
+
+    def load_and_sum_up():
+        training_schedule = models.TrainingSchedule.objects.select_related('training_plan').get(pk=training_schedule_id)
+        with django_assert_num_queries(0 if built_indexes else 1):
+            return [
+                training_schedule.get_target_repetitions_cumulative(datetime.date(2024, 1, 8), 'Curl'),
+                training_schedule.get_actual_repetitions_cumulative(datetime.date(2024, 1, 8), 'Curl'),
+            ]
+
+    training_schedule_id = training_schedule.pk
+    curl = models.Exercise.objects.get(name='Curl')
+    training_schedule.record_activity(models.StrengthActivity.objects.create(exercise=curl, date=datetime.date(2024, 1, 1), athlete=athlete, reps=8, weight=20))
+    assert load_and_sum_up() == [32, 8]
+    assert built_indexes == ['target', 'actual']
+
+    # later requests neither load nor sum up the activities again
+    assert load_and_sum_up() == [32, 8]
+    assert built_indexes == ['target', 'actual']
+
+    training_schedule.record_activity(models.StrengthActivity.objects.create(exercise=curl, date=datetime.date(2024, 1, 4), athlete=athlete, reps=9, weight=20))
+    built_indexes.clear()
+    assert load_and_sum_up() == [32, 17]
+    assert built_indexes == ['target', 'actual']
@@ -0,0 +1,121 @@
+import datetime
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from app import models, rollups
+
+
+def get_analysis(client, training_schedule, date='2024-01-01', **headers):
+    return client.get(reverse('get-target-activities', args=[training_schedule.pk]), {'date': date}, headers=headers)
+
+
+@pytest.mark.django_db
+def test_analysis_is_cached_until_the_schedule_changes(client, training_schedule, athlete, django_assert_max_num_queries):
+    first_response = get_analysis(client, training_schedule)
+    assert first_response.status_code == 200
+    assert first_response.headers['ETag']
+    assert first_response.headers['Last-Modified']
+
+    with django_assert_max_num_queries(1):
+        cached_response = get_analysis(client, training_schedule)
+    assert cached_response.content == first_response.content
+
+    curl = models.Exercise.objects.get(name='Curl')
+    training_schedule.record_activity(models.StrengthActivity.objects.create(exercise=curl, date=datetime.date(2024, 1, 1), athlete=athlete, reps=7, weight=20))
+    updated_response = get_analysis(client, training_schedule)
+    assert updated_response.headers['ETag'] != first_response.headers['ETag']
+    assert updated_response.context['target_vs_actual_cumulative']['Curl'] == [10, 7.0, -3.0]
+
+
+@pytest.mark.django_db
+def test_analysis_is_invalidated_by_training_plan_changes(client, training_schedule):
+    first_response = get_analysis(client, training_schedule)
+    training_schedule.training_plan.name = 'Renamed'
+    training_schedule.training_plan.save()
+    assert get_analysis(client, training_schedule).headers['ETag'] != first_response.headers['ETag']
+
+
+@pytest.mark.django_db
+def test_analysis_answers_not_modified_for_matching_etag(client, training_schedule):
+    etag = get_analysis(client, training_schedule).headers['ETag']
+    response = get_analysis(client, training_schedule, If_None_Match=etag)
+    assert response.status_code == 304
+    assert get_analysis(client, training_schedule, date='2024-01-02', If_None_Match=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_analysis_of_missing_schedule(client, training_schedule):
+    assert client.get(reverse('get-target-activities', args=[training_schedule.pk])).status_code == 400
+    missing_schedule = models.TrainingSchedule(pk='00000000-0000-0000-0000-000000000000')
+    assert get_analysis(client, missing_schedule).status_code == 404
+
+
+@pytest.mark.django_db
+def test_export_streams_the_timeline_with_cumulative_values(client, training_schedule, athlete):
+    curl = models.Exercise.objects.get(name='Curl')
+    training_schedule.record_activity(models.StrengthActivity.objects.create(exercise=curl, date=datetime.date(2024, 1, 4), athlete=athlete, reps=9, weight=20))
+
+    response = client.get(reverse('export_training_schedule', args=[training_schedule.pk]), {'format': 'ndjson'})
+    assert response.status_code == 200
+    assert response.streaming
+    rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    days = (training_schedule.end_date - training_schedule.start_date).days + 1
+    assert len(rows) == days * 2
+    for row in rows:
+        date = datetime.date.fromisoformat(row['date'])
+        assert row['cumulative_target_repetitions'] == training_schedule.get_target_repetitions_cumulative(date, row['exercise'])
+        assert row['cumulative_actual_repetitions'] == training_schedule.get_actual_repetitions_cumulative(date, row['exercise'])
+    assert rows[6] == {
+        'date': '2024-01-04', 'exercise': 'Curl',
+        'target_repetitions': 10, 'target_weight': 20, 'actual_repetitions': 9.0, 'actual_weight': 20.0,
+        'gap_repetitions': -1.0, 'gap_weight': 0.0,
+        'cumulative_target_repetitions': 20, 'cumulative_actual_repetitions': 9.0, 'cumulative_gap_repetitions': -11.0,
+    }
+
+
+@pytest.mark.django_db
+def test_export_as_csv(client, training_schedule):
+    response = client.get(reverse('export_training_schedule', args=[training_schedule.pk]))
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    assert response.headers['Content-Type'] == 'text/csv'
+    assert lines[0].startswith('date,exercise,target_repetitions')
+    assert lines[1] == '2024-01-01,Curl,10,20,0,0,-10,-20,10,0,-10'
+    assert client.get(reverse('export_training_schedule', args=[training_schedule.pk]), {'format': 'xml'}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_progress_of_training_schedules(training_schedule, athlete):
+    curl = models.Exercise.objects.get(name='Curl')
+    training_schedule.record_activity(models.StrengthActivity.objects.create(exercise=curl, date=datetime.date(2024, 1, 1), athlete=athlete, reps=8, weight=20))
+
+    [before_start] = rollups.attach_progress(models.TrainingSchedule.objects.summary(), datetime.date(2023, 12, 1))
+    [second_week] = rollups.attach_progress(models.TrainingSchedule.objects.summary(), datetime.date(2024, 1, 8))
+    [after_end] = rollups.attach_progress(models.TrainingSchedule.objects.summary(), datetime.date(2024, 3, 1))
+
+    assert before_start.progress == {'elapsed': 0, 'compliance': None}
+    # 8 of the 32 Curl and 95 Plank target repetitions of the first 8 out of 29 days
+    assert second_week.progress == {'elapsed': 28, 'compliance': 6}
+    assert after_end.progress['elapsed'] == 100
+
+
+@pytest.mark.django_db
+def test_home_runs_a_fixed_number_of_queries(client, athlete, training_plan, training_schedule):
+    client.force_login(athlete)
+    with CaptureQueriesContext(connection) as single_schedule_queries:
+        response = client.get(reverse('home'))
+    assert '100% done' in response.content.decode()
+    assert '0% compliance' in response.content.decode()
+
+    for days in range(1, 4):
+        models.TrainingSchedule.objects.create(athlete=athlete, training_plan=training_plan, start_date=datetime.date(2024, 2, days), duration=1, train_on_fridays=True)
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('home'))
+
+    assert len(response.context['training_schedules']) == 4
+    assert len(queries) == len(single_schedule_queries)
+    assert not any('"target_activities"' in query['sql'] for query in queries.captured_queries)
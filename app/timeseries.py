@@ -0,0 +1,156 @@
+"""
+Columnar time series of a training schedule, backed by NumPy arrays
+
+With NumPy installed the cumulative target vs actual tables of the training schedule pages are read from the cached time
+series, see get_target_vs_actual_cumulative. NumPy is in requirements.txt, so this is the path of the deployed app. It
+stays optional for other installs, without it the model methods are used.
+"""
+import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+
+from . import caching, models
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+REPETITIONS = 0
+WEIGHT = 1
+
+
+class ScheduleTimeSeries:
+    """
+    Dense target and actual matrices of a training schedule with the shape (days, exercises, [repetitions, weight])
+
+    Row 0 is the start date of the training schedule, the columns follow exercise_names. Dates map to rows with a simple offset.
+    """
+
+    def __init__(self, start_date:datetime.date, exercise_names:list, target, actual):
+        self.start_date = start_date
+        self.exercise_names = exercise_names
+        self.exercise_index = {exercise_name: column for column, exercise_name in enumerate(exercise_names)}
+        self.target = target
+        self.actual = actual
+
+    @classmethod
+    def from_training_schedule(cls, training_schedule:models.TrainingSchedule):
+        if np is None:
+            raise ImproperlyConfigured("NumPy is required for the time series of a training schedule, install it with 'pip install numpy'")
+
+        exercise_names = training_schedule.get_all_exercises()
+        exercise_index = {exercise_name: column for column, exercise_name in enumerate(exercise_names)}
+        days = (training_schedule.end_date - training_schedule.start_date).days + 1
+        target = np.zeros((days, len(exercise_names), 2))
+        actual = np.zeros((days, len(exercise_names), 2))
+
+        planned_exercises = training_schedule.training_plan.exercises or {}
+        stored_exercise_names = set()
+        if not training_schedule.has_lazy_targets:
+            for date_key, values in training_schedule.target_activities.items():
+                row = (datetime.date.fromisoformat(date_key) - training_schedule.start_date).days
+                for exercise_name, (reps, weight) in values.items():
+                    if exercise_name in planned_exercises:
+                        stored_exercise_names.add(exercise_name)
+                        target[row, exercise_index[exercise_name]] = reps, weight
+
+        # lazy targets and exercises that were not propagated to the materialised targets yet are derived from the training plan
+        offsets = np.arange(days)
+        weeks = offsets // 7
+        training_days = np.array(training_schedule.get_training_days())
+        is_training_day = training_days[(training_schedule.start_date.weekday() + offsets) % 7]
+        for column, exercise_name in enumerate(exercise_names):
+            if exercise_name not in planned_exercises or exercise_name in stored_exercise_names:
+                continue
+            starting_reps, repetition_progression_per_week, starting_weight, weight_progression_per_week = planned_exercises[exercise_name]
+            target[:, column, REPETITIONS] = is_training_day * (starting_reps + weeks * repetition_progression_per_week)
+            target[:, column, WEIGHT] = is_training_day * (starting_weight + weeks * weight_progression_per_week)
+
+        time_series = cls(training_schedule.start_date, exercise_names, target, actual)
+        for date_key, values in training_schedule.actual_activities.items():
+            row = time_series.get_row(datetime.date.fromisoformat(date_key))
+            for exercise_name, (reps_or_duration, weight) in values.items():
+                actual[row, exercise_index[exercise_name]] = reps_or_duration, weight
+
+        return time_series
+
+    @property
+    def end_date(self) -> datetime.date:
+        return self.start_date + datetime.timedelta(days=len(self.target) - 1)
+
+    def get_row(self, date:datetime.date) -> int:
+        """Get the row of the given date, -1 for dates before the start date and the last row for dates after the end date"""
+        return min(max((date - self.start_date).days, -1), len(self.target) - 1)
+
+    @property
+    def gaps(self):
+        """Actual minus target per day, exercise and [repetitions, weight]"""
+        return self.actual - self.target
+
+    def get_cumulative_repetitions(self):
+        """Get the cumulative target and actual repetitions per day and exercise, shape (days, exercises, [target, actual])"""
+        if not hasattr(self, '_cumulative_repetitions'):
+            repetitions = np.stack([self.target[:, :, REPETITIONS], self.actual[:, :, REPETITIONS]], axis=-1)
+            self._cumulative_repetitions = np.cumsum(repetitions, axis=0)
+        return self._cumulative_repetitions
+
+    def get_target_vs_actual_cumulative(self, date:datetime.date) -> dict:
+        """
+        Get the cumulative target vs actual repetitions up to the given date, like TrainingSchedule.get_target_vs_actual_cumulative
+
+        Returns:
+            dict: {exercise_name: [target_repetitions, actual_repetitions, gap_repetitions]}
+        """
+        row = self.get_row(date)
+        if row < 0:
+            return {exercise_name: [0, 0, 0] for exercise_name in self.exercise_names}
+
+        cumulative_repetitions = self.get_cumulative_repetitions()[row]
+        return {
+            exercise_name: [target, actual, actual - target]
+            for exercise_name, (target, actual) in zip(self.exercise_names, cumulative_repetitions.tolist())
+        }
+
+    def get_weekly_totals(self, kind:str='actual'):
+        """Get the target or actual sums per training week and exercise, shape (weeks, exercises, [repetitions, weight])"""
+        values = self.target if kind == 'target' else self.actual
+        weeks = -(-len(values) // 7)
+        padded = np.zeros((weeks * 7, *values.shape[1:]))
+        padded[:len(values)] = values
+        return padded.reshape(weeks, 7, *values.shape[1:]).sum(axis=1)
+
+
+def get_time_series(training_schedule:models.TrainingSchedule) -> ScheduleTimeSeries:
+    """
+    Get the time series of a training schedule
+
+    The time series is kept on the instance for repeated calls within a request and in the cache for other requests.
+    The cache key contains the version of the training schedule and its plan, so saving either builds a new time series.
+    """
+    if '_time_series' not in training_schedule.__dict__:
+        version = (training_schedule.updated, training_schedule.training_plan.updated)
+        cache_key = caching.get_version_cache_key('training_schedule_time_series', training_schedule.pk, version)
+        training_schedule.__dict__['_time_series'] = cache.get_or_set(
+            cache_key,
+            lambda: ScheduleTimeSeries.from_training_schedule(training_schedule),
+            settings.ANALYSIS_CACHE_TIMEOUT,
+        )
+    return training_schedule.__dict__['_time_series']
+
+
+def get_target_vs_actual_cumulative(training_schedule:models.TrainingSchedule, date:datetime.date) -> dict:
+    """
+    Get the cumulative target vs actual repetitions of a training schedule up to the given date
+
+    Read from the cached time series if NumPy is installed, otherwise computed by TrainingSchedule.get_target_vs_actual_cumulative.
+
+    Returns:
+        dict: {exercise_name: [target_repetitions, actual_repetitions, gap_repetitions]}
+    """
+    if np is None:
+        return training_schedule.get_target_vs_actual_cumulative(date)
+    return get_time_series(training_schedule).get_target_vs_actual_cumulative(date)
@@ -1,21 +1,30 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# the async variants only pay off when served by an ASGI server, see src/gunicorn_asgi.py
+endpoints = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
-    path('', views.HomeView.as_view(), name='home'),
+    path('', endpoints.HomeView.as_view(), name='home'),
     path('training_plans/', views.TrainingPlansListView.as_view(), name='training_plans'),
     path('training_plan/<uuid:pk>/', views.TrainingPlanDetailView.as_view(), name='training_plan_detail'),
     path('add_exercise/<uuid:pk>/', views.add_exercise, name='add_exercise'),
     path('delete_exercise/<uuid:pk>/<str:exercise_name>/', views.delete_exercise, name='delete_exercise'),
     path('training_schedule/<uuid:pk>/', views.TrainingScheduleDetailView.as_view(), name='training_schedule_detail'),
-    path('get-target-activities/<uuid:pk>/', views.GetTrainingScheduleAnalysisView.as_view(), name='get-target-activities'),
-    path('record_strength_activity/<uuid:pk>/', views.RecordStrengthActivityView.as_view(), name='record_strength_activity'),
-    path('record_isometric_activity/<uuid:pk>/', views.RecordIsometricActivityView.as_view(), name='record_isometric_activity'),
-    path('record_cardio_activity/<uuid:pk>/', views.RecordCardioActivityView.as_view(), name='record_cardio_activity'),
+    path('get-target-activities/<uuid:pk>/', endpoints.GetTrainingScheduleAnalysisView.as_view(), name='get-target-activities'),
+    path('training_schedule/<uuid:pk>/export/', views.ExportTrainingScheduleView.as_view(), name='export_training_schedule'),
+    path('training_schedule/<uuid:pk>/rollups/', views.TrainingScheduleRollupsView.as_view(), name='training_schedule_rollups'),
+    path('training_schedule/<uuid:pk>/chart_data/', views.TrainingScheduleChartDataView.as_view(), name='training_schedule_chart_data'),
+    path('record_strength_activity/<uuid:pk>/', endpoints.RecordStrengthActivityView.as_view(), name='record_strength_activity'),
+    path('record_isometric_activity/<uuid:pk>/', endpoints.RecordIsometricActivityView.as_view(), name='record_isometric_activity'),
+    path('record_cardio_activity/<uuid:pk>/', endpoints.RecordCardioActivityView.as_view(), name='record_cardio_activity'),
     path('exercise_detail/<uuid:pk>/', views.ExerciseDetailView.as_view(), name='exercise_detail'),
     path('training_plan_create', views.TrainingPlanCreateView.as_view(), name='create_training_plan'),
     path('training_schedule_create', views.TrainingScheduleCreateView.as_view(), name='create_training_schedule'),
     path('help', views.HelpView.as_view(), name='help'),
     path('create_exercise', views.ExerciseCreateView.as_view(), name='create_exercise'),
     path('exercise_list', views.ExerciseListView.as_view(), name='exercise_list'),
+    path('exercise_search', views.exercise_search, name='exercise_search'),
+    path('request_metrics', views.request_metrics, name='request_metrics'),
 ]
\ No newline at end of file
@@ -1,18 +1,22 @@
 from datetime import datetime, timedelta
 from typing import Any
 
+from django.conf import settings
+from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
 from django.views.generic import TemplateView, ListView, DetailView, CreateView
-from django.http import HttpResponseBadRequest, JsonResponse
+from django.http import Http404, HttpResponseBadRequest, JsonResponse, QueryDict, StreamingHttpResponse
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.views import View
 from django.template.loader import render_to_string
-from django.db.models import Q
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 
 
-from .import models, forms
+from .import caching, charts, exports, library, middleware, models, forms, propagation, reference, rollups, search, timeseries
 # Create your views here.
 class HomeView(TemplateView):
     template_name = 'home.html'
@@ -20,7 +24,8 @@ class HomeView(TemplateView):
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
         if self.request.user.is_authenticated:
-            context['training_schedules'] = models.TrainingSchedule.objects.filter(athlete=self.request.user)
+            training_schedules = models.TrainingSchedule.objects.filter(athlete=self.request.user).summary()
+            context['training_schedules'] = rollups.attach_progress(training_schedules, datetime.today().date())
         else:
             context['training_schedules'] = models.TrainingSchedule.objects.none()
         return context
@@ -28,6 +33,7 @@ class HomeView(TemplateView):
     
 class TrainingPlansListView(LoginRequiredMixin, ListView):
     model = models.TrainingPlan
+    queryset = models.TrainingPlan.objects.summary()
     template_name = 'training_plans_list.html'
     
 class TrainingPlanDetailView(LoginRequiredMixin, DetailView):
@@ -38,21 +44,8 @@ class TrainingPlanDetailView(LoginRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         context['form'] = forms.AddExerciseForm()
         context['exercises'] = models.Exercise.objects.all()
-        training_plan = get_object_or_404(models.TrainingPlan, pk=self.kwargs['pk'])
-        equipment_list = []
-        if training_plan.exercises is not None:
-            for exercise_name, values in training_plan.exercises.items():
-                exercise = models.Exercise.objects.get(name=exercise_name)
-                for equipment in exercise.equipment.all():
-                    if equipment not in equipment_list:
-                        equipment_list.append(equipment.name)
-            context['equipment'] = equipment_list
-            
-            exercises = dict()
-            for exercise_name, values in training_plan.exercises.items():
-                exercise = models.Exercise.objects.get(name=exercise_name)
-                exercises[exercise] = values
-            context['exercises'] = exercises
+        if self.object.exercises is not None:
+            context['exercises'], context['equipment'] = self.object.resolve_exercises()
         
         return context
     
@@ -74,18 +67,8 @@ def add_exercise(request, pk):
                 training_plan.exercises = {}
             training_plan.exercises[exercise.name] = [float(starting_repetitions), float(repetition_progression_per_week), float(starting_weight), float(weight_progression_per_week)]
             training_plan.save()
-            training_plan = models.TrainingPlan.objects.get(pk=pk)
-            equipment_list = []
-            for exercise_name, values in training_plan.exercises.items():
-                exercise = models.Exercise.objects.get(name=exercise_name)
-                for equipment in exercise.equipment.all():
-                    if equipment not in equipment_list:
-                        equipment_list.append(equipment.name)
-            
-            exercises = dict()
-            for exercise_name, values in training_plan.exercises.items():
-                exercise = models.Exercise.objects.get(name=exercise_name)
-                exercises[exercise] = values
+            propagation.exercises_changed(training_plan, [exercise.name])
+            exercises, equipment_list = training_plan.resolve_exercises()
             
             return render(request, 'snippet_tp_exercises.html', {'form': form, 'trainingplan': training_plan, 'equipment': equipment_list, 'exercises': exercises})
         else:
@@ -103,18 +86,9 @@ def delete_exercise(request, pk, exercise_name):
         if training_plan.exercises is not None and exercise_name in training_plan.exercises:
             del training_plan.exercises[exercise_name]
             training_plan.save()
-        equipment_list = []
-        for exercise_name, values in training_plan.exercises.items():
-            exercise = models.Exercise.objects.get(name=exercise_name)
-            for equipment in exercise.equipment.all():
-                if equipment not in equipment_list:
-                    equipment_list.append(equipment.name)
-                    
-        exercises = dict()
-        for exercise_name, values in training_plan.exercises.items():
-            exercise = models.Exercise.objects.get(name=exercise_name)
-            exercises[exercise] = values
-          
+            propagation.exercises_changed(training_plan, [exercise_name])
+        exercises, equipment_list = training_plan.resolve_exercises()
+
     return render(request, 'snippet_tp_exercises.html', {'trainingplan': training_plan, 'equipment': equipment_list, 'exercises': exercises})
 
 class TrainingScheduleDetailView(DetailView):
@@ -126,21 +100,48 @@ class TrainingScheduleDetailView(DetailView):
         training_schedule = get_object_or_404(models.TrainingSchedule, pk=self.kwargs['pk'])
         date = datetime.today().date()
         target_vs_actual_absolute = training_schedule.get_target_vs_actual_absolute(date)
-        target_vs_actual_cumulative = training_schedule.get_target_vs_actual_cumulative(date)
+        target_vs_actual_cumulative = timeseries.get_target_vs_actual_cumulative(training_schedule, date)
         context['target_vs_actual_absolute'] = target_vs_actual_absolute
         context['target_vs_actual_cumulative'] = target_vs_actual_cumulative
+        context['jobs'] = training_schedule.jobs.exclude(status=models.Job.DONE)
         return context
     
     
 class GetTrainingScheduleAnalysisView(View):
     def get(self, request, *args, **kwargs):
-        training_schedule = models.TrainingSchedule.objects.get(pk=kwargs['pk'])
         selected_date = request.GET.get('date')
         if selected_date is None:
             # Handle the error, for example by returning an HTTP 400 response
             return HttpResponseBadRequest("Missing 'date' parameter")
         
         selected_date = datetime.strptime(selected_date, '%Y-%m-%d').date()
+        version = caching.get_analysis_version(kwargs['pk'])
+        if version is None:
+            raise Http404("No training schedule found matching the query")
+        
+        # Let the browser reuse its copy if the training schedule and plan have not been saved since
+        cache_key = caching.get_analysis_cache_key(kwargs['pk'], selected_date, version)
+        etag = caching.get_analysis_etag(cache_key)
+        last_modified = caching.get_analysis_last_modified(version)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            target_activities_html = caching.get_or_render_analysis(cache_key, lambda: self.render_analysis(kwargs['pk'], selected_date))
+            response = HttpResponse(target_activities_html)
+        
+        return self.add_validators(response, etag, last_modified)
+    
+    def add_validators(self, response, etag, last_modified):
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    
+    def render_analysis(self, pk, selected_date):
+        return render_to_string('target_vs_actual.html', self.get_analysis_context(pk, selected_date))
+    
+    def get_analysis_context(self, pk, selected_date):
+        """Run the queries of the analysis, the returned context renders without touching the database"""
+        training_schedule = models.TrainingSchedule.objects.get(pk=pk)
         if selected_date < training_schedule.start_date or selected_date > training_schedule.end_date:
             date_warning = True
         else:
@@ -148,13 +149,66 @@ class GetTrainingScheduleAnalysisView(View):
 
         # Get the activities for the selected date
         target_vs_actual_absolute = training_schedule.get_target_vs_actual_absolute(selected_date)
-        target_vs_actual_cumulative = training_schedule.get_target_vs_actual_cumulative(selected_date)
+        target_vs_actual_cumulative = timeseries.get_target_vs_actual_cumulative(training_schedule, selected_date)
         
-        # Format the target activities into HTML
-        target_activities_html = render_to_string('target_vs_actual.html', {'target_vs_actual_absolute': target_vs_actual_absolute, 'target_vs_actual_cumulative': target_vs_actual_cumulative, 'date': selected_date, "date_warning": date_warning, "training_schedule": training_schedule})
+        return {'target_vs_actual_absolute': target_vs_actual_absolute, 'target_vs_actual_cumulative': target_vs_actual_cumulative, 'date': selected_date, "date_warning": date_warning, "training_schedule": training_schedule}
+    
 
-        # Return the target activities as an HTML response
-        return HttpResponse(target_activities_html)
+class ExportTrainingScheduleView(View):
+    content_types = {
+        'csv': 'text/csv',
+        'ndjson': 'application/x-ndjson',
+    }
+    
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in self.content_types:
+            return HttpResponseBadRequest("Unsupported 'format' parameter, use 'csv' or 'ndjson'")
+        
+        training_schedule = get_object_or_404(models.TrainingSchedule.objects.select_related('training_plan'), pk=kwargs['pk'])
+        rows = exports.iter_timeline_csv(training_schedule) if export_format == 'csv' else exports.iter_timeline_ndjson(training_schedule)
+        response = StreamingHttpResponse(rows, content_type=self.content_types[export_format])
+        response.headers['Content-Disposition'] = f'attachment; filename="training_schedule_{training_schedule.pk}.{export_format}"'
+        return response
+    
+
+class TrainingScheduleRollupsView(DetailView):
+    model = models.TrainingSchedule
+    template_name = 'training_schedule_rollups.html'
+    
+    def get(self, request, *args, **kwargs):
+        period = request.GET.get('period', 'week')
+        if period not in rollups.PERIODS:
+            return HttpResponseBadRequest("Unsupported 'period' parameter, use 'week' or 'month'")
+        
+        self.object = self.get_object()
+        training_schedule_rollups = rollups.get_rollups(self.object, period)
+        if request.GET.get('format') == 'json':
+            return JsonResponse({'period': period, 'rollups': training_schedule_rollups})
+        
+        context = self.get_context_data(object=self.object, rollups=training_schedule_rollups, period=period)
+        return self.render_to_response(context)
+    
+
+class TrainingScheduleChartDataView(View):
+    def get(self, request, *args, **kwargs):
+        try:
+            start_date = datetime.strptime(request.GET['from'], '%Y-%m-%d').date() if request.GET.get('from') else None
+            end_date = datetime.strptime(request.GET['to'], '%Y-%m-%d').date() if request.GET.get('to') else None
+            points = int(request.GET.get('points', 100))
+        except ValueError:
+            return HttpResponseBadRequest("Invalid 'from', 'to' or 'points' parameter")
+        if start_date is not None and end_date is not None and start_date > end_date:
+            return HttpResponseBadRequest("The 'from' date must not be after the 'to' date")
+        
+        downsample = request.GET.get('downsample') or None
+        if downsample is not None and downsample not in charts.DOWNSAMPLING:
+            return HttpResponseBadRequest("Unsupported 'downsample' parameter, use 'week' or 'lttb'")
+        if points < 3:
+            return HttpResponseBadRequest("The 'points' parameter must be at least 3")
+        
+        training_schedule = get_object_or_404(models.TrainingSchedule.objects.select_related('training_plan'), pk=kwargs['pk'])
+        return JsonResponse(charts.get_chart_data(training_schedule, start_date, end_date, downsample, points))
     
 
 class RecordStrengthActivityView(TemplateView):
@@ -163,13 +217,13 @@ class RecordStrengthActivityView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = forms.RecordStrengthActivityForm()
-        context["training_schedule"] = models.TrainingSchedule.objects.get(pk=self.kwargs["pk"])
+        context["training_schedule"] = models.TrainingSchedule.objects.summary().get(pk=self.kwargs["pk"])
         return context
 
     def post(self, request, **kwargs):
         form = forms.RecordStrengthActivityForm(self.request.POST)
         if form.is_valid():
-            training_schedule = models.TrainingSchedule.objects.get(pk=self.kwargs['pk'])
+            training_schedule = models.TrainingSchedule.objects.summary().get(pk=self.kwargs['pk'])
             athlete = self.request.user
             exercise = form.cleaned_data['exercise']
             date = form.cleaned_data['date']
@@ -195,13 +249,13 @@ class RecordIsometricActivityView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = forms.RecordIsometricActivityForm()
-        context["training_schedule"] = models.TrainingSchedule.objects.get(pk=self.kwargs["pk"])
+        context["training_schedule"] = models.TrainingSchedule.objects.summary().get(pk=self.kwargs["pk"])
         return context
 
     def post(self, request, **kwargs):
         form = forms.RecordIsometricActivityForm(self.request.POST)
         if form.is_valid():
-            training_schedule = models.TrainingSchedule.objects.get(pk=self.kwargs['pk'])
+            training_schedule = models.TrainingSchedule.objects.summary().get(pk=self.kwargs['pk'])
             athlete = self.request.user
             exercise = form.cleaned_data['exercise']
             date = form.cleaned_data['date']
@@ -226,13 +280,13 @@ class RecordCardioActivityView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = forms.RecordCardioActivityForm()
-        context["training_schedule"] = models.TrainingSchedule.objects.get(pk=self.kwargs["pk"])
+        context["training_schedule"] = models.TrainingSchedule.objects.summary().get(pk=self.kwargs["pk"])
         return context
 
     def post(self, request, **kwargs):
         form = forms.RecordCardioActivityForm(self.request.POST)
         if form.is_valid():
-            training_schedule = models.TrainingSchedule.objects.get(pk=self.kwargs['pk'])
+            training_schedule = models.TrainingSchedule.objects.summary().get(pk=self.kwargs['pk'])
             athlete = self.request.user
             exercise = form.cleaned_data['exercise']
             date = form.cleaned_data['date']
@@ -254,19 +308,15 @@ class RecordCardioActivityView(TemplateView):
 class ExerciseDetailView(DetailView):
     model = models.Exercise
     template_name = 'exercise_detail.html'
+    other_exercises_limit = 20
     
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        q_objects = Q(primary_muscle_focus=self.object.primary_muscle_focus) | Q(secondary_muscle_focus=self.object.primary_muscle_focus)
-        if self.object.secondary_muscle_focus is not None:
-            q_objects |= Q(primary_muscle_focus=self.object.secondary_muscle_focus) | Q(secondary_muscle_focus=self.object.secondary_muscle_focus)
-        similar_exercises = models.Exercise.objects.filter(q_objects).exclude(id=self.object.id)
-        similar_exercises = similar_exercises.order_by('name')
-        context["similar_exercises"] = similar_exercises
-        other_exercises = models.Exercise.objects.exclude(id=self.object.id).exclude(id__in=similar_exercises)
-        other_exercises = other_exercises.order_by('name')
-        
-        context["other_exercises"] = other_exercises
+        reference.attach_reference_data([self.object])
+        # similar and other exercises come from the cached exercises per muscle instead of scanning the exercise table
+        adjacency = library.get_exercise_adjacency()
+        context["similar_exercises"] = library.get_similar_exercises(self.object, adjacency)
+        context["other_exercises"] = library.get_other_exercises(self.object, context["similar_exercises"], self.other_exercises_limit, adjacency)
         return context
     
 
@@ -288,6 +338,11 @@ class TrainingScheduleCreateView(CreateView):
     success_url = reverse_lazy('home')
     fields = ['notes', 'training_plan', 'start_date', 'duration', 'train_on_mondays', 'train_on_tuesdays', 'train_on_wednesdays', 'train_on_thursdays', 'train_on_fridays', 'train_on_saturdays', 'train_on_sundays']
     
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        form.fields['training_plan'].queryset = models.TrainingPlan.objects.summary()
+        return form
+    
     def form_valid(self, form):
         training_plan = form.save(commit=False)
         training_plan.athlete = self.request.user
@@ -302,7 +357,7 @@ class ExerciseCreateView(CreateView):
     model = models.Exercise
     template_name = 'exercise_create.html'
     success_url = reverse_lazy('exercise_list')
-    fields = ['name', 'description', 'primary_muscle_focus', 'secondary_muscle_focus', 'equipment', 'type']
+    form_class = forms.ExerciseForm
     
     def form_valid(self, form):
         exercise = form.save(commit=False)
@@ -310,10 +365,61 @@ class ExerciseCreateView(CreateView):
         exercise.save()
         return super().form_valid(form)
     
-class ExerciseListView(ListView):
-    model = models.Exercise
+class ExerciseListView(TemplateView):
     template_name = 'exercise_list.html'
-    context_object_name = 'exercises'
     
-    def get_queryset(self):
-        return models.Exercise.objects.all().order_by('name')
\ No newline at end of file
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        form = forms.ExerciseFilterForm(self.request.GET)
+        page_number = self.request.GET.get('page')
+        if not form.is_valid():
+            # the page with the errors of the form is not cached, arbitrary invalid filters would fill the cache
+            context['exercise_library'] = self.render_library(form, dict(), page_number)
+            return context
+        
+        filters = form.cleaned_data
+        # the filtered page is rendered once per version of the exercise library
+        cache_key = caching.get_exercise_library_cache_key(
+            'exercise_library',
+            filters.get('muscle_group'),
+            filters['equipment'].pk if filters.get('equipment') else None,
+            filters.get('type'),
+            page_number,
+        )
+        context['exercise_library'] = caching.get_or_render_exercise_library(cache_key, lambda: self.render_library(form, filters, page_number))
+        return context
+    
+    def render_library(self, form, filters, page_number) -> str:
+        exercises = library.filter_exercises(**filters)
+        page_obj = Paginator(exercises, settings.EXERCISE_LIBRARY_PAGE_SIZE).get_page(page_number)
+        page_obj.object_list = reference.attach_reference_data(page_obj.object_list)
+        # the page links only carry the cleaned filters, not whatever else was in the query string of the cached request
+        filter_query = QueryDict(mutable=True)
+        for name, value in filters.items():
+            if value:
+                filter_query[name] = value.pk if isinstance(value, models.Equipment) else value
+        return render_to_string('exercise_list_page.html', {
+            'form': form,
+            'page_obj': page_obj,
+            'exercises': page_obj.object_list,
+            'filter_query': filter_query.urlencode(),
+        })
+
+
+def exercise_search(request):
+    """Typeahead search over the exercise library, answering htmx requests with the options of a select and others with JSON"""
+    exercises = search.search_exercises(request.GET.get('q', ''), request.GET.get('type') or None)
+    if request.headers.get('HX-Request'):
+        return render(request, 'exercise_search_options.html', {'exercises': exercises})
+    return JsonResponse({
+        'results': [
+            {'id': str(exercise.pk), 'name': exercise.name, 'type': exercise.type, 'url': exercise.get_absolute_url()}
+            for exercise in exercises
+        ]
+    })
+
+
+@staff_member_required
+def request_metrics(request):
+    """Aggregated request metrics of this process per URL name"""
+    return JsonResponse(middleware.request_stats)
@@ -0,0 +1,36 @@
+from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse_lazy
+
+
+class ExerciseAutocompleteWidget(forms.Select):
+    """
+    Select of an exercise that only renders the selected exercise instead of the whole exercise library
+
+    A search input next to the select fetches the matching exercises from the exercise_search endpoint with htmx and
+    replaces the options of the select with them.
+    """
+    template_name = 'widgets/exercise_autocomplete.html'
+    search_url = reverse_lazy('exercise_search')
+
+    def __init__(self, attrs=None, exercise_type:str=None):
+        super().__init__(attrs)
+        self.exercise_type = exercise_type
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['search_url'] = self.search_url
+        context['widget']['exercise_type'] = self.exercise_type
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        # only query the selected exercises, iterating the choices would load every exercise
+        selected_values = [selected_value for selected_value in value if selected_value]
+        options = [self.create_option(name, '', self.choices.field.empty_label or '', False, 0)]
+        try:
+            exercises = list(self.choices.queryset.filter(pk__in=selected_values)) if selected_values else []
+        except (ValueError, ValidationError):
+            exercises = []
+        for index, exercise in enumerate(exercises, start=1):
+            options.append(self.create_option(name, exercise.pk, self.choices.field.label_from_instance(exercise), True, index))
+        return [(None, options, 0)]
@@ -0,0 +1,28 @@
+"""
+Gunicorn configuration of the ASGI deployment profile
+
+The default profile in the Dockerfile runs src.wsgi with sync workers, where every request occupies a worker until it is
+answered. This profile runs src.asgi with uvicorn workers, so a worker keeps answering other requests while one waits for
+the database or the cache. Enable the async views with it:
+
+    ASYNC_VIEWS=true gunicorn -c src/gunicorn_asgi.py src.asgi
+
+or, without gunicorn managing the workers:
+
+    ASYNC_VIEWS=true uvicorn src.asgi:application --host 0.0.0.0 --port 8000 --workers 2
+
+Compare both profiles on the same machine with the load_test command, e.g.
+
+    python manage.py load_test "http://localhost:8000/get-target-activities/<pk>/?date=2024-01-01" --concurrency 1 10 50
+
+The async profile pays off when requests wait on a remote database or cache. With a local SQLite database the queries
+return faster than the hand-off to the ORM thread, and the sync profile answers more requests per second.
+
+Settings can be overridden with the usual GUNICORN_CMD_ARGS and the WEB_CONCURRENCY and PORT variables.
+"""
+import os
+
+bind = f":{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+worker_class = 'uvicorn.workers.UvicornWorker'
+timeout = 30
@@ -48,12 +48,14 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "whitenoise.runserver_nostatic",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # 3rd party
     "crispy_forms",
     "crispy_bootstrap5",
 ]
 
 MIDDLEWARE = [
+    "app.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -91,6 +93,10 @@ WSGI_APPLICATION = "src.wsgi.application"
 DATABASES = {
     "default": env.dj_db_url("DATABASE_URL", default="sqlite:///db.sqlite3")
 }
+if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    # an in-memory test database fails instead of waiting for locks, a file
+    # lets the concurrency tests run against SQLite as well
+    DATABASES["default"].setdefault("TEST", {}).setdefault("NAME", str(BASE_DIR / "test_db.sqlite3"))
 
 
 # Password validation
@@ -149,4 +155,71 @@ LOGIN_REDIRECT_URL = "home"
 LOGOUT_REDIRECT_URL = "home"
 
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
-CRISPY_TEMPLATE_PACK = "bootstrap5"
\ No newline at end of file
+CRISPY_TEMPLATE_PACK = "bootstrap5"
+
+# Training schedules
+# Derive the target activities of new training schedules on demand from the
+# training plan instead of materialising one JSON entry per calendar day.
+LAZY_TARGET_ACTIVITIES = env.bool("LAZY_TARGET_ACTIVITIES", default=False)
+
+# Exercises added to or removed from a training plan are patched into the
+# materialised target activities of its training schedules in batches of this
+# size. With DEFER_TARGET_PROPAGATION the requests leave this to the
+# propagate_targets command, e.g. run periodically.
+TARGET_PROPAGATION_BATCH_SIZE = env.int("TARGET_PROPAGATION_BATCH_SIZE", default=200)
+DEFER_TARGET_PROPAGATION = env.bool("DEFER_TARGET_PROPAGATION", default=False)
+
+# Queue the generation of target activities, the target propagation and
+# background imports as jobs in the database instead of running them in the
+# request. They are run by `python manage.py run_worker`.
+BACKGROUND_JOBS = env.bool("BACKGROUND_JOBS", default=False)
+
+# A failed job is queued again until it was attempted JOB_MAX_ATTEMPTS times.
+# A job still running after JOB_TIMEOUT seconds is assumed to belong to a
+# worker that died and is queued again by the next claim, or failed if it
+# has no attempts left.
+JOB_MAX_ATTEMPTS = env.int("JOB_MAX_ATTEMPTS", default=3)
+JOB_TIMEOUT = env.int("JOB_TIMEOUT", default=60 * 30)
+
+# Serve the home page, the training schedule analysis and the activity recording
+# with async views. Only useful with an ASGI server, see src/gunicorn_asgi.py
+ASYNC_VIEWS = env.bool("ASYNC_VIEWS", default=False)
+if ASYNC_VIEWS:
+    # WhiteNoise is sync only and would run every async view in a thread, the
+    # static files are served by the [[statics]] section of fly.toml instead,
+    # from STATIC_ROOT where collectstatic put the hashed manifest names
+    MIDDLEWARE.remove("whitenoise.middleware.WhiteNoiseMiddleware")
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# e.g. CACHE_URL=locmem:// or CACHE_URL=file:///var/tmp/django_cache
+
+CACHES = {
+    "default": env.dj_cache_url("CACHE_URL", default="locmem://")
+}
+
+# Seconds a rendered training schedule analysis is kept in the cache
+ANALYSIS_CACHE_TIMEOUT = env.int("ANALYSIS_CACHE_TIMEOUT", default=60 * 60 * 24)
+
+# Exercise library pages are cached until an exercise, muscle or equipment changes
+EXERCISE_LIBRARY_CACHE_TIMEOUT = env.int("EXERCISE_LIBRARY_CACHE_TIMEOUT", default=60 * 60 * 24)
+EXERCISE_LIBRARY_PAGE_SIZE = env.int("EXERCISE_LIBRARY_PAGE_SIZE", default=25)
+
+
+# Request metrics
+# Add SQL, template and total timings to every response and aggregate them per
+# URL name. Views exceeding their query budget are logged, or raise with
+# REQUEST_METRICS_RAISE_ON_BUDGET (e.g. in tests).
+REQUEST_METRICS = env.bool("REQUEST_METRICS", default=False)
+REQUEST_METRICS_RAISE_ON_BUDGET = env.bool("REQUEST_METRICS_RAISE_ON_BUDGET", default=False)
+REQUEST_METRICS_QUERY_BUDGETS = {
+    "home": 6,
+    "training_plan_detail": 8,
+    "add_exercise": 8,
+    "delete_exercise": 8,
+    "training_schedule_detail": 12,
+    "get-target-activities": 8,
+    "exercise_list": 6,
+    "exercise_detail": 6,
+}